@@ -1,11 +1,22 @@
+import sys
+
 import pandas as pd
 import statisticalanalysis as sa
 
-# Read your data
-df = pd.read_csv("DBMS Experiment Data.csv")
 
-# Calculate ANOVA table
-anova_results = sa.calculate_anova_table(df)
+def main(path="DBMS Experiment Data.csv"):
+    # Read your data
+    df = pd.read_csv(path)
+
+    # Calculate ANOVA table
+    try:
+        anova_results = sa.calculate_anova_table(df)
+    except ValueError as error:
+        raise SystemExit(f"{path}: {error}")
+
+    # Display results
+    print(anova_results.to_string(index=False))
+
 
-# Display results
-print(anova_results.to_string(index=False))
\ No newline at end of file
+if __name__ == "__main__":
+    main(*sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,251 @@
+import asyncio
+import itertools
+import random
+import time
+
+import config
+from backends import get_backend, query_parameters, numbered_placeholders, cypher_statement
+from benchmark import load_queries, parameter_generator
+from histogram import LatencyHistogram, NANOSECONDS
+from loadgen import parse_mix, summarize_load
+
+
+class AsyncPostgresClient:
+    """
+    asyncpg connection pool for PostgreSQL and TimescaleDB
+
+    asyncpg always sends $n parameters through the extended protocol. In the
+    'prepared' statement mode it caches the prepared statement per connection;
+    in 'simple' mode the cache is off, so every execution is planned again.
+    With a fetch_size, results are streamed through a cursor inside a
+    transaction, fetch_size rows per round trip, instead of fetched whole.
+    """
+
+    def __init__(self, settings, pool_size, statement_mode, fetch_size):
+        self.settings = settings
+        self.pool_size = pool_size
+        self.statement_mode = statement_mode
+        self.fetch_size = fetch_size
+        self.pool = None
+        self.texts = {}
+
+    async def connect(self):
+        import asyncpg
+
+        self.pool = await asyncpg.create_pool(
+            database=self.settings['dbname'], user=self.settings['user'], password=self.settings['password'],
+            host=self.settings['host'], port=int(self.settings['port']),
+            min_size=min(config.POOL_MIN_SIZE, self.pool_size), max_size=self.pool_size,
+            statement_cache_size=0 if self.statement_mode == 'simple' else 100)
+
+    async def execute(self, query, params):
+        """Run a query to completion, returning (rows, ns spent waiting for a connection)"""
+        if query not in self.texts:
+            self.texts[query] = numbered_placeholders('postgresql', query)
+        text, names = self.texts[query]
+        acquire_start = time.perf_counter_ns()
+        async with self.pool.acquire() as connection:
+            connect_ns = time.perf_counter_ns() - acquire_start
+            values = [params[name] for name in names]
+            if not self.fetch_size:
+                return len(await connection.fetch(text, *values)), connect_ns
+            rows = 0
+            # asyncpg cursors only exist within a transaction
+            async with connection.transaction():
+                async for _ in connection.cursor(text, *values, prefetch=self.fetch_size):
+                    rows += 1
+        return rows, connect_ns
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+
+class AsyncNeo4jClient:
+    """neo4j.AsyncGraphDatabase driver; sessions borrow from its connection pool"""
+
+    def __init__(self, settings, pool_size, statement_mode, fetch_size):
+        self.settings = settings
+        self.pool_size = pool_size
+        self.statement_mode = statement_mode
+        self.fetch_size = fetch_size
+        self.driver = None
+
+    async def connect(self):
+        from neo4j import AsyncGraphDatabase
+
+        self.driver = AsyncGraphDatabase.driver(self.settings['uri'],
+                                                auth=(self.settings['user'], self.settings['password']),
+                                                max_connection_pool_size=self.pool_size)
+        await self.driver.verify_connectivity()
+
+    async def execute(self, query, params):
+        # The session only takes a connection once run() is sent, so the wait
+        # for one can't be told apart from the query and is not reported
+        query, params = cypher_statement(query, params, self.statement_mode)
+        async with self.driver.session(fetch_size=self.fetch_size or config.FETCH_SIZE) as session:
+            result = await session.run(query, params)
+            rows = 0
+            async for _ in result:
+                rows += 1
+        return rows, None
+
+    async def close(self):
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+
+
+ASYNC_CLIENTS = {
+    'postgresql': AsyncPostgresClient,
+    'timescale': AsyncPostgresClient,
+    'neo4j': AsyncNeo4jClient,
+}
+
+
+def sample_parameters(backend_key, queries, seed):
+    # The generator samples the loaded data once, through the synchronous adapter
+    backend = get_backend(backend_key, connection_mode='persistent')
+    if not any(query_parameters(backend.dialect, query) for _, query in queries):
+        return None
+    backend.connect()
+    try:
+        return parameter_generator(backend, queries, seed)
+    finally:
+        backend.close()
+
+
+async def drive(client, queries, mix, concurrency, duration, requests, rate, seed, generator, dialect):
+    """
+    Issue queries through an async client, open loop when rate is given, closed loop otherwise
+
+    Open loop: request i is due at start + i / rate whether or not earlier
+    requests have finished, and its latency runs from that intended start, so
+    time spent queued behind a slow server is counted instead of omitted.
+    Closed loop: `concurrency` tasks each issue their next request as soon
+    as the previous one returns, like the thread and process workers.
+    """
+    rng = random.Random(seed)
+    query_text = dict(queries)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samplers = {name: generator.sampler(dialect, query_text[name]) if generator else None for name in names}
+
+    histograms = {name: LatencyHistogram() for name in names}  # From the intended start
+    service = {name: LatencyHistogram() for name in names}  # From holding a connection
+    connect_histogram = LatencyHistogram()
+    state = {'errors': 0, 'in_flight': 0, 'peak_in_flight': 0, 'issued': 0}
+
+    async def issue(intended_ns):
+        name = rng.choices(names, weights)[0]
+        params = samplers[name]() if samplers[name] else None
+        state['in_flight'] += 1
+        state['peak_in_flight'] = max(state['peak_in_flight'], state['in_flight'])
+        start_ns = time.perf_counter_ns()
+        try:
+            _, connect_ns = await client.execute(query_text[name], params)
+        except Exception:
+            state['errors'] += 1
+            return
+        finally:
+            state['in_flight'] -= 1
+        end_ns = time.perf_counter_ns()
+        histograms[name].record(end_ns - (intended_ns if intended_ns is not None else start_ns))
+        service[name].record(end_ns - start_ns - (connect_ns or 0))
+        if connect_ns is not None:
+            connect_histogram.record(connect_ns)
+
+    start = time.time()
+    start_ns = time.perf_counter_ns()
+    deadline_ns = start_ns + int(duration * NANOSECONDS) if duration else None
+    if rate:
+        interval_ns = NANOSECONDS / rate
+        tasks = set()
+        for i in itertools.count():
+            intended_ns = start_ns + int(i * interval_ns)
+            if (requests is not None and i >= requests) or (deadline_ns is not None and intended_ns >= deadline_ns):
+                break
+            delay_ns = intended_ns - time.perf_counter_ns()
+            if delay_ns > 0:
+                await asyncio.sleep(delay_ns / NANOSECONDS)
+            # Never wait for earlier requests: a late scheduler catches up in a burst
+            task = asyncio.create_task(issue(intended_ns))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            state['issued'] += 1
+        schedule_ns = time.perf_counter_ns() - start_ns
+        await asyncio.gather(*list(tasks))
+    else:
+        counter = itertools.count()
+
+        async def closed_loop():
+            while True:
+                if requests is not None and next(counter) >= requests:
+                    return
+                if deadline_ns is not None and time.perf_counter_ns() >= deadline_ns:
+                    return
+                state['issued'] += 1
+                await issue(None)
+
+        await asyncio.gather(*(closed_loop() for _ in range(concurrency)))
+        schedule_ns = time.perf_counter_ns() - start_ns
+    end = time.time()
+
+    return {'worker': 0, 'start': start, 'end': end, 'histograms': histograms, 'service': service,
+            'connect_histogram': connect_histogram, 'errors': state['errors'],
+            'peak_in_flight': state['peak_in_flight'],
+            'offered_qps': state['issued'] / (schedule_ns / NANOSECONDS) if schedule_ns > 0 else 0.0}
+
+
+async def run_client(backend_key, concurrency, duration, requests, rate, mix, seed, queries, generator,
+                     statement_mode, fetch_size):
+    backend = get_backend(backend_key, statement_mode=statement_mode)
+    client = ASYNC_CLIENTS[backend_key](backend.settings, concurrency, backend.statement_mode, fetch_size)
+    await client.connect()
+    try:
+        return await drive(client, queries, mix, concurrency, duration, requests, rate, seed, generator,
+                           backend.dialect)
+    finally:
+        await client.close()
+
+
+def run_async_load(backend_key, concurrency, duration=None, requests=None, rate=None, mix=None, seed=0,
+                   query_names=None, statement_mode=None, fetch_size=None, parameterized=False):
+    """
+    Drive a backend from a single asyncio event loop
+
+    Parameters:
+    backend_key: key into backends.BACKENDS
+    concurrency: connections in the pool (and, closed loop, requests in flight)
+    duration: seconds to keep issuing queries
+    requests: total queries to issue (used when duration is not given)
+    rate: arrivals per second for open-loop scheduling; None runs a closed loop
+    mix: "Query N=weight" entries choosing how often each query is issued
+    statement_mode: replan every execution or reuse prepared plans (backends.STATEMENT_MODES)
+    fetch_size: rows per round trip; PostgreSQL streams through a cursor only when
+    it is given, Neo4j always streams (config.FETCH_SIZE by default)
+
+    Returns:
+    dict: loadgen.summarize_load's summary, with per-query 'service' time
+    summaries (excluding the wait for a pooled connection, where the driver
+    exposes it), 'rate', 'offered_qps' and 'peak_in_flight'
+    """
+    if not duration and not requests:
+        raise ValueError("Either a duration or a request count is required")
+
+    backend = get_backend(backend_key, statement_mode=statement_mode)
+    queries = load_queries(backend.dialect, parameterized=parameterized)
+    if query_names:
+        queries = [(name, query) for name, query in queries if name in query_names]
+    weights = parse_mix(mix, [name for name, _ in queries])
+    generator = sample_parameters(backend_key, queries, seed)
+
+    outcome = asyncio.run(run_client(backend_key, concurrency, duration, requests, rate, weights, seed, queries,
+                                     generator, statement_mode, fetch_size))
+    mode = f"async open-loop {rate:g}/s" if rate else "async closed-loop"
+    summary = summarize_load(backend.name, concurrency, mode, [outcome], 'pooled')
+    for query in summary['queries']:
+        query['service'] = outcome['service'][query['name']].summary()
+    summary.update({'rate': rate, 'offered_qps': outcome['offered_qps'], 'peak_in_flight': outcome['peak_in_flight']})
+    return summary
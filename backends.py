@@ -0,0 +1,567 @@
+import itertools
+import json
+import re
+import time
+import weakref
+
+import config
+
+FETCH_MODES = ('buffered', 'stream')
+
+# persistent: one connection/session for the whole run
+# pooled: borrow a connection/session from a pool around every execution
+# connect: open and close a fresh connection around every execution
+CONNECTION_MODES = ('persistent', 'pooled', 'connect')
+
+# simple: parameter values are written into the query text, so the server plans every execution
+# prepared: the server keeps the plan (PostgreSQL PREPARE/EXECUTE, parameterized Cypher)
+STATEMENT_MODES = ('simple', 'prepared')
+
+# How each dialect writes a named parameter: psycopg2's %(name)s and Cypher's $name
+PLACEHOLDER_PATTERNS = {
+    'postgresql': re.compile(r"%\((\w+)\)s"),
+    'neo4j': re.compile(r"\$(\w+)"),
+}
+
+# Rows whose size is measured to estimate the bytes a result moved
+ROW_SIZE_SAMPLE = 100
+
+
+def count_rows(rows):
+    """
+    Consume rows one at a time, returning (row count, estimated result bytes)
+
+    The size is the text width of the first ROW_SIZE_SAMPLE rows scaled up to
+    the full count, which keeps the estimate off the per-row path.
+    """
+    count = 0
+    sampled_bytes = 0
+    for row in rows:
+        if count < ROW_SIZE_SAMPLE:
+            sampled_bytes += sum(len(str(value)) for value in row)
+        count += 1
+    if not count:
+        return 0, 0
+    return count, sampled_bytes * count / min(count, ROW_SIZE_SAMPLE)
+
+
+def query_parameters(dialect, query):
+    """Names of the parameters a query template uses, in order of first appearance"""
+    return list(dict.fromkeys(PLACEHOLDER_PATTERNS[dialect].findall(query)))
+
+
+def numbered_placeholders(dialect, query):
+    """
+    A SQL template with its %(name)s parameters turned into $1, $2, ...
+
+    Returns:
+    tuple: (query text for PREPARE or asyncpg, parameter names in $n order)
+    """
+    names = query_parameters(dialect, query)
+    text = PLACEHOLDER_PATTERNS[dialect].sub(lambda match: f"${names.index(match.group(1)) + 1}", query)
+    return text.strip().rstrip(';'), names
+
+
+def cypher_literal(value):
+    # json.dumps quotes and escapes strings the way Cypher string literals expect
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(str(value))
+
+
+def cypher_statement(query, params, statement_mode):
+    """The Cypher text and parameters to send for a statement mode"""
+    if statement_mode == 'prepared' or not params:
+        # Parameterized Cypher hits the same plan cache entry whatever the values
+        return query, params
+    # Every distinct query text is a new plan cache entry, so this re-plans
+    return PLACEHOLDER_PATTERNS['neo4j'].sub(
+        lambda match: cypher_literal(params[match.group(1)]) if match.group(1) in params else match.group(0),
+        query), None
+
+
+class Backend:
+    """
+    Adapter between the benchmark engine and one database system
+
+    Subclasses set `name` (the Database value recorded in the experiment
+    data) and `dialect` (the subdirectory of config.QUERY_DIRECTORY holding
+    the backend's queries), and implement connect, execute_phases and close.
+
+    fetch_mode 'buffered' materializes the whole result client-side before
+    counting it, 'stream' pulls it fetch_size rows at a time so client memory
+    stays flat however large the result is.
+
+    connect() sets up what lives for the whole run according to
+    connection_mode (see CONNECTION_MODES); every execution is then wrapped
+    in acquire()/release(), which the engine times as connect latency.
+
+    Queries may be templates with named parameters (see PLACEHOLDER_PATTERNS);
+    statement_mode decides whether the server sees literal values and plans
+    every execution, or reuses a prepared plan (see STATEMENT_MODES).
+
+    With a resultcache.ResultCache in result_cache, execute_measured()
+    answers repeated queries from the client instead of the server.
+    """
+    name = None
+    dialect = None
+
+    def __init__(self, settings=None, fetch_mode=None, fetch_size=None, connection_mode=None, statement_mode=None):
+        self.settings = settings if settings is not None else self.default_settings()
+        self.fetch_mode = fetch_mode or config.FETCH_MODE
+        self.fetch_size = fetch_size or config.FETCH_SIZE
+        self.connection_mode = connection_mode or config.CONNECTION_MODE
+        self.statement_mode = statement_mode or config.STATEMENT_MODE
+        if self.fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode '{self.fetch_mode}', expected one of: {', '.join(FETCH_MODES)}")
+        if self.connection_mode not in CONNECTION_MODES:
+            raise ValueError(f"Unknown connection mode '{self.connection_mode}', "
+                             f"expected one of: {', '.join(CONNECTION_MODES)}")
+        if self.statement_mode not in STATEMENT_MODES:
+            raise ValueError(f"Unknown statement mode '{self.statement_mode}', "
+                             f"expected one of: {', '.join(STATEMENT_MODES)}")
+        self.result_cache = None
+
+    def default_settings(self):
+        return {}
+
+    def connect(self):
+        raise NotImplementedError
+
+    def execute(self, query, params=None):
+        """Run a query to completion and return the number of rows it produced"""
+        return self.execute_measured(query, params)['rows']
+
+    def execute_measured(self, query, params=None):
+        """execute_phases, or the client-side result cache's answer when one is attached"""
+        if self.result_cache is None:
+            return self.execute_phases(query, params)
+        return self.result_cache.execute_phases(self, query, params)
+
+    def query_rows(self, query, params=None):
+        """Run a helper query outside the measurements and return its rows as tuples"""
+        raise NotImplementedError
+
+    def iter_rows(self, query, params=None):
+        """Yield a query's rows as tuples, fetch_size at a time, without holding the whole result"""
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def acquire(self):
+        """Get a connection/session ready for the next execution"""
+
+    def release(self):
+        """Give back what acquire() took"""
+
+    def reset(self):
+        """Leave the connection usable for the next execution after one failed"""
+
+    def execute_phases(self, query, params=None):
+        """
+        Run a query to completion, timing the client-side phases separately
+
+        params fills in the query's named parameters, if it has any.
+
+        Returns:
+        dict: 'rows', 'bytes' (estimated result size), 'total_ns' (whole
+        execution), 'fetch_ns' (pulling rows into Python) and 'server', the
+        server-reported timings in ms when the driver returns them with every
+        result, otherwise None
+        """
+        raise NotImplementedError
+
+    def explain(self, query, params=None):
+        """Server-side timings in ms from a separate, instrumented execution, or None"""
+        return None
+
+    def capture_plan(self, query, params=None):
+        """
+        Execute a query once with instrumentation and return its raw plan with
+        estimated and actual row counts, or None if the backend can't
+        """
+        return None
+
+    def drop_caches(self):
+        """Throw away whatever the server cached for this client before a cold run"""
+
+    def prewarm(self):
+        """Load the benchmark tables into the server's buffer cache before a warm run"""
+
+    def run_statement(self, statement):
+        """Run a schema or maintenance statement (DDL, index builds) in its own transaction"""
+        raise NotImplementedError
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PostgresBackend(Backend):
+    name = "PostgreSQL"
+    dialect = "postgresql"
+
+    def __init__(self, settings=None, fetch_mode=None, fetch_size=None, connection_mode=None, statement_mode=None):
+        super().__init__(settings, fetch_mode, fetch_size, connection_mode, statement_mode)
+        if self.fetch_mode == 'stream' and self.statement_mode == 'prepared':
+            # DECLARE ... CURSOR only takes a SELECT, not EXECUTE of a prepared statement
+            raise ValueError("PostgreSQL can't stream prepared statements through a cursor, "
+                             "use the buffered fetch mode or simple statements")
+        self.pool = None
+        self.connection = None
+        self.cursor = None
+        self.evict_buffers = True
+        self.cursor_names = itertools.count()
+        # Statements prepared on each connection, {connection: {query: (name, parameter names)}};
+        # entries go away with their connection
+        self.prepared = weakref.WeakKeyDictionary()
+        self.statement_names = itertools.count()
+
+    def default_settings(self):
+        return {
+            'dbname': config.POSTGRES_DBNAME,
+            'user': config.POSTGRES_USERNAME,
+            'password': config.POSTGRES_PASSWORD,
+            'host': config.POSTGRES_HOST,
+            'port': config.POSTGRES_PORT
+        }
+
+    def connect(self):
+        import psycopg2.pool
+
+        if self.connection_mode == 'pooled':
+            self.pool = psycopg2.pool.ThreadedConnectionPool(config.POOL_MIN_SIZE, config.POOL_MAX_SIZE,
+                                                             **self.settings)
+        elif self.connection_mode == 'persistent':
+            self.open_connection()
+
+    def open_connection(self):
+        import psycopg2
+
+        if self.pool:
+            self.connection = self.pool.getconn()
+        else:
+            self.connection = psycopg2.connect(**self.settings)
+        self.cursor = self.connection.cursor()
+
+    def close_connection(self):
+        if self.cursor:
+            self.cursor.close()
+            self.cursor = None
+        if self.connection:
+            if self.pool:
+                # The pool rolls back whatever transaction is still open
+                self.pool.putconn(self.connection)
+            else:
+                self.connection.close()
+            self.connection = None
+
+    def acquire(self):
+        if self.connection_mode != 'persistent':
+            self.open_connection()
+
+    def release(self):
+        if self.connection_mode != 'persistent':
+            self.close_connection()
+
+    def reset(self):
+        # A failed statement aborts the transaction, and every later statement on the
+        # connection fails until it is rolled back
+        if self.connection is None:
+            return
+        try:
+            self.connection.rollback()
+        except Exception:
+            # The connection itself is gone; acquire() opens the next one in the other modes
+            self.close_connection()
+            if self.connection_mode == 'persistent':
+                self.open_connection()
+
+    def prepared_call(self, query, params):
+        """
+        The EXECUTE statement and values running a query as a prepared statement
+
+        The query is PREPAREd the first time it runs on the current connection,
+        with its parameters numbered by numbered_placeholders.
+        """
+        statements = self.prepared.setdefault(self.connection, {})
+        if query not in statements:
+            text, names = numbered_placeholders(self.dialect, query)
+            name = f"bench_statement_{next(self.statement_names)}"
+            self.cursor.execute(f"PREPARE {name} AS {text}")
+            statements[query] = (name, names)
+        name, names = statements[query]
+        if not names:
+            return f"EXECUTE {name}", None
+        return f"EXECUTE {name} ({', '.join(['%s'] * len(names))})", [params[n] for n in names]
+
+    def statement(self, query, params):
+        if self.statement_mode == 'prepared':
+            return self.prepared_call(query, params)
+        # psycopg2 interpolates the values client-side, so the server sees literals
+        return query, params
+
+    def execute_phases(self, query, params=None):
+        if self.fetch_mode == 'buffered':
+            # Preparing happens once per connection and is not part of the execution
+            query, params = self.statement(query, params)
+        start_time = time.perf_counter_ns()
+        if self.fetch_mode == 'stream':
+            # A named cursor is a server-side DECLARE ... CURSOR; execute() only opens
+            # it and iterating fetches itersize rows per round trip
+            cursor = self.connection.cursor(name=f"bench_{next(self.cursor_names)}")
+            cursor.itersize = self.fetch_size
+            try:
+                cursor.execute(query, params)
+                fetch_start = time.perf_counter_ns()
+                rows, size = count_rows(cursor)
+            finally:
+                cursor.close()
+        else:
+            # execute() returns once the whole result has arrived; fetchall() only converts it
+            self.cursor.execute(query, params)
+            fetch_start = time.perf_counter_ns()
+            rows, size = count_rows(self.cursor.fetchall())  # Ensure the query completes execution
+        end_time = time.perf_counter_ns()
+        return {'rows': rows, 'bytes': size, 'total_ns': end_time - start_time,
+                'fetch_ns': end_time - fetch_start, 'server': None}
+
+    def explain(self, query, params=None):
+        # TIMING OFF skips per-node clock reads, which would inflate the execution time
+        query, params = self.statement(query, params)
+        self.cursor.execute("EXPLAIN (ANALYZE, BUFFERS, TIMING OFF, FORMAT JSON) " + query, params)
+        plan = self.cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plan = plan[0]
+        top = plan['Plan']
+        return {
+            'planning_ms': plan.get('Planning Time'),
+            'execution_ms': plan.get('Execution Time'),
+            'shared_hit_blocks': top.get('Shared Hit Blocks'),
+            'shared_read_blocks': top.get('Shared Read Blocks'),
+            'temp_written_blocks': top.get('Temp Written Blocks'),
+        }
+
+    def query_rows(self, query, params=None):
+        self.cursor.execute(query, params)
+        return self.cursor.fetchall()
+
+    def iter_rows(self, query, params=None):
+        cursor = self.connection.cursor(name=f"bench_{next(self.cursor_names)}")
+        cursor.itersize = self.fetch_size
+        try:
+            cursor.execute(query, params)
+            yield from cursor
+        except Exception:
+            # Leave the connection usable for the next query
+            cursor.close()
+            self.connection.rollback()
+            raise
+        finally:
+            if not cursor.closed:
+                cursor.close()
+
+    def capture_plan(self, query, params=None):
+        query, params = self.statement(query, params)
+        try:
+            self.cursor.execute("EXPLAIN (ANALYZE, TIMING OFF, FORMAT JSON) " + query, params)
+            plan = self.cursor.fetchone()[0]
+        except Exception:
+            self.connection.rollback()
+            raise
+        return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+    def run_outside_transaction(self, statement):
+        # DISCARD ALL and friends refuse to run inside psycopg2's implicit transaction
+        self.connection.rollback()
+        self.connection.autocommit = True
+        try:
+            self.cursor.execute(statement)
+        finally:
+            self.connection.autocommit = False
+
+    def drop_caches(self):
+        # Drops cached plans, prepared statements and temp tables for this session
+        self.run_outside_transaction("DISCARD ALL")
+        self.prepared.pop(self.connection, None)
+        # Evicting shared buffers needs pg_buffercache 1.5 (PostgreSQL 17+); the OS
+        # page cache is out of reach from a client connection either way
+        if self.evict_buffers:
+            try:
+                self.run_outside_transaction(
+                    "SELECT pg_buffercache_evict(bufferid) FROM pg_buffercache WHERE relfilenode IS NOT NULL")
+            except Exception as e:
+                print(f"Shared buffer eviction unavailable, only session caches were dropped: {e}")
+                self.evict_buffers = False
+
+    def run_statement(self, statement):
+        self.run_outside_transaction(statement)
+
+    def prewarm(self):
+        self.run_outside_transaction("CREATE EXTENSION IF NOT EXISTS pg_prewarm")
+        self.run_outside_transaction("""
+            SELECT pg_prewarm(c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'i', 'm')
+        """)
+
+    def close(self):
+        self.close_connection()
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
+
+
+class TimescaleBackend(PostgresBackend):
+    # TimescaleDB speaks plain PostgreSQL, so it shares the SQL queries
+    name = "Timescale"
+
+    def default_settings(self):
+        return {
+            'dbname': config.TIMESCALE_DBNAME,
+            'user': config.TIMESCALE_USERNAME,
+            'password': config.TIMESCALE_PASSWORD,
+            'host': config.TIMESCALE_HOST,
+            'port': config.TIMESCALE_PORT
+        }
+
+
+class Neo4jBackend(Backend):
+    name = "Neo4j"
+    dialect = "neo4j"
+
+    def __init__(self, settings=None, fetch_mode=None, fetch_size=None, connection_mode=None, statement_mode=None):
+        super().__init__(settings, fetch_mode, fetch_size, connection_mode, statement_mode)
+        self.driver = None
+        self.session = None
+
+    def default_settings(self):
+        return {
+            'uri': config.NEO4J_URI,
+            'user': config.NEO4J_USER,
+            'password': config.NEO4J_PASSWORD
+        }
+
+    def connect(self):
+        # The driver owns the connection pool; sessions borrow from it
+        if self.connection_mode != 'connect':
+            self.driver = self.open_driver()
+        if self.connection_mode == 'persistent':
+            self.open_session()
+
+    def open_driver(self):
+        from neo4j import GraphDatabase
+
+        return GraphDatabase.driver(self.settings['uri'],
+                                    auth=(self.settings['user'], self.settings['password']),
+                                    max_connection_pool_size=config.NEO4J_MAX_POOL_SIZE)
+
+    def open_session(self):
+        # fetch_size is how many records the driver pulls per round trip
+        self.session = self.driver.session(fetch_size=self.fetch_size)
+
+    def acquire(self):
+        if self.connection_mode == 'persistent':
+            return
+        if self.connection_mode == 'connect':
+            # Sessions connect lazily, so force the handshake inside the timed acquire
+            self.driver = self.open_driver()
+            self.driver.verify_connectivity()
+        self.open_session()
+
+    def release(self):
+        if self.connection_mode == 'persistent':
+            return
+        self.session.close()
+        self.session = None
+        if self.connection_mode == 'connect':
+            self.driver.close()
+            self.driver = None
+
+    def reset(self):
+        # The session of a failed query may still hold its broken result or connection
+        if self.connection_mode != 'persistent' or self.session is None:
+            return
+        try:
+            self.session.close()
+        except Exception:
+            pass
+        self.open_session()
+
+    def execute_phases(self, query, params=None):
+        query, params = cypher_statement(query, params, self.statement_mode)
+        start_time = time.perf_counter_ns()
+        result = self.session.run(query, params)
+        fetch_start = time.perf_counter_ns()
+        # Pull every record so the query completes; buffered mode holds them all
+        # at once like fetchall() on the SQL side
+        rows, size = count_rows(list(result) if self.fetch_mode == 'buffered' else result)
+        summary = result.consume()
+        end_time = time.perf_counter_ns()
+        # result_available_after covers planning and producing the first record,
+        # result_consumed_after the rest of the execution; Neo4j does not split out planning
+        available_ms = summary.result_available_after or 0
+        consumed_ms = summary.result_consumed_after or 0
+        # Records stream while the server is still executing, so only the part of
+        # the iteration beyond result_consumed_after is client-side fetch work
+        fetch_ns = max(0, end_time - fetch_start - consumed_ms * 1_000_000)
+        return {
+            'rows': rows,
+            'bytes': size,
+            'total_ns': end_time - start_time,
+            'fetch_ns': fetch_ns,
+            'server': {'planning_ms': None, 'execution_ms': available_ms + consumed_ms},
+        }
+
+    def query_rows(self, query, params=None):
+        return [tuple(record.values()) for record in self.session.run(query, params)]
+
+    def iter_rows(self, query, params=None):
+        for record in self.session.run(query, params):
+            yield tuple(record.values())
+
+    def capture_plan(self, query, params=None):
+        # PROFILE runs the query and reports estimated and actual rows per operator
+        query, params = cypher_statement(query, params, self.statement_mode)
+        return self.session.run("PROFILE " + query, params).consume().profile
+
+    def drop_caches(self):
+        # Clears the Cypher plan cache; the page cache can only be emptied by a restart
+        self.session.run("CALL db.clearQueryCaches()").consume()
+
+    def run_statement(self, statement):
+        self.session.run(statement).consume()
+
+    def close(self):
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.driver:
+            self.driver.close()
+            self.driver = None
+
+
+# Backends selectable from the command line, keyed by their dialect-style name
+BACKENDS = {
+    'postgresql': PostgresBackend,
+    'timescale': TimescaleBackend,
+    'neo4j': Neo4jBackend,
+}
+
+
+def get_backend(key, settings=None, fetch_mode=None, fetch_size=None, connection_mode=None, statement_mode=None):
+    try:
+        backend_class = BACKENDS[key.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{key}', expected one of: {', '.join(BACKENDS)}")
+    return backend_class(settings, fetch_mode, fetch_size, connection_mode, statement_mode)
@@ -0,0 +1,489 @@
+import argparse
+import os
+
+from backends import BACKENDS, FETCH_MODES, CONNECTION_MODES, STATEMENT_MODES
+
+# Kept in step with reports.REPORT_FORMATS, which pulls in pandas
+REPORT_FORMATS = ('.json', '.parquet')
+
+
+def report_path(path):
+    # Checked while parsing, so a typo doesn't surface only after a long run
+    if os.path.splitext(path)[1].lower() not in REPORT_FORMATS:
+        raise argparse.ArgumentTypeError(f"report must end in {' or '.join(REPORT_FORMATS)}")
+    return path
+
+
+def run_command(args):
+    if args.concurrency or args.rate or args.driver == 'async':
+        return load_command(args)
+    if args.variant is not None:
+        return variant_command(args)
+
+    from benchmark import run_queries_and_analyze
+
+    results = []
+    for backend_key in args.backend:
+        results += run_queries_and_analyze(backend_key, args.query, args.iterations, args.warmup, args.cold,
+                                           args.auto_warmup, args.prewarm, args.explain_every, args.fetch_mode,
+                                           args.fetch_size, args.connection_mode, args.statement_mode,
+                                           args.telemetry_interval, args.ingest_rate, args.ingest_batch,
+                                           args.ingest_method, args.target_ci_width, args.time_budget,
+                                           args.parameterized, args.capture_plans, record=not args.no_record)
+    if args.report:
+        from reports import result_records, write_report
+
+        write_report(result_records(results), args.report)
+
+
+def variant_command(args):
+    from variants import run_variant_matrix
+    from utils import display_variant_matrix
+
+    matrix = []
+    for backend_key in args.backend:
+        results = run_variant_matrix(backend_key, args.variant, args.query, record=not args.no_record,
+                                     parameterized=args.parameterized, fetch_mode=args.fetch_mode,
+                                     fetch_size=args.fetch_size, connection_mode=args.connection_mode,
+                                     statement_mode=args.statement_mode, iterations=args.iterations, warmup=args.warmup, cold=args.cold,
+                                     auto_warmup=args.auto_warmup, prewarm=args.prewarm,
+                                     explain_every=args.explain_every, telemetry_interval=args.telemetry_interval,
+                                     ingest_rate=args.ingest_rate, ingest_batch_size=args.ingest_batch,
+                                     ingest_method=args.ingest_method, target_width=args.target_ci_width,
+                                     time_budget=args.time_budget, capture_plans=args.capture_plans)
+        display_variant_matrix(results)
+        matrix += results
+    if args.report:
+        from reports import result_records, write_report
+
+        write_report(result_records(matrix), args.report)
+
+
+def load_command(args):
+    from utils import display_load_results
+
+    if not args.duration and not args.requests:
+        raise SystemExit("Load generation needs either --duration or --requests")
+    if args.driver == 'async' or args.rate:
+        return async_load_command(args)
+
+    from loadgen import run_load
+
+    summaries = []
+    for backend_key in args.backend:
+        try:
+            summary = run_load(backend_key, args.concurrency, args.duration, args.requests, args.mix,
+                               args.worker_mode, args.seed, args.query, args.connection_mode, args.statement_mode,
+                               args.parameterized)
+        except ValueError as error:
+            # A --mix naming an unknown query or with a weight that isn't a number
+            raise SystemExit(str(error))
+        display_load_results(summary)
+        summaries.append(summary)
+    write_load_report(summaries, args.report)
+
+
+def write_load_report(summaries, path):
+    if path:
+        from reports import load_records, write_report
+
+        write_report(load_records(summaries), path)
+
+
+def async_load_command(args):
+    import config
+    from asyncload import run_async_load
+    from utils import display_load_results
+
+    concurrency = args.concurrency or config.POOL_MAX_SIZE
+    summaries = []
+    for backend_key in args.backend:
+        try:
+            summary = run_async_load(backend_key, concurrency, args.duration, args.requests, args.rate, args.mix,
+                                     args.seed, args.query, args.statement_mode, args.fetch_size, args.parameterized)
+        except ValueError as error:
+            raise SystemExit(str(error))
+        display_load_results(summary)
+        summaries.append(summary)
+    write_load_report(summaries, args.report)
+
+
+def load_dataset_command(args):
+    from loader import load_dataset
+    from utils import display_dataset_load
+
+    for backend_key in args.backend:
+        report = load_dataset(backend_key, args.data_dir, args.table, args.workers, not args.no_schema, args.truncate)
+        display_dataset_load(report)
+
+
+def generate_command(args):
+    from datagen import generate_dataset
+    from utils import display_dataset_load
+
+    report = generate_dataset(args.scale, args.out_dir, args.seed, args.table, args.chunk_rows, args.workers)
+    display_dataset_load(report)
+
+
+def sweep_command(args):
+    from scaling import run_scaling_sweep, save_scaling_rows, plot_scaling, scaling_plan_changes
+
+    rows = run_scaling_sweep(args.scale, args.backend, args.out_dir, args.iterations, args.warmup, args.seed,
+                             args.capture_plans)
+    if not save_scaling_rows(rows, os.path.join(args.out_dir, 'scaling.csv')):
+        raise SystemExit("The sweep produced no results to write")
+    plot_scaling(rows, os.path.join(args.out_dir, 'scaling.png'))
+    print(f"Scaling results written to {args.out_dir}/scaling.csv and scaling.png")
+    for database, query, smaller, larger in scaling_plan_changes(rows):
+        print(f"{database} changed the plan of {query} between scale factors {smaller:g} and {larger:g}")
+
+
+def export_command(args):
+    from resultstore import export_csv
+
+    try:
+        rows = export_csv(args.out, args.results_dir, args.include_factors)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    print(f"Exported {rows} results to {args.out}")
+
+
+def analyze_command(args):
+    import config
+    from resultstore import load_result_set
+    from statisticalanalysis import calculate_anova_table
+
+    source = args.source or config.RESULTS_DIRECTORY
+    try:
+        frame = load_result_set(source, args.results_dir)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    try:
+        table = calculate_anova_table(frame, args.factors, ss_type=args.ss_type)
+    except ValueError as error:
+        raise SystemExit(f"{source}: {error}")
+    print(f"ANOVA of {len(frame)} samples from {source}:")
+    print(table.to_string(index=False))
+    if args.report:
+        from reports import frame_records, write_report
+
+        write_report(frame_records(table), args.report)
+
+
+def compare_command(args):
+    import config
+    from resultstore import load_result_set
+    from statisticalanalysis import compare_runs
+    from utils import display_comparison
+
+    threshold = args.threshold if args.threshold is not None else config.REGRESSION_THRESHOLD
+    confidence = args.confidence or config.CONFIDENCE_LEVEL
+    try:
+        baseline = load_result_set(args.baseline, args.results_dir)
+        candidate = load_result_set(args.candidate, args.results_dir)
+    except ValueError as error:
+        raise SystemExit(str(error))
+    for column in args.by or []:
+        for label, results in (('baseline', baseline), ('candidate', candidate)):
+            if column not in results.columns:
+                raise SystemExit(f"--by column '{column}' is not in the {label} results")
+    rows = compare_runs(baseline, candidate, args.by, threshold=threshold, confidence=confidence,
+                        n_resamples=args.resamples or config.BOOTSTRAP_RESAMPLES, seed=args.seed)
+    if not rows:
+        raise SystemExit("The baseline and candidate have no (Database, Query) cells in common")
+    display_comparison(rows, threshold, confidence)
+    if args.report:
+        from reports import json_safe, write_report
+
+        write_report(json_safe(rows), args.report)
+    regressions = sum(row['regression'] for row in rows)
+    if regressions:
+        # A non-zero exit status lets CI gate on the comparison
+        print(f"{regressions} of {len(rows)} cells regressed")
+        raise SystemExit(1)
+    print(f"No regressions in {len(rows)} cells")
+
+
+def verify_command(args):
+    from correctness import verify_queries
+    from utils import display_verification
+
+    if len(args.backend) < 2:
+        raise SystemExit("Verification needs at least two backends to compare")
+    reports = verify_queries(args.backend, args.query, args.seed, args.parameterized)
+    display_verification(reports)
+    mismatches = sum(not report['matches'] for report in reports)
+    if mismatches:
+        print(f"{mismatches} of {len(reports)} queries return different results across backends")
+        raise SystemExit(1)
+    print(f"All {len(reports)} queries return the same results")
+
+
+def plans_command(args):
+    import config
+    from plans import plan_changes
+    from resultstore import read_plans
+    from utils import display_plan_changes
+
+    plans = read_plans(args.results_dir)
+    if args.database:
+        plans = plans[plans['Database'].isin(args.database)]
+    if args.query:
+        plans = plans[plans['Query'].isin(args.query)]
+    print(f"{len(plans)} captured plans, {plans['Fingerprint'].nunique()} distinct")
+    display_plan_changes(plan_changes(plans), config.PLAN_MISESTIMATE_FACTOR)
+
+
+def orchestrate_command(args):
+    from orchestrate import load_targets, run_experiment
+    from utils import display_experiment
+
+    try:
+        targets = load_targets(args.targets)
+    except (OSError, ValueError) as error:
+        raise SystemExit(str(error))
+    outcomes = run_experiment(targets, args.backend, args.query, args.iterations, args.warmup, args.workers,
+                              args.results_dir)
+    if not outcomes:
+        raise SystemExit("No computer in the targets file runs any of the selected backends")
+    display_experiment(outcomes)
+    if args.anova:
+        from resultstore import read_results
+        from statisticalanalysis import calculate_anova_table
+
+        frame = read_results(args.results_dir)
+        frame = frame[frame['Run_Id'].isin([outcome['run_id'] for outcome in outcomes])]
+        try:
+            table = calculate_anova_table(frame)
+        except ValueError as error:
+            print(f"\nNo ANOVA over this experiment: {error}")
+        else:
+            print("\nANOVA over this experiment:")
+            print(table.to_string(index=False))
+    failures = sum(outcome['error'] is not None for outcome in outcomes)
+    if failures:
+        raise SystemExit(f"{failures} of {len(outcomes)} runs failed")
+
+
+def profile_command(args):
+    from profiling import profile_backend
+    from utils import display_profile, display_decoding
+
+    for backend_key in args.backend:
+        profiles, comparisons = profile_backend(backend_key, args.query, args.iterations, args.profiler,
+                                                args.interval, args.out_dir, decoding=not args.no_decoding,
+                                                parameterized=args.parameterized)
+        display_profile(profiles)
+        display_decoding(comparisons)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark PostgreSQL, TimescaleDB and Neo4j on the financial dataset")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Time the benchmark queries against one or more backends")
+    run_parser.add_argument('--backend', nargs='+', choices=list(BACKENDS), default=list(BACKENDS),
+                            help="Backends to benchmark (default: all)")
+    run_parser.add_argument('--query', nargs='+', metavar='NAME',
+                            help='Only run these queries, e.g. --query "Query 1" "Query 3"')
+    run_parser.add_argument('--iterations', type=int, help="Timed executions per query")
+    run_parser.add_argument('--warmup', type=int, help="Executions per query before timing, reported separately")
+    run_parser.add_argument('--auto-warmup', action='store_true',
+                            help="Keep warming up until latency is steady (see config.STEADY_STATE_*)")
+    run_parser.add_argument('--cold', action='store_true',
+                            help="Drop the server's caches before every timed execution")
+    run_parser.add_argument('--prewarm', action='store_true',
+                            help="Load the tables into the buffer cache before timing (PostgreSQL pg_prewarm)")
+    run_parser.add_argument('--explain-every', type=int, metavar='N',
+                            help="Sample planning/execution time with EXPLAIN ANALYZE every N iterations (PostgreSQL)")
+    run_parser.add_argument('--telemetry-interval', type=float, metavar='SECONDS',
+                            help="Sample server/client resource counters this often while queries run "
+                                 "(default: config.TELEMETRY_INTERVAL, off)")
+    run_parser.add_argument('--fetch-mode', choices=list(FETCH_MODES),
+                            help="Load whole results at once or stream them through server-side cursors")
+    run_parser.add_argument('--fetch-size', type=int, metavar='ROWS',
+                            help="Rows per round trip in stream mode (cursor itersize / Neo4j fetch_size)")
+    run_parser.add_argument('--connection-mode', choices=list(CONNECTION_MODES),
+                            help="Keep one connection, borrow one from a pool, or connect anew for every execution")
+    run_parser.add_argument('--statement-mode', choices=list(STATEMENT_MODES),
+                            help="Send parameter values as literals (planned every time) or reuse a prepared plan")
+    run_parser.add_argument('--variant', nargs='*', metavar='NAME',
+                            help="Run the query set once per schema variant in variants.VARIANTS "
+                                 "(all of them when no names are given)")
+    run_parser.add_argument('--capture-plans', action='store_true', default=None,
+                            help="Run every query once more after timing to record its plan "
+                                 "(default: config.CAPTURE_PLANS, off)")
+    run_parser.add_argument('--parameterized', action='store_true',
+                            help="Also run the parameterized query templates in queries/parameterized/ (see params.py)")
+    run_parser.add_argument('--no-record', action='store_true',
+                            help="Don't append the timings to the results store")
+    run_parser.add_argument('--report', type=report_path, metavar='PATH',
+                            help="Also write every query's summary and times (the load summary with --concurrency, "
+                                 "--rate or --driver async) to a .json or .parquet file")
+
+    # Concurrent load generation instead of single-client timing
+    load_group = run_parser.add_argument_group("concurrent load")
+    load_group.add_argument('--concurrency', type=int, metavar='N',
+                            help="Run N concurrent clients, each with its own connection")
+    load_group.add_argument('--worker-mode', choices=['thread', 'process'], default='thread',
+                            help="Run clients as threads or as processes (default: thread)")
+    load_group.add_argument('--duration', type=float, metavar='SECONDS', help="How long each client keeps issuing queries")
+    load_group.add_argument('--requests', type=int, help="Total queries to issue across all clients")
+    load_group.add_argument('--mix', nargs='+', metavar='NAME=WEIGHT',
+                            help='Relative query frequencies, e.g. --mix "Query 1=3" "Query 2=1"')
+    load_group.add_argument('--seed', type=int, default=0, help="Seed for the query mix")
+    load_group.add_argument('--driver', choices=['sync', 'async'], default='sync',
+                            help="Blocking clients per thread/process, or one asyncio event loop "
+                                 "(asyncpg / async Neo4j driver) with N pooled connections")
+    load_group.add_argument('--rate', type=float, metavar='QPS',
+                            help="Open loop: start queries at this fixed rate whether or not earlier ones "
+                                 "finished, measuring latency from the scheduled start (implies --driver async)")
+
+    # Queries under a concurrent insert stream, compared with a read-only pass
+    ingest_group = run_parser.add_argument_group("mixed read/write workload")
+    ingest_group.add_argument('--ingest-rate', type=float, metavar='ROWS_PER_S',
+                              help="Also run the queries while appending this many new transactions per second")
+    ingest_group.add_argument('--ingest-batch', type=int, metavar='ROWS',
+                              help="Rows per insert batch (default: config.INGEST_BATCH_SIZE)")
+    ingest_group.add_argument('--ingest-method', choices=['copy', 'insert'],
+                              help="PostgreSQL batches through COPY or multi-row INSERT (default: config.INGEST_METHOD)")
+
+    # Replications per query chosen by how quickly its median settles
+    adaptive_group = run_parser.add_argument_group("adaptive replication")
+    adaptive_group.add_argument('--target-ci-width', type=float, metavar='REL',
+                                help="Keep running the least certain query until every median's confidence "
+                                     "interval is narrower than REL times the median, e.g. 0.05 (--iterations "
+                                     "becomes the starting count, default: config.ADAPTIVE_MIN_ITERATIONS)")
+    adaptive_group.add_argument('--time-budget', type=float, metavar='SECONDS',
+                                help="Stop adding executions after this long per backend "
+                                     "(default: config.ADAPTIVE_TIME_BUDGET)")
+    run_parser.set_defaults(func=run_command)
+
+    load_parser = subparsers.add_parser('load', help="Load the financial dataset CSVs into one or more backends")
+    load_parser.add_argument('--backend', nargs='+', choices=list(BACKENDS), default=list(BACKENDS),
+                             help="Backends to load (default: all)")
+    load_parser.add_argument('--data-dir', help="Directory holding <table>.csv files (default: config.DATASET_DIRECTORY)")
+    load_parser.add_argument('--table', nargs='+', help="Only load these tables")
+    load_parser.add_argument('--workers', type=int, help="Tables loaded in parallel (default: config.LOAD_WORKERS)")
+    load_parser.add_argument('--no-schema', action='store_true',
+                             help="Skip CREATE TABLE / Neo4j key constraints")
+    load_parser.add_argument('--truncate', action='store_true', help="Empty PostgreSQL tables before copying")
+    load_parser.set_defaults(func=load_dataset_command)
+
+    export_parser = subparsers.add_parser('export', help="Export the results store in the experiment CSV layout")
+    export_parser.add_argument('--out', default="DBMS Experiment Data.csv", help="CSV file to write")
+    export_parser.add_argument('--results-dir', help="Results store directory (default: config.RESULTS_DIRECTORY)")
+    export_parser.add_argument('--include-factors', action='store_true',
+                               help="Also write variant, cache/fetch/connection mode, run and hardware columns")
+    export_parser.set_defaults(func=export_command)
+
+    generate_parser = subparsers.add_parser('generate', help="Generate the financial dataset at a scale factor")
+    generate_parser.add_argument('--scale', type=float, default=1.0, help="Multiple of the original row counts")
+    generate_parser.add_argument('--out-dir', default='data', help="Directory for the <table>.csv files")
+    generate_parser.add_argument('--seed', type=int, help="Random seed (default: config.GENERATOR_SEED)")
+    generate_parser.add_argument('--table', nargs='+', help="Only generate these tables")
+    generate_parser.add_argument('--chunk-rows', type=int, help="Rows generated per chunk")
+    generate_parser.add_argument('--workers', type=int, help="Generator processes (default: CPU count)")
+    generate_parser.set_defaults(func=generate_command)
+
+    sweep_parser = subparsers.add_parser('sweep', help="Benchmark every backend across dataset scale factors")
+    sweep_parser.add_argument('--scale', type=float, nargs='+', default=[1, 10, 100],
+                              help="Scale factors to sweep (default: 1 10 100)")
+    sweep_parser.add_argument('--backend', nargs='+', choices=list(BACKENDS), default=list(BACKENDS),
+                              help="Backends to benchmark (default: all)")
+    sweep_parser.add_argument('--out-dir', default='data/sweep', help="Where generated data, CSV and plot go")
+    sweep_parser.add_argument('--iterations', type=int, help="Timed executions per query")
+    sweep_parser.add_argument('--warmup', type=int, help="Executions per query before timing")
+    sweep_parser.add_argument('--seed', type=int, help="Random seed (default: config.GENERATOR_SEED)")
+    sweep_parser.add_argument('--capture-plans', action='store_true', default=None,
+                              help="Record every query's plan to report plan changes between scale factors")
+    sweep_parser.set_defaults(func=sweep_command)
+
+    compare_parser = subparsers.add_parser('compare', help="Flag significant slowdowns between two benchmark runs")
+    compare_parser.add_argument('baseline', help="Results directory, Parquet/CSV file, or run id of the reference run")
+    compare_parser.add_argument('candidate', help="Results directory, Parquet/CSV file, or run id of the run under test")
+    compare_parser.add_argument('--results-dir', help="Results store for run ids (default: config.RESULTS_DIRECTORY)")
+    compare_parser.add_argument('--by', nargs='+', metavar='COLUMN',
+                                help="Extra columns that split cells, e.g. --by Variant Fetch_Mode")
+    compare_parser.add_argument('--threshold', type=float,
+                                help="Relative slowdown that counts as a regression (default: config.REGRESSION_THRESHOLD)")
+    compare_parser.add_argument('--confidence', type=float, help="Confidence level (default: config.CONFIDENCE_LEVEL)")
+    compare_parser.add_argument('--resamples', type=int, help="Bootstrap resamples (default: config.BOOTSTRAP_RESAMPLES)")
+    compare_parser.add_argument('--seed', type=int, default=0, help="Bootstrap seed")
+    compare_parser.add_argument('--report', type=report_path, metavar='PATH',
+                                help="Also write the comparison of every cell to a .json or .parquet file")
+    compare_parser.set_defaults(func=compare_command)
+
+    analyze_parser = subparsers.add_parser('analyze', help="ANOVA of recorded response times")
+    analyze_parser.add_argument('source', nargs='?',
+                                help="Results directory, Parquet/CSV file such as 'DBMS Experiment Data.csv', "
+                                     "or run id (default: config.RESULTS_DIRECTORY)")
+    analyze_parser.add_argument('--results-dir', help="Results store for run ids (default: config.RESULTS_DIRECTORY)")
+    analyze_parser.add_argument('--factors', nargs='+', metavar='COLUMN',
+                                help="Factor columns (default: Database Query Computer)")
+    analyze_parser.add_argument('--ss-type', type=int, choices=[2, 3], default=3,
+                                help="Type II or Type III sums of squares (default: 3)")
+    analyze_parser.add_argument('--report', type=report_path, metavar='PATH',
+                                help="Also write the ANOVA table to a .json or .parquet file")
+    analyze_parser.set_defaults(func=analyze_command)
+
+    verify_parser = subparsers.add_parser('verify', help="Check that the backends return the same query results")
+    verify_parser.add_argument('--backend', nargs='+', choices=list(BACKENDS), default=list(BACKENDS),
+                               help="Backends to compare, the first one is the reference (default: all)")
+    verify_parser.add_argument('--query', nargs='+', metavar='NAME', help="Only verify these queries")
+    verify_parser.add_argument('--seed', type=int, help="Seed for query template parameters")
+    verify_parser.add_argument('--parameterized', action='store_true',
+                               help="Also verify the parameterized query templates in queries/parameterized/ (see params.py)")
+    verify_parser.set_defaults(func=verify_command)
+
+    orchestrate_parser = subparsers.add_parser('orchestrate',
+                                               help="Run the experiment on several computers in parallel")
+    orchestrate_parser.add_argument('targets', help="JSON file mapping each Computer to its backends' connection "
+                                                    "settings (see orchestrate.load_targets)")
+    orchestrate_parser.add_argument('--backend', nargs='+', choices=list(BACKENDS),
+                                    help="Only run these backends (default: every backend in the targets file)")
+    orchestrate_parser.add_argument('--query', nargs='+', metavar='NAME', help="Only run these queries")
+    orchestrate_parser.add_argument('--iterations', type=int, help="Replications per computer, backend and query")
+    orchestrate_parser.add_argument('--warmup', type=int, help="Executions per query before timing")
+    orchestrate_parser.add_argument('--workers', type=int, help="Worker processes (default: one per computer)")
+    orchestrate_parser.add_argument('--results-dir', help="Results store directory (default: config.RESULTS_DIRECTORY)")
+    orchestrate_parser.add_argument('--anova', action='store_true',
+                                    help="Print the Database x Query x Computer ANOVA of the merged runs")
+    orchestrate_parser.set_defaults(func=orchestrate_command)
+
+    plans_parser = subparsers.add_parser('plans', help="List query plan changes recorded in the results store")
+    plans_parser.add_argument('--results-dir', help="Results store directory (default: config.RESULTS_DIRECTORY)")
+    plans_parser.add_argument('--database', nargs='+', metavar='NAME', help="Only these databases, e.g. PostgreSQL")
+    plans_parser.add_argument('--query', nargs='+', metavar='NAME', help="Only these queries")
+    plans_parser.set_defaults(func=plans_command)
+
+    profile_parser = subparsers.add_parser('profile', help="Measure and profile the client-side time of every query")
+    profile_parser.add_argument('--backend', nargs='+', choices=list(BACKENDS), default=list(BACKENDS),
+                                help="Backends to profile (default: all)")
+    profile_parser.add_argument('--query', nargs='+', metavar='NAME', help="Only profile these queries")
+    profile_parser.add_argument('--iterations', type=int,
+                                help="Executions per query, with and without the profiler "
+                                     "(default: config.PROFILE_ITERATIONS)")
+    profile_parser.add_argument('--profiler', choices=['sampling', 'cprofile'],
+                                help="Stack sampling (collapsed stacks for flamegraph.pl) or cProfile "
+                                     "(pstats files) (default: config.PROFILER)")
+    profile_parser.add_argument('--interval', type=float, metavar='SECONDS',
+                                help="Seconds between stack samples (default: config.PROFILE_SAMPLE_INTERVAL)")
+    profile_parser.add_argument('--out-dir', help="Directory for the profiles (default: config.PROFILE_DIRECTORY)")
+    profile_parser.add_argument('--parameterized', action='store_true',
+                                help="Also profile the parameterized query templates in queries/parameterized/ (see params.py)")
+    profile_parser.add_argument('--no-decoding', action='store_true',
+                                help="Skip comparing result decoding strategies (psycopg2/psycopg 3, "
+                                     "Neo4j records/values()/data()/to_df())")
+    profile_parser.set_defaults(func=profile_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+import contextlib
+import math
+import os
+import resource
+import statistics
+import sys
+import time
+
+import config
+from backends import get_backend, query_parameters
+from histogram import LatencyHistogram, NANOSECONDS
+from instrumentation import split_phases, summarize_phases, summarize_throughput
+from steadystate import is_steady, count_outliers, median_interval, relative_interval_width
+
+# Subdirectory of the query directory with the parameterized query templates
+PARAMETERIZED_DIRECTORY = 'parameterized'
+
+
+def load_queries(dialect, directory=None, parameterized=False):
+    """
+    Load the benchmark queries for one dialect
+
+    Every file in <directory>/<dialect>/ is one query; a file named query1.sql
+    is reported as "Query 1", matching the Query column of the experiment data.
+    With parameterized, the query templates in <directory>/parameterized/<dialect>/
+    (see params.py) follow; they are left out of the experiment otherwise.
+
+    Returns:
+    list: (name, query text) tuples ordered by file name
+    """
+    directory = directory or config.QUERY_DIRECTORY
+    query_dirs = [os.path.join(directory, dialect)]
+    if parameterized:
+        query_dirs.append(os.path.join(directory, PARAMETERIZED_DIRECTORY, dialect))
+    queries = []
+    for query_dir in query_dirs:
+        for filename in sorted(os.listdir(query_dir)):
+            stem, _ = os.path.splitext(filename)
+            if stem.startswith('.'):
+                continue
+            with open(os.path.join(query_dir, filename)) as f:
+                queries.append((query_name(stem), f.read()))
+    return queries
+
+
+def query_name(stem):
+    # "query1" -> "Query 1"; anything else is used as-is
+    if stem.lower().startswith('query') and stem[5:].isdigit():
+        return f"Query {int(stem[5:])}"
+    return stem
+
+
+def peak_rss_mb():
+    # Peak resident set size of this process: VmHWM on Linux, which start_rss_window
+    # can reset, otherwise ru_maxrss (KB on Linux, bytes on macOS) since it started
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def start_rss_window():
+    # Reset the kernel's peak RSS so the next peak_rss_mb covers only what follows, and
+    # return the RSS in MB to measure growth from; None where the peak can't be reset
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def end_rss_window(start_rss):
+    # Client memory a query cost: 'peak_rss_mb' while it ran and 'rss_growth_mb' over
+    # the RSS before it. Without a window the peak is the process's and growth is None
+    peak = peak_rss_mb()
+    return {'peak_rss_mb': peak, 'rss_growth_mb': peak - start_rss if start_rss is not None else None}
+
+
+def timed_acquire(backend):
+    # Nanoseconds spent getting a connection/session for the next execution
+    start_time = time.perf_counter_ns()
+    backend.acquire()
+    return time.perf_counter_ns() - start_time
+
+
+def time_execution(backend, query, params=None):
+    # Wall-clock nanoseconds for one execution, including fetching every row
+    backend.acquire()
+    try:
+        start_time = time.perf_counter_ns()
+        backend.execute(query, params)
+        return time.perf_counter_ns() - start_time
+    finally:
+        backend.release()
+
+
+def time_query(backend, query, iterations, warmup=0, cold=False, auto_warmup=False, explain_every=0,
+               parameters=None):
+    """
+    Time repeated executions of one query
+
+    In cold mode the backend drops its caches before every timed execution.
+    Otherwise the query first runs `warmup` times, and with auto_warmup keeps
+    running until latency is steady (see steadystate.is_steady) or
+    config.MAX_WARMUP_ITERATIONS is reached. Warmup executions are timed but
+    kept apart from the measured ones.
+
+    With explain_every=N, iterations 0, N, 2N, ... are preceded by an untimed
+    Backend.explain run whose server timings split the following executions.
+
+    Getting the connection (Backend.acquire) is timed on its own and is not
+    part of the measured execution times.
+
+    For a query template, parameters is a function returning fresh values,
+    drawn before every execution outside the timing.
+
+    Returns:
+    dict: 'times' (measured times in seconds), 'histogram' (LatencyHistogram of
+    the same times in ns), 'connect_histogram' (acquire latency in ns),
+    'warmup_times', 'phases' (instrumentation.split_phases per measured execution)
+    and 'intervals' (perf_counter_ns start and end of every measured execution)
+    """
+    warmup_times = []
+    if not cold:
+        while len(warmup_times) < warmup or (
+                auto_warmup and len(warmup_times) < config.MAX_WARMUP_ITERATIONS
+                and not is_steady(warmup_times, config.STEADY_STATE_WINDOW, config.STEADY_STATE_TOLERANCE)):
+            params = parameters() if parameters else None
+            warmup_times.append(time_execution(backend, query, params) / NANOSECONDS)
+
+    times = []  # Store execution times for the current query
+    phases = []
+    histogram = LatencyHistogram()
+    connect_histogram = LatencyHistogram()
+    intervals = []
+    sampled = None
+    for i in range(iterations):
+        params = parameters() if parameters else None
+        connect_ns = timed_acquire(backend)
+        try:
+            if explain_every and i % explain_every == 0:
+                sampled = backend.explain(query, params)
+            if cold:
+                backend.drop_caches()
+                if backend.result_cache is not None:
+                    backend.result_cache.invalidate()
+            start_ns = time.perf_counter_ns()
+            measurement = backend.execute_measured(query, params)
+            intervals.append((start_ns, time.perf_counter_ns()))
+        finally:
+            backend.release()
+        measurement['connect_ns'] = connect_ns
+        connect_histogram.record(connect_ns)
+        histogram.record(measurement['total_ns'])
+        times.append(measurement['total_ns'] / NANOSECONDS)
+        phases.append(split_phases(measurement, measurement['server'] or sampled))
+    return {'times': times, 'histogram': histogram, 'connect_histogram': connect_histogram,
+            'warmup_times': warmup_times, 'phases': phases, 'intervals': intervals}
+
+
+def summarize_times(times):
+    histogram = LatencyHistogram()
+    for seconds in times:
+        histogram.record_seconds(seconds)
+    return histogram.summary()
+
+
+def parameter_generator(backend, queries, seed=None):
+    """ParameterGenerator over the backend's data, or None when no query takes parameters"""
+    if not any(query_parameters(backend.dialect, query) for _, query in queries):
+        return None
+    from params import ParameterGenerator
+
+    backend.acquire()
+    try:
+        return ParameterGenerator.from_backend(backend, seed)
+    finally:
+        backend.release()
+
+
+def capture_plan(backend, name, query, parameters):
+    # One extra, untimed execution after the timing loop; a failure costs the plan, not the run
+    from plans import capture
+
+    backend.acquire()
+    try:
+        return capture(backend, query, parameters() if parameters else None)
+    except Exception as e:
+        print(f"Could not capture the plan of {name}: {e}")
+        return None
+    finally:
+        backend.release()
+
+
+def telemetry_sampler(backend, interval):
+    # The sampler gets its own persistent connection to the same server
+    from telemetry import TelemetrySampler
+
+    return TelemetrySampler(type(backend)(backend.settings, connection_mode='persistent'), interval)
+
+
+def ingest_stream(backend, rate, batch_size=None, method=None):
+    # The writer gets its own persistent connection, like the telemetry sampler
+    from ingest import IngestStream
+
+    return IngestStream(type(backend)(backend.settings, connection_mode='persistent'), rate, batch_size, method)
+
+
+def run_benchmark(backend, queries=None, iterations=None, warmup=None, cold=False, auto_warmup=False,
+                  prewarm=False, explain_every=None, telemetry_interval=None, ingest_rate=None,
+                  ingest_batch_size=None, ingest_method=None, target_width=None, time_budget=None,
+                  capture_plans=None):
+    """
+    Run every query against a connected backend
+
+    Parameters:
+    backend: connected Backend instance
+    queries: (name, query text) tuples, defaults to the backend's query files
+    iterations: timed executions per query, defaults to config.NUMBER_ITERATIONS
+    warmup: executions per query before timing, defaults to config.WARMUP_ITERATIONS
+    cold: drop the backend's caches before every timed execution
+    auto_warmup: extend the warmup until latency is steady
+    prewarm: load the tables into the server's buffer cache first (warm mode only)
+    explain_every: sample server timings with EXPLAIN ANALYZE every N iterations,
+    defaults to config.EXPLAIN_SAMPLE_INTERVAL (0 disables sampling)
+
+    Query templates get parameters drawn from the loaded data (see params.py)
+    for every execution.
+
+    With telemetry_interval (defaults to config.TELEMETRY_INTERVAL, which is
+    off; 0 turns it off too) a background thread samples server and client resource counters
+    and every result gets 'telemetry', one dict of metrics per measured
+    execution (see telemetry.attach).
+
+    With ingest_rate, new transactions are appended at that many rows per
+    second while the queries run (see ingest.IngestStream); every result
+    gets 'workload' and the stream's 'ingest' summary.
+
+    With target_width, replication is adaptive: every query starts with
+    `iterations` executions (defaults to config.ADAPTIVE_MIN_ITERATIONS) and
+    more go to the query whose median is least certain until each median's
+    confidence interval is narrower than target_width (relative to the
+    median) or time_budget seconds (defaults to config.ADAPTIVE_TIME_BUDGET)
+    are spent; results gain 'adaptive' with the interval reached.
+
+    Returns:
+    list: one result dict per query with its raw times, latency histogram and
+    summary statistics (mean, stdev, max and p50/p95/p99/p99.9). The 'cold'
+    entry summarizes cold executions: the warmup runs in warm mode, or every
+    run in cold mode. 'phases' splits every measured execution into planning,
+    execution, transfer and fetch time, and 'connect' summarizes the time spent
+    getting a connection before each execution; 'rows_per_s', 'mb_per_s',
+    'peak_rss_mb' (client peak RSS while the query's iterations ran) and
+    'rss_growth_mb' (that peak over the RSS before them) show what moving the
+    result cost. Only Linux can reset the peak between queries; elsewhere
+    'peak_rss_mb' is the process peak and 'rss_growth_mb' is None.
+    With capture_plans (defaults to config.CAPTURE_PLANS, which is off),
+    'plan' holds the query's plan (see plans.capture).
+    A backend with a result cache adds its 'result_cache' hit/miss counters.
+    """
+    if queries is None:
+        queries = load_queries(backend.dialect)
+    if iterations is None:
+        iterations = config.ADAPTIVE_MIN_ITERATIONS if target_width else config.NUMBER_ITERATIONS
+    warmup = warmup if warmup is not None else config.WARMUP_ITERATIONS
+    explain_every = explain_every if explain_every is not None else config.EXPLAIN_SAMPLE_INTERVAL
+
+    if prewarm and not cold:
+        backend.acquire()
+        try:
+            backend.prewarm()
+        finally:
+            backend.release()
+
+    adaptive = None
+    if target_width:
+        budget = time_budget if time_budget is not None else config.ADAPTIVE_TIME_BUDGET
+        adaptive = {'target_width': target_width, 'deadline_ns': time.perf_counter_ns() + int(budget * NANOSECONDS)}
+
+    capture_plans = capture_plans if capture_plans is not None else config.CAPTURE_PLANS
+    telemetry_interval = telemetry_interval if telemetry_interval is not None else config.TELEMETRY_INTERVAL
+    sampler = telemetry_sampler(backend, telemetry_interval) if telemetry_interval else None
+    stream = ingest_stream(backend, ingest_rate, ingest_batch_size, ingest_method) if ingest_rate else None
+    # Telemetry starts first and stops last, so it also covers the writer's ramp-up and cleanup
+    with contextlib.ExitStack() as stack:
+        for background in (sampler, stream):
+            if background is not None:
+                stack.enter_context(background)
+        results = run_queries(backend, queries, iterations, warmup, cold, auto_warmup, explain_every, adaptive,
+                              capture_plans)
+
+    if sampler is not None:
+        from telemetry import attach
+
+        attach(results, sampler.samples)
+        for result in results:
+            result['telemetry_interval'] = telemetry_interval
+            result['telemetry_overhead_ms'] = sampler.overhead_ms()
+    if stream is not None:
+        ingest = stream.summary()
+        for result in results:
+            result['workload'] = f"ingest {ingest_rate:g} rows/s"
+            result['ingest'] = ingest
+    return results
+
+
+def extend_timing(timing, more):
+    # Append a further batch of measured executions (no warmup) to a time_query result
+    timing['times'] += more['times']
+    timing['histogram'].merge(more['histogram'])
+    timing['connect_histogram'].merge(more['connect_histogram'])
+    timing['phases'] += more['phases']
+    timing['intervals'] += more['intervals']
+
+
+def add_cache_counters(total, counters):
+    for key in ('hits', 'misses', 'invalidations'):
+        total[key] = total.get(key, 0) + counters[key]
+    total['entries'] = counters['entries']
+
+
+def replicate_adaptively(backend, queries, timings, samplers, cold, explain_every, adaptive, cache_counters):
+    """
+    Spend the rest of the time budget where the medians are least certain
+
+    Each round picks the query with the widest relative confidence interval
+    on its median and runs it again. As the width shrinks with 1/sqrt(n), a
+    round asks for the executions the target needs, at most doubling the
+    query's samples and never more than the remaining budget affords at its
+    median latency. Queries at config.ADAPTIVE_MAX_ITERATIONS, or too slow for
+    what is left of the budget, are not picked again.
+    """
+    query_text = dict(queries)
+    target = adaptive['target_width']
+    finished = set()
+    while True:
+        remaining_s = (adaptive['deadline_ns'] - time.perf_counter_ns()) / NANOSECONDS
+        if remaining_s <= 0:
+            return
+        widths = {name: relative_interval_width(timing['times'], config.CONFIDENCE_LEVEL)
+                  for name, timing in timings.items() if name not in finished}
+        widths = {name: width for name, width in widths.items() if width > target}
+        if not widths:
+            return
+        name = max(widths, key=widths.get)
+        times = timings[name]['times']
+        n = len(times)
+        wanted = n if math.isinf(widths[name]) else math.ceil(n * (widths[name] / target) ** 2) - n
+        median = statistics.median(times)
+        affordable = int(remaining_s / median) if median > 0 else wanted
+        batch = min(wanted, n, affordable, config.ADAPTIVE_MAX_ITERATIONS - n)
+        if batch < 1:
+            finished.add(name)
+            continue
+        extend_timing(timings[name], time_query(backend, query_text[name], batch, 0, cold, False, explain_every,
+                                                samplers[name]))
+        if backend.result_cache is not None:
+            add_cache_counters(cache_counters[name], backend.result_cache.take_counters())
+
+
+def run_queries(backend, queries, iterations, warmup, cold, auto_warmup, explain_every, adaptive=None,
+                capture_plans=False):
+    # The timing loop of run_benchmark, one result dict per query
+    generator = parameter_generator(backend, queries)
+    samplers = {name: generator.sampler(backend.dialect, query) if generator else None for name, query in queries}
+    timings = {}
+    cache_counters = {name: {} for name, _ in queries}
+    memory = {}
+    for name, query in queries:
+        start_rss = start_rss_window()
+        timings[name] = time_query(backend, query, iterations, warmup, cold, auto_warmup, explain_every,
+                                   samplers[name])
+        memory[name] = end_rss_window(start_rss)
+        if backend.result_cache is not None:
+            add_cache_counters(cache_counters[name], backend.result_cache.take_counters())
+    if adaptive:
+        replicate_adaptively(backend, queries, timings, samplers, cold, explain_every, adaptive, cache_counters)
+
+    results = []
+    for name, query in queries:
+        timing = timings[name]
+        histogram = timing['histogram']
+        warmup_times = timing['warmup_times']
+        result = {
+            'database': backend.name,
+            'name': name,
+            'query': query,
+            'cache_mode': 'cold' if cold else 'warm',
+            'times': timing['times'],
+            'histogram': histogram,
+            'warmup_times': warmup_times,
+            'outliers': count_outliers(timing['times']),
+            'phases': timing['phases'],
+            'intervals': timing['intervals'],
+            'phase_means': summarize_phases(timing['phases']),
+            'fetch_mode': backend.fetch_mode,
+            'connection_mode': backend.connection_mode,
+            'statement_mode': backend.statement_mode,
+            'connect': timing['connect_histogram'].summary(),
+        }
+        result.update(memory[name])
+        result.update(summarize_throughput(timing['phases']))
+        result.update(histogram.summary())
+        if cold:
+            result['cold'] = histogram.summary()
+        else:
+            result['cold'] = summarize_times(warmup_times) if warmup_times else None
+        if backend.result_cache is not None:
+            result['result_cache'] = cache_counters[name]
+        if adaptive:
+            width = relative_interval_width(timing['times'], config.CONFIDENCE_LEVEL)
+            result['adaptive'] = {'interval': median_interval(timing['times'], config.CONFIDENCE_LEVEL),
+                                  'relative_width': width, 'target_width': adaptive['target_width'],
+                                  'confidence': config.CONFIDENCE_LEVEL,
+                                  'converged': width <= adaptive['target_width']}
+        if capture_plans:
+            result['plan'] = capture_plan(backend, name, query, samplers[name])
+        results.append(result)
+    return results
+
+
+def record_results(results, record=None):
+    # Append to the results store instead of transcribing times by hand
+    record = record if record is not None else config.RECORD_RESULTS
+    if not record or not results:
+        return None
+    from resultstore import append_results, new_run_id, read_plans
+
+    run_id = new_run_id()
+    path = append_results(results, run_id)
+    print(f"Results recorded to {path}")
+    if any(result.get('plan') for result in results):
+        from plans import plan_changes
+        from utils import display_plan_changes
+
+        # Only the changes this run introduced, against the latest earlier plan of each query
+        changes = [change for change in plan_changes(read_plans()) if change['after']['Run_Id'] == run_id]
+        if changes:
+            print(f"Warning: {len(changes)} query plan(s) changed since the previous run")
+            display_plan_changes(changes, config.PLAN_MISESTIMATE_FACTOR)
+    return path
+
+
+def run_queries_and_analyze(backend_key, query_names=None, iterations=None, warmup=None, cold=False,
+                            auto_warmup=False, prewarm=False, explain_every=None, fetch_mode=None,
+                            fetch_size=None, connection_mode=None, statement_mode=None, telemetry_interval=None,
+                            ingest_rate=None, ingest_batch_size=None, ingest_method=None, target_width=None,
+                            time_budget=None, parameterized=False, capture_plans=None, record=None):
+    # Imported here so callers that only need the engine don't pull in prettytable
+    from utils import display_results, display_phases, display_telemetry, display_mixed_workload, display_adaptive
+
+    backend = get_backend(backend_key, fetch_mode=fetch_mode, fetch_size=fetch_size,
+                          connection_mode=connection_mode, statement_mode=statement_mode)
+    print(f"===== {backend.name} Query Performance Analysis =====")
+
+    queries = load_queries(backend.dialect, parameterized=parameterized)
+    if query_names:
+        queries = [(name, query) for name, query in queries if name in query_names]
+
+    results = []
+    mixed = []
+    try:
+        backend.connect()
+        print(f"Connected to the {backend.name} database successfully.")
+        results = run_benchmark(backend, queries, iterations, warmup, cold, auto_warmup, prewarm, explain_every,
+                                telemetry_interval, target_width=target_width, time_budget=time_budget,
+                                capture_plans=capture_plans)
+        if ingest_rate:
+            # The read-only pass is the baseline the same queries under ingestion are compared with
+            print(f"Repeating the queries while inserting {ingest_rate:g} transactions/s")
+            mixed = run_benchmark(backend, queries, iterations, warmup, cold, auto_warmup, False, explain_every,
+                                  telemetry_interval, ingest_rate, ingest_batch_size, ingest_method, target_width,
+                                  time_budget, capture_plans)
+
+    except Exception as e:
+        print(f"Error occurred: {e}")
+
+    finally:
+        backend.close()
+        print(f"{backend.name} database connection closed.")
+
+    # Display results in a table
+    results += mixed
+    display_results(results)
+    display_phases(results)
+    display_telemetry(results)
+    display_adaptive(results)
+    if mixed:
+        display_mixed_workload(results)
+
+    record_results(results, record)
+    return results
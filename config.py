@@ -4,8 +4,125 @@ POSTGRES_PASSWORD = 'postgres'
 POSTGRES_HOST = 'localhost'
 POSTGRES_PORT = '5432'
 
+TIMESCALE_DBNAME = 'financial'
+TIMESCALE_USERNAME = 'postgres'
+TIMESCALE_PASSWORD = 'postgres'
+TIMESCALE_HOST = 'localhost'
+TIMESCALE_PORT = '5433'
+
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "neo4j_password"
 
-NUMBER_ITERATIONS = 10
\ No newline at end of file
+NUMBER_ITERATIONS = 10
+WARMUP_ITERATIONS = 0
+
+# Automatic warmup keeps executing until the median of the last
+# STEADY_STATE_WINDOW runs is within STEADY_STATE_TOLERANCE of the window
+# before it, or MAX_WARMUP_ITERATIONS is reached
+STEADY_STATE_WINDOW = 3
+STEADY_STATE_TOLERANCE = 0.1
+MAX_WARMUP_ITERATIONS = 30
+
+# Run EXPLAIN (ANALYZE, BUFFERS) before every Nth timed iteration to split
+# PostgreSQL timings into planning and execution; 0 turns sampling off
+EXPLAIN_SAMPLE_INTERVAL = 0
+
+# Run every query once more after timing it to record its plan (EXPLAIN
+# ANALYZE / PROFILE), so plan changes between runs can be told apart from
+# noise. Off by default since it adds an execution per query (--capture-plans)
+CAPTURE_PLANS = False
+
+# Plan operators whose estimated and actual row counts differ by this factor
+# or more are flagged as misestimates
+PLAN_MISESTIMATE_FACTOR = 10
+
+# Seconds between background samples of server and client resource counters
+# (pg_stat_*, Neo4j JMX, /proc) taken while queries run. Off (None) by default:
+# the sampler's connection and thread share the host with the timed queries
+TELEMETRY_INTERVAL = None
+
+# Client-side result cache (resultcache.py) used by the 'client result cache'
+# variant: entries kept, seconds before an entry expires, and seconds between
+# checks of the server's data version (negative turns the check off)
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = 60.0
+RESULT_CACHE_VERSION_INTERVAL = 1.0
+
+# 'buffered' loads each result fully into memory (cursor.fetchall()),
+# 'stream' pulls FETCH_SIZE rows per round trip through a server-side cursor
+FETCH_MODE = 'buffered'
+FETCH_SIZE = 2000
+
+# 'persistent' keeps one connection for the whole run, 'pooled' borrows one
+# from a pool around every execution, 'connect' opens a new one every time
+CONNECTION_MODE = 'persistent'
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 10
+NEO4J_MAX_POOL_SIZE = 100
+
+# 'simple' sends parameter values as literals, so every execution is planned;
+# 'prepared' reuses a server-side plan (PostgreSQL PREPARE/EXECUTE, Cypher $params)
+STATEMENT_MODE = 'simple'
+# Query template parameters are drawn from the loaded data (params.py)
+PARAMETER_SEED = 0
+PARAMETER_DATE_WINDOW_DAYS = 90
+
+# Chunk interval for the TimescaleDB hypertable schema variant
+TIMESCALE_CHUNK_INTERVAL = '1 month'
+
+# Results store: every run appends its own Parquet file here. COMPUTER_NAME is
+# the Computer factor of the experiment (defaults to the host name).
+RECORD_RESULTS = True
+RESULTS_DIRECTORY = 'results'
+COMPUTER_NAME = None
+
+QUERY_DIRECTORY = 'queries'
+SCHEMA_DIRECTORY = 'schema'
+
+# Dataset loading: <DATASET_DIRECTORY>/<table>.csv with a header row
+DATASET_DIRECTORY = 'data'
+DATASET_DELIMITER = ','
+LOAD_WORKERS = 4
+LOAD_BATCH_SIZE = 10000
+PROGRESS_INTERVAL = 5
+
+# Mixed read/write workload (ingest.py): rows per insert batch, 'copy' or
+# 'insert' on PostgreSQL (Neo4j always uses UNWIND), and whether the inserted
+# transactions are deleted again after the run
+INGEST_BATCH_SIZE = 1000
+INGEST_METHOD = 'copy'
+INGEST_CLEANUP = True
+
+# Adaptive replication (bench.py run --target-ci-width): queries start with
+# ADAPTIVE_MIN_ITERATIONS executions (8 is the least giving a 95% interval on
+# the median), then the least certain ones get more until every median is
+# known to the target width, a query reaches ADAPTIVE_MAX_ITERATIONS, or
+# ADAPTIVE_TIME_BUDGET seconds per backend run are spent
+ADAPTIVE_MIN_ITERATIONS = 8
+ADAPTIVE_MAX_ITERATIONS = 10000
+ADAPTIVE_TIME_BUDGET = 600
+
+# Client-side profiling (bench.py profile): 'sampling' reads the benchmark
+# thread's stack every PROFILE_SAMPLE_INTERVAL seconds and writes collapsed
+# stacks for flamegraph.pl, 'cprofile' writes pstats files; both go to
+# PROFILE_DIRECTORY, and the report lists each query's hottest functions
+PROFILER = 'sampling'
+PROFILE_SAMPLE_INTERVAL = 0.001
+PROFILE_ITERATIONS = 20
+PROFILE_DIRECTORY = 'profiles'
+PROFILE_TOP_FUNCTIONS = 5
+
+# Synthetic data generation (datagen.py)
+GENERATOR_SEED = 42
+GENERATOR_CHUNK_ROWS = 500000
+
+# Regression detection (bench.py compare)
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE_LEVEL = 0.95
+REGRESSION_THRESHOLD = 0.05  # Flag a slowdown only if it is significantly more than 5%
+
+# Cross-backend result verification (bench.py verify)
+CORRECTNESS_SIGNIFICANT_DIGITS = 10  # Numbers are compared at this precision
+CORRECTNESS_SAMPLE_BUCKETS = 4  # Of 256 hash buckets, re-read this many to sample mismatching rows
+CORRECTNESS_SAMPLE_ROWS = 5  # Mismatching rows shown per side
\ No newline at end of file
@@ -0,0 +1,203 @@
+import collections
+import datetime
+import decimal
+import hashlib
+import re
+
+import config
+from backends import get_backend
+from benchmark import load_queries, parameter_generator
+
+# Row hashes are summed per bucket (the hash's low byte), so a mismatch can be
+# narrowed down to a few buckets and only those rows are looked at again
+BUCKETS = 256
+HASH_BITS = 128
+HASH_MASK = (1 << HASH_BITS) - 1
+
+NUMBER = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+
+# Results are compared column by column in the PostgreSQL query's order. For
+# queries whose other dialects return their columns in another order, the
+# position of each of those columns in that dialect's rows
+COLUMN_ORDER = {
+    'neo4j': {
+        # client_id, year, week, earliest_transaction_date, total_amount
+        'Query 3': (0, 3, 4, 2, 1),
+    },
+}
+
+
+def normalize_value(value):
+    """
+    One canonical string per value, whichever driver returned it
+
+    Numbers (including numeric strings, as the Neo4j import stores most
+    properties as text) keep config.CORRECTNESS_SIGNIFICANT_DIGITS digits so
+    NUMERIC and float aggregates agree; dates and temporal values become ISO
+    dates/times.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str):
+        value = value.strip()
+        if not NUMBER.match(value):
+            return value
+    if isinstance(value, (str, int, float, decimal.Decimal)):
+        number = float(value)
+        if number.is_integer() and abs(number) < 2 ** 53:
+            return str(int(number))
+        return format(number, f".{config.CORRECTNESS_SIGNIFICANT_DIGITS}g")
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, 'iso_format'):  # neo4j.time types
+        return value.iso_format()
+    return str(value)
+
+
+def normalize_row(row, columns=None):
+    # columns picks the row's values in the shared order (see COLUMN_ORDER); None keeps them as returned
+    if columns is not None:
+        row = [row[position] for position in columns]
+    return tuple(normalize_value(value) for value in row)
+
+
+def row_hash(row):
+    return int.from_bytes(hashlib.blake2b('\x1f'.join(row).encode(), digest_size=HASH_BITS // 8).digest(), 'little')
+
+
+class ResultDigest:
+    """
+    Order-independent digest of a result: row count plus per-bucket sums of row hashes
+
+    Summing (rather than XOR-ing) keeps duplicate rows from cancelling out.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.counts = [0] * BUCKETS
+        self.sums = [0] * BUCKETS
+
+    def add(self, row, columns=None):
+        value = row_hash(normalize_row(row, columns))
+        bucket = value % BUCKETS
+        self.counts[bucket] += 1
+        self.sums[bucket] = (self.sums[bucket] + value) & HASH_MASK
+        self.rows += 1
+
+    def hexdigest(self):
+        return format(sum(self.sums) & HASH_MASK, '032x')
+
+    def differing_buckets(self, other):
+        return [bucket for bucket in range(BUCKETS)
+                if (self.counts[bucket], self.sums[bucket]) != (other.counts[bucket], other.sums[bucket])]
+
+
+def digest_rows(rows, columns=None):
+    digest = ResultDigest()
+    for row in rows:
+        digest.add(row, columns)
+    return digest
+
+
+def bucket_rows(rows, buckets, columns=None):
+    """Counter of the normalized rows that fall into the given buckets"""
+    buckets = set(buckets)
+    counter = collections.Counter()
+    for row in rows:
+        normalized = normalize_row(row, columns)
+        if row_hash(normalized) % BUCKETS in buckets:
+            counter[normalized] += 1
+    return counter
+
+
+def sample_mismatches(reference, other, query, params, buckets, columns=None):
+    """
+    Rows found on only one side, re-streaming both results once
+
+    Only rows in the first config.CORRECTNESS_SAMPLE_BUCKETS differing buckets
+    are held, so memory stays a small fraction of the result size.
+    """
+    buckets = buckets[:config.CORRECTNESS_SAMPLE_BUCKETS]
+    columns = columns or {}
+    reference_rows = bucket_rows(reference.iter_rows(query[reference.name], params[reference.name]), buckets,
+                                 columns.get(reference.name))
+    other_rows = bucket_rows(other.iter_rows(query[other.name], params[other.name]), buckets,
+                             columns.get(other.name))
+    samples = []
+    for backend, extra in ((reference, reference_rows - other_rows), (other, other_rows - reference_rows)):
+        for row in list(extra)[:config.CORRECTNESS_SAMPLE_ROWS]:
+            samples.append({'only_in': backend.name, 'row': row})
+    return samples
+
+
+def portable_parameters(params):
+    # ISO date strings compare with DATE columns in SQL and with the date strings in Neo4j alike
+    if params is None:
+        return None
+    return {name: value.isoformat() if isinstance(value, datetime.date) else value for name, value in params.items()}
+
+
+def verify_queries(backend_keys, query_names=None, seed=None, parameterized=False):
+    """
+    Check that every backend returns the same result for each query
+
+    Each backend's result is streamed once into a ResultDigest, its columns
+    put in the shared order of COLUMN_ORDER; the first backend is the reference. When a digest or row count differs, both results
+    are streamed again to sample rows that only one side returned. Query
+    templates get one set of parameters drawn from the reference backend's
+    data, shared by all backends.
+
+    Returns:
+    list: one dict per query with 'rows' and 'digests' per backend, 'params',
+    'matches', 'mismatches' (sampled rows) and 'errors'
+    """
+    backends = [get_backend(key, fetch_mode='stream', connection_mode='persistent', statement_mode='simple')
+                for key in backend_keys]
+    queries = {backend.name: dict(load_queries(backend.dialect, parameterized=parameterized)) for backend in backends}
+    names = [name for name in queries[backends[0].name]
+             if all(name in queries[backend.name] for backend in backends)]
+    if query_names:
+        names = [name for name in names if name in query_names]
+
+    reports = []
+    try:
+        # Inside the try, so the backends already connected are closed when a later one can't connect
+        for backend in backends:
+            backend.connect()
+        reference = backends[0]
+        generator = parameter_generator(reference, list(queries[reference.name].items()), seed)
+        for name in names:
+            query = {backend.name: queries[backend.name][name] for backend in backends}
+            sampler = generator.sampler(reference.dialect, query[reference.name]) if generator else None
+            shared = portable_parameters(sampler()) if sampler else None
+            params = {backend.name: shared for backend in backends}
+            columns = {backend.name: COLUMN_ORDER.get(backend.dialect, {}).get(name) for backend in backends}
+            report = {'name': name, 'params': shared, 'rows': {}, 'digests': {}, 'errors': {}, 'mismatches': []}
+            digests = {}
+            for backend in backends:
+                try:
+                    digests[backend.name] = digest_rows(backend.iter_rows(query[backend.name], shared),
+                                                        columns[backend.name])
+                    report['rows'][backend.name] = digests[backend.name].rows
+                    report['digests'][backend.name] = digests[backend.name].hexdigest()
+                except Exception as e:
+                    report['errors'][backend.name] = str(e)
+            if reference.name in digests:
+                for other in backends[1:]:
+                    if other.name not in digests:
+                        continue
+                    buckets = digests[reference.name].differing_buckets(digests[other.name])
+                    if not buckets:
+                        continue
+                    try:
+                        report['mismatches'] += sample_mismatches(reference, other, query, params, buckets, columns)
+                    except Exception as e:
+                        report['errors'][other.name] = f"sampling the rows that differ from {reference.name}: {e}"
+            report['matches'] = not report['errors'] and len(set(report['digests'].values())) == 1
+            reports.append(report)
+    finally:
+        for backend in backends:
+            backend.close()
+    return reports
@@ -0,0 +1,225 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# Row counts of the original financial dataset at scale factor 1
+BASE_ROWS = {
+    'district': 77,
+    'account': 4500,
+    'client': 5369,
+    'disp': 5369,
+    'card': 892,
+    'loan': 682,
+    'order': 6471,
+    'trans': 1056320,
+}
+
+FIRST_DAY = np.datetime64('1993-01-01')
+LAST_DAY = np.datetime64('1998-12-31')
+
+REGIONS = ['Prague', 'central Bohemia', 'south Bohemia', 'west Bohemia', 'north Bohemia',
+           'east Bohemia', 'south Moravia', 'north Moravia']
+FREQUENCIES = (['POPLATEK MESICNE', 'POPLATEK TYDNE', 'POPLATEK PO OBRATU'], [0.92, 0.02, 0.06])
+TRANS_TYPES = (['PRIJEM', 'VYDAJ', 'VYBER'], [0.38, 0.60, 0.02])
+OPERATIONS = (['VYBER KARTOU', 'VKLAD', 'PREVOD Z UCTU', 'VYBER', 'PREVOD NA UCET', ''],
+              [0.01, 0.15, 0.06, 0.41, 0.20, 0.17])
+K_SYMBOLS = (['POJISTNE', 'SLUZBY', 'UROK', 'SANKC. UROK', 'SIPO', 'DUCHOD', 'UVER', ''],
+             [0.02, 0.15, 0.17, 0.001, 0.11, 0.03, 0.01, 0.509])
+BANKS = ['AB', 'CD', 'EF', 'GH', 'IJ', 'KL', 'MN', 'OP', 'QR', 'ST', 'UV', 'WX', 'YZ']
+
+
+def table_rows(table, scale):
+    # District is a fixed reference table; everything else grows with the scale factor
+    if table == 'district':
+        return BASE_ROWS[table]
+    return max(1, int(round(BASE_ROWS[table] * scale)))
+
+
+def random_dates(rng, size, first=FIRST_DAY, last=LAST_DAY):
+    days = (last - first).astype(int)
+    return first + rng.integers(0, days + 1, size).astype('timedelta64[D]')
+
+
+def choice(rng, options, size):
+    values, weights = options
+    weights = np.asarray(weights) / np.sum(weights)
+    return np.asarray(values)[rng.choice(len(values), size, p=weights)]
+
+
+def ids(start, size):
+    return np.arange(start + 1, start + size + 1, dtype=np.int64)
+
+
+def generate_district(rng, start, size, counts):
+    return pd.DataFrame({
+        'district_id': ids(start, size),
+        'a2': [f"District {i}" for i in ids(start, size)],
+        'a3': np.asarray(REGIONS)[rng.integers(0, len(REGIONS), size)],
+        'a4': rng.integers(40000, 1300000, size),
+        'a5': rng.integers(0, 140, size),
+        'a6': rng.integers(0, 70, size),
+        'a7': rng.integers(0, 20, size),
+        'a8': rng.integers(0, 5, size),
+        'a9': rng.integers(1, 12, size),
+        'a10': np.round(rng.uniform(33, 100, size), 1),
+        'a11': rng.integers(8000, 12600, size),
+        'a12': np.round(rng.uniform(0.2, 7.5, size), 2),
+        'a13': np.round(rng.uniform(0.4, 9.5, size), 2),
+        'a14': rng.integers(80, 170, size),
+        'a15': rng.integers(800, 86000, size),
+        'a16': rng.integers(800, 100000, size),
+    })
+
+
+def generate_account(rng, start, size, counts):
+    return pd.DataFrame({
+        'account_id': ids(start, size),
+        'district_id': rng.integers(1, counts['district'] + 1, size),
+        'frequency': choice(rng, FREQUENCIES, size),
+        'date': random_dates(rng, size, FIRST_DAY, np.datetime64('1997-12-31')),
+    })
+
+
+def generate_client(rng, start, size, counts):
+    return pd.DataFrame({
+        'client_id': ids(start, size),
+        'gender': np.where(rng.random(size) < 0.5, 'F', 'M'),
+        'birth_date': random_dates(rng, size, np.datetime64('1911-01-01'), np.datetime64('1987-12-31')),
+        'district_id': rng.integers(1, counts['district'] + 1, size),
+    })
+
+
+def generate_disp(rng, start, size, counts):
+    # Disposition i belongs to client i; the first one per account is its OWNER,
+    # the clients beyond the account count are DISPONENTs of random accounts
+    disp_ids = ids(start, size)
+    owner = disp_ids <= counts['account']
+    return pd.DataFrame({
+        'disp_id': disp_ids,
+        'client_id': disp_ids,
+        'account_id': np.where(owner, disp_ids, rng.integers(1, counts['account'] + 1, size)),
+        'type': np.where(owner, 'OWNER', 'DISPONENT'),
+    })
+
+
+def generate_card(rng, start, size, counts):
+    return pd.DataFrame({
+        'card_id': ids(start, size),
+        'disp_id': rng.integers(1, counts['disp'] + 1, size),
+        'type': choice(rng, (['classic', 'junior', 'gold'], [0.74, 0.16, 0.10]), size),
+        'issued': random_dates(rng, size, np.datetime64('1993-11-07'), LAST_DAY),
+    })
+
+
+def generate_loan(rng, start, size, counts):
+    amount = rng.integers(4980, 590820, size)
+    duration = rng.choice([12, 24, 36, 48, 60], size)
+    return pd.DataFrame({
+        'loan_id': ids(start, size),
+        'account_id': rng.integers(1, counts['account'] + 1, size),
+        'date': random_dates(rng, size, np.datetime64('1993-07-05'), LAST_DAY),
+        'amount': amount,
+        'duration': duration,
+        'payments': np.round(amount / duration, 2),
+        'status': choice(rng, (['A', 'B', 'C', 'D'], [0.30, 0.05, 0.59, 0.06]), size),
+    })
+
+
+def generate_order(rng, start, size, counts):
+    return pd.DataFrame({
+        'order_id': ids(start, size),
+        'account_id': rng.integers(1, counts['account'] + 1, size),
+        'bank_to': np.asarray(BANKS)[rng.integers(0, len(BANKS), size)],
+        'account_to': rng.integers(10000000, 99999999, size),
+        'amount': np.round(rng.lognormal(7.5, 1.0, size), 1),
+        'k_symbol': choice(rng, (['SIPO', 'UVER', 'POJISTNE', 'LEASING', ''], [0.55, 0.11, 0.08, 0.05, 0.21]), size),
+    })
+
+
+def generate_trans(rng, start, size, counts):
+    amount = np.round(rng.lognormal(7.6, 1.3, size), 1)
+    return pd.DataFrame({
+        'trans_id': ids(start, size),
+        'account_id': rng.integers(1, counts['account'] + 1, size),
+        'date': random_dates(rng, size),
+        'type': choice(rng, TRANS_TYPES, size),
+        'operation': choice(rng, OPERATIONS, size),
+        'amount': amount,
+        'balance': np.round(rng.uniform(-40000, 210000, size), 1),
+        'k_symbol': choice(rng, K_SYMBOLS, size),
+        'bank': np.where(rng.random(size) < 0.26, np.asarray(BANKS)[rng.integers(0, len(BANKS), size)], ''),
+        'account': np.where(rng.random(size) < 0.28, rng.integers(10000000, 99999999, size).astype(str), ''),
+    })
+
+
+GENERATORS = {
+    'district': generate_district,
+    'account': generate_account,
+    'client': generate_client,
+    'disp': generate_disp,
+    'card': generate_card,
+    'loan': generate_loan,
+    'order': generate_order,
+    'trans': generate_trans,
+}
+
+
+def generate_chunk(table, chunk, offset, size, seed, counts):
+    # One generator per (seed, table, chunk) keeps output reproducible whatever the worker count
+    rng = np.random.default_rng([seed, list(GENERATORS).index(table), chunk])
+    frame = GENERATORS[table](rng, offset, size, counts)
+    return frame.to_csv(index=False, header=offset == 0, sep=config.DATASET_DELIMITER)
+
+
+def generate_table(executor, table, out_dir, seed, counts, chunk_rows):
+    """Write one table as <out_dir>/<table>.csv, generating chunk_rows-row chunks in parallel"""
+    total = counts[table]
+    offsets = list(range(0, total, chunk_rows))
+    path = os.path.join(out_dir, f"{table}.csv")
+    start = time.perf_counter()
+    with open(path, 'w', newline='') as f:
+        # map() hands chunks back in order, so the file is written sequentially
+        for text in executor.map(generate_chunk, [table] * len(offsets), range(len(offsets)), offsets,
+                                 [min(chunk_rows, total - offset) for offset in offsets],
+                                 [seed] * len(offsets), [counts] * len(offsets)):
+            f.write(text)
+    return {'step': table, 'rows': total, 'seconds': time.perf_counter() - start}
+
+
+def generate_dataset(scale, out_dir, seed=None, tables=None, chunk_rows=None, workers=None):
+    """
+    Generate the financial dataset at a scale factor
+
+    Row counts are the original ones times `scale` (district stays at 77), and
+    keys stay consistent across tables, so the CSVs load with loader.load_dataset
+    and answer the benchmark queries. The same seed and chunk size always give
+    the same files, however many worker processes generate them.
+
+    Returns:
+    dict: per-table rows and seconds plus the totals, in loader.load_dataset's shape
+    """
+    seed = seed if seed is not None else config.GENERATOR_SEED
+    chunk_rows = chunk_rows or config.GENERATOR_CHUNK_ROWS
+    tables = tables or list(GENERATORS)
+    counts = {table: table_rows(table, scale) for table in GENERATORS}
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        steps = [generate_table(executor, table, out_dir, seed, counts, chunk_rows) for table in tables]
+    elapsed = time.perf_counter() - start
+    for step in steps:
+        step['rows_per_s'] = step['rows'] / step['seconds'] if step['seconds'] > 0 else 0.0
+    total_rows = sum(step['rows'] for step in steps)
+    return {
+        'database': f"Scale factor {scale:g}",
+        'steps': steps,
+        'rows': total_rows,
+        'seconds': elapsed,
+        'rows_per_s': total_rows / elapsed if elapsed > 0 else 0.0,
+    }
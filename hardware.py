@@ -0,0 +1,138 @@
+import hashlib
+import os
+import platform
+from urllib.parse import urlparse
+
+# Block devices that are not disks of their own
+VIRTUAL_DEVICES = ('loop', 'ram', 'zram', 'dm-', 'md', 'sr', 'nbd')
+
+LOCAL_HOSTS = {'', 'localhost', '127.0.0.1', '::1'}
+
+
+def parse_hardware(read, listdir):
+    """
+    CPU, memory and disk type of a Linux machine from its /proc and /sys files
+
+    Parameters:
+    read: function returning the text of a file
+    listdir: function returning the names in a directory
+
+    Returns:
+    dict: 'cpu_model', 'cpu_cores', 'ram_gb' and 'disk_type' ('nvme', 'ssd',
+    'hdd' or 'mixed'), None where a file could not be read
+    """
+    hardware = {'cpu_model': None, 'cpu_cores': None, 'ram_gb': None, 'disk_type': None}
+    try:
+        lines = read('/proc/cpuinfo').splitlines()
+        models = [line.split(':', 1)[1].strip() for line in lines if line.startswith('model name')]
+        hardware['cpu_model'] = models[0] if models else None
+        hardware['cpu_cores'] = sum(line.startswith('processor') for line in lines) or None
+    except Exception:
+        pass
+    try:
+        for line in read('/proc/meminfo').splitlines():
+            if line.startswith('MemTotal:'):
+                hardware['ram_gb'] = round(int(line.split()[1]) / 2 ** 20, 1)
+    except Exception:
+        pass
+    try:
+        # Every physical disk, since which one holds the data directory isn't visible remotely
+        types = set()
+        for device in listdir('/sys/block'):
+            if device.startswith(VIRTUAL_DEVICES):
+                continue
+            if device.startswith('nvme'):
+                types.add('nvme')
+            else:
+                types.add('hdd' if read(f'/sys/block/{device}/queue/rotational').strip() == '1' else 'ssd')
+        hardware['disk_type'] = types.pop() if len(types) == 1 else ('mixed' if types else None)
+    except Exception:
+        pass
+    return hardware
+
+
+def read_local(path):
+    with open(path) as f:
+        return f.read()
+
+
+def local_hardware():
+    """Hardware of this machine; outside Linux only the core count and memory are known"""
+    if os.path.exists('/proc/cpuinfo'):
+        hardware = parse_hardware(read_local, os.listdir)
+    else:
+        hardware = {'cpu_model': platform.processor() or None, 'cpu_cores': os.cpu_count(), 'ram_gb': None,
+                    'disk_type': None}
+        try:
+            hardware['ram_gb'] = round(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2 ** 30, 1)
+        except (ValueError, OSError, AttributeError):
+            pass
+    return with_fingerprint(hardware)
+
+
+def postgres_hardware(backend):
+    # pg_read_file and pg_ls_dir on absolute paths need superuser or pg_read_server_files
+    def read(path):
+        try:
+            return backend.query_rows("SELECT pg_read_file(%s)", (path,))[0][0]
+        finally:
+            backend.connection.rollback()
+
+    def listdir(path):
+        try:
+            return [row[0] for row in backend.query_rows("SELECT pg_ls_dir(%s)", (path,))]
+        finally:
+            backend.connection.rollback()
+
+    return parse_hardware(read, listdir)
+
+
+def neo4j_hardware(backend):
+    # The JVM's operating system bean knows cores and memory, but not the CPU model or disks
+    hardware = {'cpu_model': None, 'cpu_cores': None, 'ram_gb': None, 'disk_type': None}
+    try:
+        rows = backend.query_rows("CALL dbms.queryJmx('java.lang:type=OperatingSystem') YIELD attributes "
+                                  "RETURN attributes")
+    except Exception:
+        return hardware
+    attributes = rows[0][0] if rows else {}
+
+    def value(name):
+        attribute = attributes.get(name)
+        return attribute.get('value') if isinstance(attribute, dict) else None
+
+    hardware['cpu_cores'] = value('AvailableProcessors')
+    memory = value('TotalMemorySize') or value('TotalPhysicalMemorySize')
+    if memory:
+        hardware['ram_gb'] = round(memory / 2 ** 30, 1)
+    return hardware
+
+
+def is_local(backend):
+    if backend.dialect == 'postgresql':
+        host = backend.settings.get('host') or ''
+        return host in LOCAL_HOSTS or host.startswith('/')
+    return (urlparse(backend.settings.get('uri', '')).hostname or '') in LOCAL_HOSTS
+
+
+def server_hardware(backend):
+    """
+    Hardware of the machine a connected backend's server runs on
+
+    A server on this machine is described from local files. A remote
+    PostgreSQL server reads its own /proc and /sys files for us; a remote
+    Neo4j server only reports cores and memory.
+    """
+    if is_local(backend):
+        return local_hardware()
+    if backend.dialect == 'postgresql':
+        hardware = postgres_hardware(backend)
+    else:
+        hardware = neo4j_hardware(backend)
+    return with_fingerprint(hardware)
+
+
+def with_fingerprint(hardware):
+    parts = [str(hardware[key]) for key in ('cpu_model', 'cpu_cores', 'ram_gb', 'disk_type')]
+    hardware['fingerprint'] = hashlib.sha1('|'.join(parts).encode()).hexdigest()[:12]
+    return hardware
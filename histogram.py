@@ -0,0 +1,141 @@
+import math
+
+NANOSECONDS = 1_000_000_000
+
+# Percentiles reported for every (backend, query) pair
+REPORTED_PERCENTILES = (50, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram in the style of HdrHistogram
+
+    Values are integer nanoseconds. Values below 2**sub_bucket_bits are kept
+    exactly; above that every power of two is split into 2**(sub_bucket_bits - 1)
+    linear buckets, so any recorded value is reproduced to within
+    10**-significant_digits relative error. Only non-empty buckets are stored,
+    which keeps memory bounded by the dynamic range rather than the sample count,
+    and two histograms with the same precision merge by adding bucket counts.
+    """
+
+    def __init__(self, significant_digits=3):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.significant_digits = significant_digits
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.half_count = 1 << (self.sub_bucket_bits - 1)
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.total_squares = 0
+        self.min = None
+        self.max = None
+
+    def bucket_index(self, value):
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return shift * self.half_count + (value >> shift)
+
+    def bucket_range(self, index):
+        # Lowest and highest value that land in a bucket
+        if index < 2 * self.half_count:
+            return index, index
+        shift = index // self.half_count - 1
+        top = index - shift * self.half_count
+        return top << shift, ((top + 1) << shift) - 1
+
+    def record(self, value, count=1):
+        value = int(value)
+        if value < 0:
+            raise ValueError("Latencies cannot be negative")
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.total_squares += value * value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def record_seconds(self, seconds):
+        self.record(round(seconds * NANOSECONDS))
+
+    def merge(self, other):
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Only histograms with the same precision can be merged")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    def stdev(self):
+        # Sample standard deviation, from exact running sums rather than buckets
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_squares - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def percentile(self, pct):
+        """Value at the given percentile (0-100) in nanoseconds, nearest-rank"""
+        if not self.count:
+            return float('nan')
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self.bucket_range(index)
+                # Midpoint of the bucket, never outside what was actually recorded
+                return min(max((low + high) / 2, self.min), self.max)
+        return self.max
+
+    def percentile_seconds(self, pct):
+        return self.percentile(pct) / NANOSECONDS
+
+    def summary(self):
+        """Summary statistics in seconds, as used in result rows"""
+        summary = {
+            'samples': self.count,
+            'avg_time': self.mean() / NANOSECONDS,
+            'std_dev': self.stdev() / NANOSECONDS,
+            'min_time': self.min / NANOSECONDS if self.count else float('nan'),
+            'max_time': self.max / NANOSECONDS if self.count else float('nan'),
+        }
+        for pct in REPORTED_PERCENTILES:
+            summary[percentile_key(pct)] = self.percentile_seconds(pct)
+        return summary
+
+    def to_dict(self):
+        return {
+            'significant_digits': self.significant_digits,
+            'counts': {str(index): count for index, count in self.counts.items()},
+            'count': self.count,
+            'total': self.total,
+            'total_squares': self.total_squares,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['significant_digits'])
+        histogram.counts = {int(index): count for index, count in data['counts'].items()}
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.total_squares = data['total_squares']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+
+def percentile_key(pct):
+    # 50 -> 'p50', 99.9 -> 'p99.9'
+    return f"p{pct:g}"
@@ -0,0 +1,184 @@
+import io
+import threading
+import time
+
+import numpy as np
+
+import config
+from datagen import generate_trans
+from histogram import LatencyHistogram, NANOSECONDS
+
+# trans columns in table order; Neo4j keeps the two keys as integers and the
+# rest as text, like the loader
+TRANSACTION_COLUMNS = ['trans_id', 'account_id', 'date', 'type', 'operation', 'amount', 'balance', 'k_symbol',
+                       'bank', 'account']
+NEO4J_KEY_COLUMNS = {'trans_id', 'account_id'}
+
+# copy: COPY FROM STDIN; insert: multi-row INSERT ... VALUES pages (psycopg2's batched executemany)
+INGEST_METHODS = ('copy', 'insert')
+
+NEO4J_INSERT = (
+    "UNWIND $rows AS row "
+    "MATCH (a:Account {account_id: row.account_id}) "
+    "CREATE (t:Transaction) SET t = row "
+    "CREATE (a)-[:HAS_TRANSACTION]->(t)"
+)
+
+START_QUERIES = {
+    'postgresql': ("SELECT max(trans_id), max(date) FROM trans", "SELECT account_id FROM account"),
+    'neo4j': ("MATCH (t:Transaction) RETURN max(t.trans_id), max(t.date)", "MATCH (a:Account) RETURN a.account_id"),
+}
+
+
+def write_postgres(backend, frame, method):
+    """One batch in one transaction; returns how many times it was retried (never, on PostgreSQL)"""
+    try:
+        if method == 'copy':
+            buffer = io.StringIO()
+            frame.to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            backend.cursor.copy_expert(f"COPY trans ({', '.join(TRANSACTION_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                                       buffer)
+        else:
+            from psycopg2.extras import execute_values
+
+            execute_values(backend.cursor, f"INSERT INTO trans ({', '.join(TRANSACTION_COLUMNS)}) VALUES %s",
+                           list(frame.itertuples(index=False, name=None)), page_size=len(frame))
+        backend.connection.commit()
+    except Exception:
+        backend.connection.rollback()
+        raise
+    return 0
+
+
+def write_neo4j(backend, frame, method):
+    """One UNWIND batch through a managed transaction; returns how many times the driver retried it"""
+    rows = [{column: int(value) if column in NEO4J_KEY_COLUMNS else str(value) for column, value in row.items()}
+            for row in frame.to_dict('records')]
+    attempts = []
+
+    def work(tx):
+        # execute_write calls this again after a transient error such as a deadlock
+        attempts.append(None)
+        tx.run(NEO4J_INSERT, rows=rows).consume()
+
+    backend.session.execute_write(work)
+    return len(attempts) - 1
+
+
+def delete_ingested(backend, first_id):
+    if backend.dialect == 'postgresql':
+        backend.cursor.execute("DELETE FROM trans WHERE trans_id >= %s", (first_id,))
+        backend.connection.commit()
+    else:
+        backend.session.run("MATCH (t:Transaction) WHERE t.trans_id >= $first_id "
+                            f"CALL {{ WITH t DETACH DELETE t }} IN TRANSACTIONS OF {config.LOAD_BATCH_SIZE} ROWS",
+                            first_id=first_id).consume()
+
+
+class IngestStream:
+    """
+    Background thread appending new transactions at a fixed rate while queries run
+
+    Batches of batch_size rows are due every batch_size / rate seconds from
+    the start; a batch that falls behind is sent at once, so the achieved rate
+    and the worst lag show when the backend can't keep up. New rows continue
+    the trans_id sequence, belong to existing accounts and are dated the day
+    after the latest transaction, the way a live table grows. With cleanup
+    they are deleted again afterwards so the next run sees the loaded dataset.
+    """
+
+    def __init__(self, backend, rate, batch_size=None, method=None, cleanup=None, seed=None):
+        self.backend = backend
+        self.rate = rate
+        self.batch_size = batch_size or config.INGEST_BATCH_SIZE
+        self.method = method or config.INGEST_METHOD
+        if self.method not in INGEST_METHODS:
+            raise ValueError(f"Unknown ingest method '{self.method}', expected one of: {', '.join(INGEST_METHODS)}")
+        self.cleanup = cleanup if cleanup is not None else config.INGEST_CLEANUP
+        self.rng = np.random.default_rng(seed if seed is not None else config.GENERATOR_SEED)
+        self.write = write_postgres if backend.dialect == 'postgresql' else write_neo4j
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='ingest', daemon=True)
+        self.histogram = LatencyHistogram()
+        self.rows = self.batches = self.errors = self.retries = 0
+        self.max_lag_s = 0.0
+        self.elapsed = 0.0
+        self.first_id = None
+
+    def start_point(self):
+        # Where the stream continues from: next trans_id, next day and the accounts to spread rows over
+        bounds_query, accounts_query = START_QUERIES[self.backend.dialect]
+        last_id, last_date = self.backend.query_rows(bounds_query)[0]
+        accounts = np.array([row[0] for row in self.backend.query_rows(accounts_query)])
+        if self.backend.dialect == 'postgresql':
+            self.backend.connection.rollback()
+        next_day = np.datetime64(str(last_date)[:10], 'D') + np.timedelta64(1, 'D')
+        return int(last_id or 0) + 1, next_day, accounts
+
+    def batch(self, next_id, day, accounts):
+        frame = generate_trans(self.rng, next_id - 1, self.batch_size, {'account': len(accounts)})
+        frame['account_id'] = accounts[frame['account_id'].to_numpy() - 1]
+        frame['date'] = str(day)
+        return frame[TRANSACTION_COLUMNS]
+
+    def run(self):
+        try:
+            self.backend.connect()
+        except Exception as e:
+            print(f"Ingest stream could not connect, no rows inserted: {e}")
+            return
+        try:
+            next_id, day, accounts = self.start_point()
+            self.first_id = next_id
+            interval_ns = self.batch_size / self.rate * NANOSECONDS
+            start_ns = time.perf_counter_ns()
+            while not self.stopping.is_set():
+                due_ns = start_ns + int(self.batches * interval_ns)
+                wait_ns = due_ns - time.perf_counter_ns()
+                if wait_ns > 0 and self.stopping.wait(wait_ns / NANOSECONDS):
+                    break
+                self.max_lag_s = max(self.max_lag_s, -wait_ns / NANOSECONDS)
+                frame = self.batch(next_id, day, accounts)
+                batch_start = time.perf_counter_ns()
+                try:
+                    self.retries += self.write(self.backend, frame, self.method)
+                    self.rows += len(frame)
+                except Exception as e:
+                    if not self.errors:
+                        print(f"Ingest batch failed: {e}")
+                    self.errors += 1
+                self.histogram.record(time.perf_counter_ns() - batch_start)
+                self.batches += 1
+                next_id += len(frame)
+            self.elapsed = (time.perf_counter_ns() - start_ns) / NANOSECONDS
+            if self.cleanup and self.rows:
+                delete_ingested(self.backend, self.first_id)
+        except Exception as e:
+            print(f"Ingest stream stopped: {e}")
+        finally:
+            self.backend.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stopping.set()
+        self.thread.join()
+
+    def summary(self):
+        """Rows and batches written, target and achieved rows/s, batch latency, errors, retries and worst lag"""
+        summary = {
+            'method': self.method if self.backend.dialect == 'postgresql' else 'unwind',
+            'target_rows_per_s': self.rate,
+            'rows': self.rows,
+            'batches': self.batches,
+            'rows_per_s': self.rows / self.elapsed if self.elapsed else 0.0,
+            'errors': self.errors,
+            'retries': self.retries,
+            'max_lag_s': self.max_lag_s,
+        }
+        summary.update({f"batch_{key}": value for key, value in self.histogram.summary().items()
+                        if key.startswith('p') or key == 'avg_time'})
+        return summary
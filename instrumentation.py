@@ -0,0 +1,63 @@
+from histogram import NANOSECONDS
+
+PHASES = ('connect_time', 'planning_time', 'execution_time', 'transfer_time', 'fetch_time')
+
+
+def split_phases(measurement, server):
+    """
+    Break one measured execution into connect, planning, execution, transfer and fetch time
+
+    Parameters:
+    measurement: dict from Backend.execute_phases
+    server: server-side timings in ms ('planning_ms', 'execution_ms'), either
+    reported with the result itself or taken from the latest sampled EXPLAIN;
+    None when the backend reports neither
+
+    Returns:
+    dict: every phase in seconds, None where it could not be measured.
+    connect_time comes before the execution and is not part of total_time;
+    transfer_time is what remains of the wall-clock time once server and fetch
+    time are accounted for: network round trips, protocol decoding and driver work.
+    """
+    total = measurement['total_ns'] / NANOSECONDS
+    connect = measurement['connect_ns'] / NANOSECONDS if measurement.get('connect_ns') is not None else None
+    fetch = measurement['fetch_ns'] / NANOSECONDS if measurement['fetch_ns'] is not None else None
+    planning = execution = transfer = None
+    if server:
+        if server.get('planning_ms') is not None:
+            planning = server['planning_ms'] / 1000
+        if server.get('execution_ms') is not None:
+            execution = server['execution_ms'] / 1000
+        if execution is not None and fetch is not None:
+            transfer = max(0.0, total - (planning or 0.0) - execution - fetch)
+    return {
+        'total_time': total,
+        'rows': measurement['rows'],
+        'connect_time': connect,
+        'bytes': measurement.get('bytes'),
+        'planning_time': planning,
+        'execution_time': execution,
+        'transfer_time': transfer,
+        'fetch_time': fetch,
+    }
+
+
+def summarize_phases(phases):
+    # Mean of every phase over the iterations that measured it
+    summary = {}
+    for phase in PHASES:
+        values = [p[phase] for p in phases if p[phase] is not None]
+        summary[phase] = sum(values) / len(values) if values else None
+    return summary
+
+
+def summarize_throughput(phases):
+    """Rows/s and MB/s over all measured executions, with the estimated result size"""
+    elapsed = sum(p['total_time'] for p in phases)
+    rows = sum(p['rows'] for p in phases)
+    size = sum(p['bytes'] or 0 for p in phases)
+    return {
+        'rows': phases[-1]['rows'] if phases else None,
+        'rows_per_s': rows / elapsed if elapsed > 0 else None,
+        'mb_per_s': size / 1_000_000 / elapsed if elapsed > 0 else None,
+    }
@@ -0,0 +1,247 @@
+import csv
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from backends import get_backend
+
+# Tables of the financial dataset; each is read from <data dir>/<table>.csv
+TABLES = ['district', 'account', 'client', 'disp', 'card', 'loan', 'order', 'trans']
+
+# Neo4j node label and key property for every table
+NEO4J_NODES = {
+    'district': ('District', 'district_id'),
+    'account': ('Account', 'account_id'),
+    'client': ('Client', 'client_id'),
+    'disp': ('Disp', 'disp_id'),
+    'card': ('Card', 'card_id'),
+    'loan': ('Loan', 'loan_id'),
+    'order': ('Order', 'order_id'),
+    'trans': ('Transaction', 'trans_id'),
+}
+
+# Relationships built from the rows of a table:
+# (table, start label, start key column, type, end label, end key column).
+# HAS_TRANSACTION, HAS_DISP/BELONGS_TO and HAS_DISPOSITION are the paths the
+# Cypher benchmark queries walk.
+NEO4J_RELATIONSHIPS = [
+    ('trans', 'Account', 'account_id', 'HAS_TRANSACTION', 'Transaction', 'trans_id'),
+    ('disp', 'Account', 'account_id', 'HAS_DISP', 'Disp', 'disp_id'),
+    ('disp', 'Disp', 'disp_id', 'BELONGS_TO', 'Client', 'client_id'),
+    ('disp', 'Client', 'client_id', 'HAS_DISPOSITION', 'Account', 'account_id'),
+    ('account', 'Account', 'account_id', 'LOCATED_IN', 'District', 'district_id'),
+    ('client', 'Client', 'client_id', 'LIVES_IN', 'District', 'district_id'),
+    ('card', 'Disp', 'disp_id', 'HAS_CARD', 'Card', 'card_id'),
+    ('loan', 'Account', 'account_id', 'HAS_LOAN', 'Loan', 'loan_id'),
+    ('order', 'Account', 'account_id', 'HAS_ORDER', 'Order', 'order_id'),
+]
+
+
+class Progress:
+    """Thread-safe row counters that print a status line every config.PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, database):
+        self.database = database
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.start = time.perf_counter()
+        self.last_report = self.start
+
+    def add(self, step, rows):
+        with self.lock:
+            self.rows[step] = self.rows.get(step, 0) + rows
+            now = time.perf_counter()
+            if now - self.last_report >= config.PROGRESS_INTERVAL:
+                self.last_report = now
+                total = sum(self.rows.values())
+                print(f"[{self.database}] {total:,} rows after {now - self.start:.0f}s "
+                      f"({total / (now - self.start):,.0f} rows/s)")
+
+
+class CountingFile:
+    """File wrapper counting lines as COPY reads it, for progress reporting"""
+
+    def __init__(self, f, progress, step):
+        self.f = f
+        self.progress = progress
+        self.step = step
+
+    def read(self, size=-1):
+        chunk = self.f.read(size)
+        self.progress.add(self.step, chunk.count('\n'))
+        return chunk
+
+    def readline(self, size=-1):
+        line = self.f.readline(size)
+        self.progress.add(self.step, 1 if line else 0)
+        return line
+
+
+def table_path(data_dir, table):
+    return os.path.join(data_dir, f"{table}.csv")
+
+
+def create_postgres_schema(backend):
+    with open(os.path.join(config.SCHEMA_DIRECTORY, 'postgresql.sql')) as f:
+        backend.cursor.execute(f.read())
+    backend.connection.commit()
+
+
+def copy_postgres_table(backend_key, table, data_dir, progress, truncate):
+    """Stream one CSV into a table with COPY FROM STDIN on its own connection"""
+    backend = get_backend(backend_key, connection_mode='persistent')
+    backend.connect()
+    try:
+        path = table_path(data_dir, table)
+        with open(path, newline='') as f:
+            header = next(csv.reader(f, delimiter=config.DATASET_DELIMITER))
+            columns = ', '.join(f'"{column.strip().lower()}"' for column in header)
+            if truncate:
+                backend.cursor.execute(f'TRUNCATE "{table}"')
+            start = time.perf_counter()
+            backend.cursor.copy_expert(
+                f"""COPY "{table}" ({columns}) FROM STDIN WITH (FORMAT csv, DELIMITER '{config.DATASET_DELIMITER}')""",
+                CountingFile(f, progress, table))
+            rows = backend.cursor.rowcount
+            backend.connection.commit()
+            elapsed = time.perf_counter() - start
+    finally:
+        backend.close()
+    return {'step': table, 'rows': rows, 'seconds': elapsed}
+
+
+def read_batches(path, batch_size, key_columns):
+    """Yield lists of row dicts, with key columns converted to integers"""
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f, delimiter=config.DATASET_DELIMITER)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        while True:
+            batch = list(itertools.islice(reader, batch_size))
+            if not batch:
+                return
+            for row in batch:
+                for column in key_columns:
+                    if row.get(column) not in (None, ''):
+                        row[column] = int(row[column])
+            yield batch
+
+
+def run_neo4j_batches(backend_key, statement, path, key_columns, progress, step):
+    """Send a CSV through a parameterized UNWIND statement in batches of config.LOAD_BATCH_SIZE"""
+    backend = get_backend(backend_key, connection_mode='persistent')
+    backend.connect()
+    rows = 0
+    try:
+        start = time.perf_counter()
+        for batch in read_batches(path, config.LOAD_BATCH_SIZE, key_columns):
+            # execute_write retries the batch on transient errors such as deadlocks
+            backend.session.execute_write(lambda tx: tx.run(statement, rows=batch).consume())
+            rows += len(batch)
+            progress.add(step, len(batch))
+        elapsed = time.perf_counter() - start
+    finally:
+        backend.close()
+    return {'step': step, 'rows': rows, 'seconds': elapsed}
+
+
+def create_neo4j_constraints(backend):
+    # Unique keys double as the indexes the relationship MATCHes rely on
+    for label, key in NEO4J_NODES.values():
+        backend.session.run(
+            f"CREATE CONSTRAINT {label.lower()}_{key} IF NOT EXISTS FOR (n:`{label}`) REQUIRE n.{key} IS UNIQUE"
+        ).consume()
+
+
+def delete_neo4j_nodes(backend, tables):
+    # Batched so deleting millions of transactions doesn't need one huge transaction
+    for table in tables:
+        label, _ = NEO4J_NODES[table]
+        backend.session.run(
+            f"MATCH (n:`{label}`) CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {config.LOAD_BATCH_SIZE} ROWS"
+        ).consume()
+
+
+def load_neo4j_nodes(backend_key, table, data_dir, progress):
+    label, key = NEO4J_NODES[table]
+    statement = f"UNWIND $rows AS row MERGE (n:`{label}` {{{key}: row.{key}}}) SET n += row"
+    # Keep the columns relationships match on as integers, like the node keys
+    key_columns = {key}
+    for rel_table, _, start_key, _, _, end_key in NEO4J_RELATIONSHIPS:
+        if rel_table == table:
+            key_columns.update((start_key, end_key))
+    return run_neo4j_batches(backend_key, statement, table_path(data_dir, table), key_columns, progress, table)
+
+
+def load_neo4j_relationships(backend_key, relationship, data_dir, progress):
+    table, start_label, start_key, rel_type, end_label, end_key = relationship
+    statement = (f"UNWIND $rows AS row "
+                 f"MATCH (a:`{start_label}` {{{start_key}: row.{start_key}}}) "
+                 f"MATCH (b:`{end_label}` {{{end_key}: row.{end_key}}}) "
+                 f"MERGE (a)-[:`{rel_type}`]->(b)")
+    return run_neo4j_batches(backend_key, statement, table_path(data_dir, table), [start_key, end_key],
+                             progress, rel_type)
+
+
+def load_dataset(backend_key, data_dir=None, tables=None, workers=None, create_schema=True, truncate=False):
+    """
+    Load the financial dataset CSVs into one backend
+
+    PostgreSQL and TimescaleDB get one COPY FROM STDIN per table; Neo4j gets
+    nodes through batched UNWIND ... MERGE, then the relationships the Cypher
+    queries expect. Tables (and, for Neo4j, relationship types) load in
+    parallel on `workers` connections. With truncate, the tables (or Neo4j
+    nodes of the loaded labels) are emptied first.
+
+    Returns:
+    dict: per-step rows, seconds and rows/s plus the overall totals
+    """
+    data_dir = data_dir or config.DATASET_DIRECTORY
+    tables = tables or [table for table in TABLES if os.path.exists(table_path(data_dir, table))]
+    workers = workers or config.LOAD_WORKERS
+
+    backend = get_backend(backend_key, connection_mode='persistent')
+    progress = Progress(backend.name)
+    print(f"===== Loading {', '.join(tables)} into {backend.name} =====")
+
+    backend.connect()
+    try:
+        if create_schema:
+            if backend.dialect == 'neo4j':
+                create_neo4j_constraints(backend)
+            else:
+                create_postgres_schema(backend)
+        if truncate and backend.dialect == 'neo4j':
+            delete_neo4j_nodes(backend, tables)
+    finally:
+        backend.close()
+
+    start = time.perf_counter()
+    steps = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if backend.dialect == 'neo4j':
+            # Every node must exist before relationships can MATCH both ends
+            futures = [executor.submit(load_neo4j_nodes, backend_key, table, data_dir, progress)
+                       for table in tables]
+            steps.extend(future.result() for future in futures)
+            futures = [executor.submit(load_neo4j_relationships, backend_key, relationship, data_dir, progress)
+                       for relationship in NEO4J_RELATIONSHIPS if relationship[0] in tables]
+            steps.extend(future.result() for future in futures)
+        else:
+            futures = [executor.submit(copy_postgres_table, backend_key, table, data_dir, progress, truncate)
+                       for table in tables]
+            steps.extend(future.result() for future in futures)
+    elapsed = time.perf_counter() - start
+
+    for step in steps:
+        step['rows_per_s'] = step['rows'] / step['seconds'] if step['seconds'] > 0 else 0.0
+    total_rows = sum(step['rows'] for step in steps)
+    return {
+        'database': backend.name,
+        'steps': steps,
+        'rows': total_rows,
+        'seconds': elapsed,
+        'rows_per_s': total_rows / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,166 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from backends import get_backend
+from benchmark import load_queries, parameter_generator
+from histogram import LatencyHistogram
+
+
+def parse_mix(entries, query_names):
+    """
+    Turn "Query 1=3" style entries into a {query name: weight} mix
+
+    With no entries every query is weighted equally.
+    """
+    if not entries:
+        return {name: 1.0 for name in query_names}
+    mix = {}
+    for entry in entries:
+        name, _, weight = entry.rpartition('=')
+        if not name:
+            name, weight = entry, '1'
+        if name not in query_names:
+            raise ValueError(f"Unknown query '{name}' in mix, expected one of: {', '.join(query_names)}")
+        mix[name] = float(weight)
+    return mix
+
+
+def load_worker(worker_id, backend_key, queries, mix, duration, requests, seed, connection_mode=None,
+                statement_mode=None):
+    """
+    Issue queries on a private connection until the duration or request count runs out
+
+    Runs in a thread or a child process, so it only takes and returns plain data.
+    Query templates get fresh parameters for every request, from a generator
+    seeded per worker.
+    """
+    rng = random.Random(seed + worker_id)
+    query_text = dict(queries)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    histograms = {name: LatencyHistogram() for name in names}
+    connect_histogram = LatencyHistogram()
+    errors = 0
+    backend = get_backend(backend_key, connection_mode=connection_mode, statement_mode=statement_mode)
+    backend.connect()
+    try:
+        generator = parameter_generator(backend, queries, seed + worker_id)
+        samplers = {name: generator.sampler(backend.dialect, query) if generator else None
+                    for name, query in queries}
+        start = time.time()
+        deadline = start + duration if duration else None
+        completed = 0
+        while True:
+            if requests is not None and completed >= requests:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+            name = rng.choices(names, weights)[0]
+            params = samplers[name]() if samplers[name] else None
+            try:
+                connect_start = time.perf_counter_ns()
+                backend.acquire()
+                query_start = time.perf_counter_ns()
+                connect_histogram.record(query_start - connect_start)
+                try:
+                    backend.execute(query_text[name], params)
+                finally:
+                    backend.release()
+                histograms[name].record(time.perf_counter_ns() - query_start)
+            except Exception:
+                errors += 1
+                # Otherwise one failed query can leave the connection unusable and fail every
+                # request after it (PostgreSQL aborts the transaction)
+                backend.reset()
+            completed += 1
+        end = time.time()
+    finally:
+        backend.close()
+
+    return {'worker': worker_id, 'start': start, 'end': end, 'histograms': histograms,
+            'connect_histogram': connect_histogram, 'errors': errors}
+
+
+def run_load(backend_key, workers, duration=None, requests=None, mix=None, mode='thread', seed=0,
+             query_names=None, connection_mode=None, statement_mode=None, parameterized=False):
+    """
+    Drive a backend with concurrent clients, each holding its own connection
+
+    Parameters:
+    backend_key: key into backends.BACKENDS
+    workers: number of concurrent clients
+    duration: seconds each client keeps issuing queries
+    requests: total queries across all clients (used when duration is not given)
+    mix: "Query N=weight" entries choosing how often each query is issued
+    mode: 'thread' or 'process' workers
+    connection_mode: how each client gets its connection (backends.CONNECTION_MODES)
+    statement_mode: literal or prepared statements (backends.STATEMENT_MODES)
+
+    Returns:
+    dict: aggregate throughput and per-query latency summary
+    """
+    if not duration and not requests:
+        raise ValueError("Either a duration or a request count is required")
+
+    backend = get_backend(backend_key, connection_mode=connection_mode, statement_mode=statement_mode)
+    queries = load_queries(backend.dialect, parameterized=parameterized)
+    if query_names:
+        queries = [(name, query) for name, query in queries if name in query_names]
+    weights = parse_mix(mix, [name for name, _ in queries])
+
+    # Split a fixed request budget as evenly as possible over the workers
+    per_worker = [None] * workers
+    if not duration:
+        per_worker = [requests // workers + (1 if i < requests % workers else 0) for i in range(workers)]
+
+    executor_class = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        futures = [executor.submit(load_worker, i, backend_key, queries, weights, duration, per_worker[i], seed,
+                                   backend.connection_mode, backend.statement_mode)
+                   for i in range(workers)]
+        outcomes = [future.result() for future in futures]
+
+    return summarize_load(backend.name, workers, mode, outcomes, backend.connection_mode)
+
+
+def summarize_load(database, workers, mode, outcomes, connection_mode=None):
+    elapsed = max(o['end'] for o in outcomes) - min(o['start'] for o in outcomes)
+    # Every worker kept its own histograms; merge them per query
+    merged = {}
+    for outcome in outcomes:
+        for name, histogram in outcome['histograms'].items():
+            if name in merged:
+                merged[name].merge(histogram)
+            else:
+                merged[name] = histogram
+
+    connect = LatencyHistogram()
+    for outcome in outcomes:
+        connect.merge(outcome['connect_histogram'])
+
+    per_query = []
+    for name, histogram in merged.items():
+        query = {
+            'name': name,
+            'requests': histogram.count,
+            'qps': histogram.count / elapsed if elapsed > 0 else 0.0,
+            'histogram': histogram,
+        }
+        query.update(histogram.summary())
+        per_query.append(query)
+
+    total = sum(q['requests'] for q in per_query)
+    return {
+        'database': database,
+        'workers': workers,
+        'mode': mode,
+        'connection_mode': connection_mode,
+        'connect': connect.summary(),
+        'elapsed': elapsed,
+        'requests': total,
+        'errors': sum(o['errors'] for o in outcomes),
+        'qps': total / elapsed if elapsed > 0 else 0.0,
+        'queries': per_query,
+    }
@@ -0,0 +1,108 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from backends import BACKENDS, get_backend
+from benchmark import load_queries, run_benchmark
+from hardware import server_hardware
+from resultstore import append_results, new_run_id
+
+
+def load_targets(path):
+    """
+    Computers to benchmark, from a JSON file
+
+    The file maps every Computer (the experiment factor) to the backends to
+    run there and their connection settings, which override the config
+    defaults for that backend:
+    {"Peter": {"postgresql": {"host": "10.0.0.12"}, "neo4j": {"uri": "bolt://10.0.0.12:7687"}}}
+
+    Returns:
+    dict: computer name -> {backend key: settings overrides}
+    """
+    with open(path) as f:
+        targets = json.load(f)
+    for computer, backends in targets.items():
+        unknown = sorted(set(backends) - set(BACKENDS))
+        if unknown:
+            raise ValueError(f"Unknown backend(s) {', '.join(unknown)} for {computer}, "
+                             f"expected: {', '.join(BACKENDS)}")
+    return targets
+
+
+def run_target(computer, backends, query_names, iterations, warmup, directory):
+    """
+    Run the query set on every backend of one computer, one backend after another
+
+    Runs in a worker process. Each backend's results are appended to the
+    results store under the computer's name, with the hardware its server
+    runs on. A failing backend is reported and the next one still runs.
+
+    Returns:
+    list: one dict per backend with 'computer', 'backend', 'run_id',
+    'samples', 'hardware', 'path' and 'error'
+    """
+    outcomes = []
+    for key, overrides in backends.items():
+        outcome = {'computer': computer, 'backend': key, 'run_id': new_run_id(), 'samples': 0, 'hardware': None,
+                   'path': None, 'error': None}
+        backend = get_backend(key)
+        # The computer's settings override the config defaults the backend starts from
+        backend.settings.update(overrides)
+        queries = load_queries(backend.dialect)
+        if query_names:
+            queries = [(name, query) for name, query in queries if name in query_names]
+        print(f"[{computer}] Benchmarking {backend.name}")
+        try:
+            backend.connect()
+            backend.acquire()
+            try:
+                outcome['hardware'] = server_hardware(backend)
+            finally:
+                backend.release()
+            results = run_benchmark(backend, queries, iterations, warmup)
+            outcome['samples'] = sum(len(result['times']) for result in results)
+            outcome['path'] = append_results(results, outcome['run_id'], directory, computer, outcome['hardware'])
+        except Exception as e:
+            print(f"[{computer}] {backend.name} failed: {e}")
+            outcome['error'] = str(e)
+        finally:
+            backend.close()
+        outcomes.append(outcome)
+    return outcomes
+
+
+def run_experiment(targets, backend_keys=None, query_names=None, iterations=None, warmup=None, workers=None,
+                   directory=None):
+    """
+    Run the full experiment on every computer in parallel, merging into one results store
+
+    Each computer gets its own worker process; backends on the same
+    computer run in turn so they never compete for its CPU, memory and
+    disks. Every run lands in the shared results store as its own file, so
+    the merged store is ready for statisticalanalysis.calculate_anova_table
+    with Computer as a factor.
+
+    Parameters:
+    targets: from load_targets
+    backend_keys: only run these backends (default: every backend listed per computer)
+    iterations: replications per (computer, backend, query)
+    workers: processes, defaults to one per computer
+
+    Returns:
+    list: run_target's outcomes for every computer and backend
+    """
+    jobs = {}
+    for computer, backends in targets.items():
+        selected = {key: settings for key, settings in backends.items() if not backend_keys or key in backend_keys}
+        if selected:
+            jobs[computer] = selected
+    if not jobs:
+        return []
+
+    outcomes = []
+    with ProcessPoolExecutor(max_workers=workers or len(jobs)) as executor:
+        futures = [executor.submit(run_target, computer, backends, query_names, iterations, warmup, directory)
+                   for computer, backends in jobs.items()]
+        for future in futures:
+            outcomes.extend(future.result())
+    return outcomes
@@ -0,0 +1,90 @@
+import datetime
+
+import numpy as np
+
+import config
+from backends import query_parameters
+
+# Queries sampling what parameters are drawn from, per dialect. account_id
+# comes with its transaction count so busy accounts are looked up more often,
+# like in production traffic.
+DISTRIBUTION_QUERIES = {
+    'postgresql': {
+        'account_id': "SELECT account_id, count(*) FROM trans GROUP BY account_id",
+        'client_id': "SELECT client_id, 1 FROM client",
+        'date_range': "SELECT min(date), max(date) FROM trans",
+    },
+    'neo4j': {
+        'account_id': "MATCH (a:Account)-[:HAS_TRANSACTION]->(t:Transaction) RETURN a.account_id, count(t)",
+        'client_id': "MATCH (c:Client) RETURN c.client_id, 1",
+        'date_range': "MATCH (t:Transaction) RETURN min(t.date), max(t.date)",
+    },
+}
+
+
+def to_day(value):
+    return np.datetime64(str(value)[:10], 'D')
+
+
+class ParameterGenerator:
+    """
+    Draws query parameters from the data actually loaded into a backend
+
+    account_id follows the accounts' share of transactions, client_id is
+    uniform over the clients, and start_date/end_date are a window of
+    config.PARAMETER_DATE_WINDOW_DAYS inside the transaction dates. Dates come
+    back in the type the backend stores them in (date objects for SQL, ISO
+    strings for the Neo4j import).
+    """
+
+    def __init__(self, account_ids, account_weights, client_ids, first_day, last_day, dates_as_text=False,
+                 seed=None):
+        self.account_ids = np.asarray(account_ids)
+        # Cumulative weights make each draw a binary search instead of a pass over every account
+        weights = np.cumsum(np.asarray(account_weights, dtype=float))
+        self.account_cdf = weights / weights[-1] if len(weights) else weights
+        self.client_ids = np.asarray(client_ids)
+        self.first_day = first_day
+        self.last_day = last_day
+        self.dates_as_text = dates_as_text
+        self.rng = np.random.default_rng(seed if seed is not None else config.PARAMETER_SEED)
+
+    @classmethod
+    def from_backend(cls, backend, seed=None):
+        """Sample the distributions through a connected, acquired backend"""
+        queries = DISTRIBUTION_QUERIES[backend.dialect]
+        accounts = backend.query_rows(queries['account_id'])
+        clients = backend.query_rows(queries['client_id'])
+        first, last = backend.query_rows(queries['date_range'])[0]
+        return cls([row[0] for row in accounts], [row[1] for row in accounts], [row[0] for row in clients],
+                   to_day(first), to_day(last), isinstance(first, str), seed)
+
+    def date_value(self, day):
+        day = day.astype(datetime.date)
+        return day.isoformat() if self.dates_as_text else day
+
+    def draw(self, names):
+        """One set of values for the named parameters"""
+        params = {}
+        window = np.timedelta64(config.PARAMETER_DATE_WINDOW_DAYS, 'D')
+        for name in names:
+            if name == 'account_id':
+                index = np.searchsorted(self.account_cdf, self.rng.random(), side='right')
+                params[name] = int(self.account_ids[min(index, len(self.account_ids) - 1)])
+            elif name == 'client_id':
+                params[name] = int(self.rng.choice(self.client_ids))
+            elif name == 'start_date':
+                span = max(0, int((self.last_day - self.first_day - window) / np.timedelta64(1, 'D')))
+                start = self.first_day + np.timedelta64(int(self.rng.integers(0, span + 1)), 'D')
+                params['start_date'] = self.date_value(start)
+                params['end_date'] = self.date_value(start + window)
+            elif name != 'end_date':
+                raise ValueError(f"No generator for query parameter '{name}'")
+        return params
+
+    def sampler(self, dialect, query):
+        """A function drawing fresh parameters for a query, or None if it takes none"""
+        names = query_parameters(dialect, query)
+        if not names:
+            return None
+        return lambda: self.draw(names)
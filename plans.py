@@ -0,0 +1,125 @@
+import hashlib
+import re
+
+# Literals and generated names that vary between executions of the same plan
+VOLATILE_PATTERNS = [
+    (re.compile(r"\"[^\"]*\"|'[^']*'"), '?'),
+    (re.compile(r"\b(anon|UNNAMED|autoint|autodouble|autostring|autolist)_?\d+"), r"\1"),
+    (re.compile(r"(?<![\w$])\d+(\.\d+)?\b"), '?'),
+    (re.compile(r"\s+"), ' '),
+]
+
+
+def normalize_detail(text):
+    for pattern, replacement in VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def postgres_node(node):
+    # Join and aggregate strategy are part of the shape; costs and row counts are not
+    operator = node['Node Type']
+    if node.get('Join Type') and node['Node Type'] in ('Hash Join', 'Merge Join', 'Nested Loop'):
+        operator += f" {node['Join Type']}"
+    if node.get('Strategy'):
+        operator += f" {node['Strategy']}"
+    if node.get('Parent Relationship') in ('SubPlan', 'InitPlan'):
+        operator = f"{node['Parent Relationship']}: {operator}"
+    return {
+        'operator': operator,
+        'detail': node.get('Index Name') or node.get('Relation Name') or node.get('CTE Name') or '',
+        # Both are per loop, so a node inside a nested loop compares like for like
+        'estimated_rows': node.get('Plan Rows'),
+        'actual_rows': node.get('Actual Rows'),
+        'loops': node.get('Actual Loops'),
+        'children': [postgres_node(child) for child in node.get('Plans', [])],
+    }
+
+
+def neo4j_node(node):
+    args = node.get('args') or node.get('arguments') or {}
+    return {
+        'operator': node.get('operatorType', node.get('operator_type', '')).split('@')[0],
+        'detail': normalize_detail(str(args.get('Details', ''))),
+        'estimated_rows': args.get('EstimatedRows'),
+        'actual_rows': node.get('rows', args.get('Rows')),
+        'loops': None,
+        'children': [neo4j_node(child) for child in node.get('children', [])],
+    }
+
+
+def normalize_plan(dialect, raw):
+    """Operator tree in one shape for every backend, from Backend.capture_plan output"""
+    if dialect == 'postgresql':
+        return postgres_node(raw['Plan'])
+    return neo4j_node(raw)
+
+
+def shape(node):
+    # Canonical text of the plan's structure: operators, the relations/indexes
+    # they touch and their nesting, but no estimates, costs or literal values
+    children = ','.join(shape(child) for child in node['children'])
+    return f"{node['operator']}[{node['detail']}]({children})"
+
+
+def fingerprint(tree):
+    return hashlib.sha1(shape(tree).encode()).hexdigest()[:12]
+
+
+def operators(tree, depth=0):
+    """
+    The tree as a flat, depth-first list with estimated vs actual rows
+
+    'misestimate' is how many times larger the bigger of the two is than the
+    smaller, the usual sign of a plan built on wrong statistics.
+    """
+    estimated = tree['estimated_rows']
+    actual = tree['actual_rows']
+    misestimate = None
+    if estimated is not None and actual is not None:
+        misestimate = max(estimated, actual, 1) / max(min(estimated, actual), 1)
+    flat = [{'depth': depth, 'operator': tree['operator'], 'detail': tree['detail'], 'estimated_rows': estimated,
+             'actual_rows': actual, 'misestimate': misestimate}]
+    for child in tree['children']:
+        flat.extend(operators(child, depth + 1))
+    return flat
+
+
+def capture(backend, query, params=None):
+    """
+    Run one instrumented execution of a query and describe its plan
+
+    Returns:
+    dict: 'fingerprint', 'operators' (see operators()) and 'tree', or None
+    when the backend can't report plans
+    """
+    raw = backend.capture_plan(query, params)
+    if raw is None:
+        return None
+    tree = normalize_plan(backend.dialect, raw)
+    return {'fingerprint': fingerprint(tree), 'operators': operators(tree), 'tree': tree}
+
+
+def plan_changes(plans, keys=('Computer', 'Database', 'Query', 'Variant', 'Statement_Mode')):
+    """
+    Consecutive plans of the same query whose fingerprints differ
+
+    Parameters:
+    plans: DataFrame from resultstore.read_plans, or any frame with the key
+    columns, 'Fingerprint', 'Operators' (JSON) and an ordering column 'Timestamp'
+
+    Returns:
+    list: one dict per change with the keys and the 'before'/'after' rows
+    """
+    changes = []
+    if plans.empty:
+        return changes
+    keys = [key for key in keys if key in plans.columns]
+    for cell, group in plans.sort_values('Timestamp', kind='stable').groupby(keys, dropna=False):
+        rows = group.to_dict('records')
+        for before, after in zip(rows, rows[1:]):
+            if before['Fingerprint'] != after['Fingerprint']:
+                change = dict(zip(keys, cell if isinstance(cell, tuple) else (cell,)))
+                change.update({'before': before, 'after': after})
+                changes.append(change)
+    return changes
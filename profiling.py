@@ -0,0 +1,318 @@
+import collections
+import contextlib
+import cProfile
+import functools
+import os
+import pstats
+import re
+import statistics
+import sys
+import threading
+import time
+
+import config
+from backends import get_backend
+from benchmark import load_queries, parameter_generator
+from histogram import NANOSECONDS
+
+# sampling: a thread reads the benchmark thread's stack, written as collapsed stacks for flamegraph.pl
+# cprofile: deterministic profile of every call, written as a pstats file (snakeviz, flameprof)
+PROFILERS = ('sampling', 'cprofile')
+
+
+def measure(fetch):
+    """
+    Wall-clock and client CPU nanoseconds of one call
+
+    The CPU time is the calling thread's own (time.thread_time_ns), which
+    covers the driver decoding rows but not the time spent waiting on the
+    server or other threads such as the telemetry sampler.
+
+    Returns:
+    tuple: (wall ns, CPU ns, what fetch returned)
+    """
+    cpu_start = time.thread_time_ns()
+    start = time.perf_counter_ns()
+    value = fetch()
+    end = time.perf_counter_ns()
+    return end - start, time.thread_time_ns() - cpu_start, value
+
+
+def frame_name(frame):
+    # The current line rather than the function's first, so waiting in execute() and
+    # converting in fetchall() of the same function become separate frames
+    return f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler:
+    """
+    Sampling profiler for one thread, in flamegraph.pl's collapsed-stack format
+
+    While `active` is set, a daemon thread reads the target thread's frames
+    every `interval` seconds and counts each distinct stack. The sampler
+    needs the GIL, so time inside C code that holds it (psycopg2 converting
+    rows) is attributed to the Python line that called it; the CPU time from
+    measure() is the unbiased figure.
+    """
+
+    def __init__(self, interval=None, thread_id=None):
+        self.interval = interval or config.PROFILE_SAMPLE_INTERVAL
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = collections.Counter()
+        self.active = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='stack-sampler', daemon=True)
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            if self.active.is_set():
+                frame = sys._current_frames().get(self.thread_id)
+                names = []
+                while frame is not None:
+                    names.append(frame_name(frame))
+                    frame = frame.f_back
+                if names:
+                    self.stacks[';'.join(reversed(names))] += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stopping.set()
+        self.thread.join()
+
+
+def sampled_hotspots(stacks, top=None):
+    # Share of samples whose innermost frame is each function line
+    total = sum(stacks.values())
+    leaves = collections.Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(';', 1)[-1]] += count
+    return [(name, count / total) for name, count in leaves.most_common(top or config.PROFILE_TOP_FUNCTIONS)]
+
+
+def cprofile_hotspots(stats, top=None):
+    # Share of the profiled time spent in each function itself; C functions such
+    # as cursor.fetchall show up as built-in methods
+    total = stats.total_tt or 1
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+    hotspots = []
+    for (filename, line, function), (_, _, own_time, _, _) in entries[:top or config.PROFILE_TOP_FUNCTIONS]:
+        name = function if filename == '~' else f"{function} ({os.path.basename(filename)}:{line})"
+        hotspots.append((name, own_time / total))
+    return hotspots
+
+
+def write_collapsed(stacks, path):
+    with open(path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def profile_query(backend, name, query, iterations=None, parameters=None, profiler=None, interval=None,
+                  directory=None):
+    """
+    Split one query's client time into driver CPU and waiting, and profile the driver code
+
+    The query first runs `iterations` times without a profiler for the
+    latency and the client CPU fraction (thread CPU time over wall-clock
+    time), then as often again under the profiler, whose output is written to
+    <directory>/<backend>_<query>.folded (sampling) or .prof (cprofile).
+
+    Parameters:
+    backend: connected Backend instance
+    parameters: function returning fresh template values, as in benchmark.time_query
+
+    Returns:
+    dict: 'name', 'rows', 'times', 'cpu_times', 'client_cpu_fraction',
+    'profiled_times', 'profiler', 'hotspots' ((function, share) pairs) and 'path'
+    """
+    iterations = iterations or config.PROFILE_ITERATIONS
+    profiler = profiler or config.PROFILER
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}', expected one of: {', '.join(PROFILERS)}")
+    directory = directory or config.PROFILE_DIRECTORY
+    os.makedirs(directory, exist_ok=True)
+
+    def execute():
+        params = parameters() if parameters else None
+        backend.acquire()
+        try:
+            return measure(lambda: backend.execute_measured(query, params)['rows'])
+        finally:
+            backend.release()
+
+    measured = [execute() for _ in range(iterations)]
+    stem = os.path.join(directory, re.sub(r'\W+', '_', f"{backend.name}-{name}".lower()))
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        profiled = []
+        for _ in range(iterations):
+            profile.enable()
+            profiled.append(execute())
+            profile.disable()
+        stats = pstats.Stats(profile)
+        hotspots = cprofile_hotspots(stats)
+        path = stem + '.prof'
+        stats.dump_stats(path)
+    else:
+        with StackSampler(interval) as sampler:
+            profiled = []
+            for _ in range(iterations):
+                sampler.active.set()
+                profiled.append(execute())
+                sampler.active.clear()
+        hotspots = sampled_hotspots(sampler.stacks) if sampler.stacks else []
+        path = stem + '.folded'
+        write_collapsed(sampler.stacks, path)
+
+    wall = sum(wall_ns for wall_ns, _, _ in measured)
+    return {
+        'name': name,
+        'rows': measured[-1][2],
+        'times': [wall_ns / NANOSECONDS for wall_ns, _, _ in measured],
+        'cpu_times': [cpu_ns / NANOSECONDS for _, cpu_ns, _ in measured],
+        'client_cpu_fraction': sum(cpu_ns for _, cpu_ns, _ in measured) / wall if wall else None,
+        'profiled_times': [wall_ns / NANOSECONDS for wall_ns, _, _ in profiled],
+        'profiler': profiler,
+        'hotspots': hotspots,
+        'path': path,
+    }
+
+
+def psycopg2_tuples(backend, query, params):
+    backend.cursor.execute(query, params)
+    return len(backend.cursor.fetchall())
+
+
+def psycopg3_tuples(connection, query, params, binary):
+    # binary=True asks the server for binary results, which skips parsing numbers and dates from text
+    with connection.cursor() as cursor:
+        cursor.execute(query, params, binary=binary)
+        return len(cursor.fetchall())
+
+
+def neo4j_records(backend, query, params):
+    return len(list(backend.session.run(query, params)))
+
+
+def neo4j_values(backend, query, params):
+    return len(backend.session.run(query, params).values())
+
+
+def neo4j_data(backend, query, params):
+    return len(backend.session.run(query, params).data())
+
+
+def neo4j_dataframe(backend, query, params):
+    return len(backend.session.run(query, params).to_df())
+
+
+def decoding_strategies(backend, stack):
+    """
+    Ways of turning a result into Python rows on this backend's driver
+
+    PostgreSQL compares psycopg2's tuples with psycopg 3 in text and binary
+    format, on a connection of its own that `stack` (a contextlib.ExitStack)
+    closes; without psycopg 3 installed only psycopg2 is measured. Neo4j
+    compares Record objects with Result.values(), Result.data() and
+    Result.to_df().
+
+    Returns:
+    list: (strategy name, function(query, params) returning the row count)
+    """
+    if backend.dialect == 'neo4j':
+        return [(name, functools.partial(fetch, backend)) for name, fetch in (
+            ('records', neo4j_records), ('values()', neo4j_values), ('data()', neo4j_data),
+            ('to_df()', neo4j_dataframe))]
+
+    strategies = [('psycopg2 tuples', functools.partial(psycopg2_tuples, backend))]
+    try:
+        import psycopg
+    except ImportError:
+        print("psycopg 3 is not installed, only psycopg2 decoding is measured")
+        return strategies
+    connection = psycopg.connect(**backend.settings, autocommit=True)
+    stack.callback(connection.close)
+    strategies += [('psycopg3 text', functools.partial(psycopg3_tuples, connection, binary=False)),
+                   ('psycopg3 binary', functools.partial(psycopg3_tuples, connection, binary=True))]
+    return strategies
+
+
+def compare_decoding(backend, name, query, strategies, iterations=None, parameters=None):
+    """
+    Time every decoding strategy on the same query
+
+    Strategies take turns within each iteration, with the same parameter
+    values, so server-side drift affects them alike; each runs once untimed
+    first to load its code paths.
+
+    Returns:
+    list: one dict per strategy with 'name', 'strategy', 'rows', 'median',
+    'client_cpu_fraction' and 'relative' (median against the first strategy's)
+    """
+    iterations = iterations or config.PROFILE_ITERATIONS
+    samples = {strategy: [] for strategy, _ in strategies}
+    rows = {}
+    backend.acquire()
+    try:
+        for i in range(iterations + 1):
+            params = parameters() if parameters else None
+            for strategy, fetch in strategies:
+                wall_ns, cpu_ns, count = measure(lambda: fetch(query, params))
+                rows[strategy] = count
+                if i:
+                    samples[strategy].append((wall_ns, cpu_ns))
+    finally:
+        backend.release()
+
+    comparison = []
+    for strategy, _ in strategies:
+        wall = sum(wall_ns for wall_ns, _ in samples[strategy])
+        comparison.append({
+            'name': name,
+            'strategy': strategy,
+            'rows': rows[strategy],
+            'median': statistics.median(wall_ns for wall_ns, _ in samples[strategy]) / NANOSECONDS,
+            'client_cpu_fraction': sum(cpu_ns for _, cpu_ns in samples[strategy]) / wall if wall else None,
+        })
+    for entry in comparison:
+        entry['relative'] = entry['median'] / comparison[0]['median'] if comparison[0]['median'] else None
+    return comparison
+
+
+def profile_backend(backend_key, query_names=None, iterations=None, profiler=None, interval=None, directory=None,
+                    decoding=True, parameterized=False):
+    """
+    Profile the client side of every query on one backend
+
+    Uses a persistent connection and buffered fetching, so the time left
+    outside the server is the driver's. Query templates get parameters drawn
+    from the loaded data, like a benchmark run.
+
+    Returns:
+    tuple: (profile_query results, compare_decoding results of every query)
+    """
+    backend = get_backend(backend_key, fetch_mode='buffered', connection_mode='persistent')
+    queries = load_queries(backend.dialect, parameterized=parameterized)
+    if query_names:
+        queries = [(name, query) for name, query in queries if name in query_names]
+    profiles = []
+    comparisons = []
+    print(f"Profiling {backend.name}")
+    backend.connect()
+    try:
+        with contextlib.ExitStack() as stack:
+            generator = parameter_generator(backend, queries)
+            strategies = decoding_strategies(backend, stack) if decoding else []
+            for name, query in queries:
+                parameters = generator.sampler(backend.dialect, query) if generator else None
+                print(f"Profiling {name} with {profiler or config.PROFILER}")
+                profiles.append(profile_query(backend, name, query, iterations, parameters, profiler, interval,
+                                              directory))
+                if strategies:
+                    comparisons.extend(compare_decoding(backend, name, query, strategies, iterations, parameters))
+    finally:
+        backend.close()
+    return profiles, comparisons
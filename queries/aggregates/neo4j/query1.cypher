@@ -0,0 +1,10 @@
+MATCH (a:Account)
+WHERE a.bench_transaction_count > 100
+OPTIONAL MATCH (a)-[:HAS_DISP]->(d:Disp)-[:BELONGS_TO]->(c:Client)
+WITH a, COUNT(c) AS holders
+RETURN a.account_id, a.bench_transaction_count AS transaction_count,
+    a.bench_total_amount * CASE WHEN holders > 0 THEN holders ELSE 1 END AS total_amount,
+    a.bench_total_amount / a.bench_transaction_count AS avg_transaction_amount,
+    a.bench_max_amount AS max_transaction_amount
+ORDER BY total_amount DESC
+LIMIT 100;
@@ -0,0 +1,8 @@
+MATCH (c:Client)-[:HAS_DISPOSITION]->(a:Account)-[:HAS_BENCH_WEEK]->(w:BenchWeek)
+WITH c.client_id AS client_id,
+    w.year AS year,
+    w.week AS week,
+    min(w.earliest_transaction_date) AS earliest_transaction_date,
+    sum(w.total_amount) AS total_amount
+RETURN client_id, year, week, earliest_transaction_date, total_amount
+ORDER BY year DESC, week DESC, earliest_transaction_date DESC;
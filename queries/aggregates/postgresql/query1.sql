@@ -0,0 +1,13 @@
+SELECT
+account_id,
+transaction_count,
+total_amount,
+avg_transaction_amount,
+max_transaction_amount
+FROM
+    bench_account_totals
+WHERE
+    transaction_count > 100
+ORDER BY
+    total_amount DESC
+LIMIT 100;
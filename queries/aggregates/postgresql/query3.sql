@@ -0,0 +1,10 @@
+SELECT
+client_id,
+transaction_date,
+total_amount,
+week_of_year,
+year
+FROM
+bench_client_weeks
+ORDER BY
+year DESC, week_of_year DESC, transaction_date DESC;
@@ -0,0 +1,10 @@
+MATCH (a:Account)-[:HAS_TRANSACTION]->(t:Transaction)
+OPTIONAL MATCH (a)-[:HAS_DISP]->(d:Disp)-[:BELONGS_TO]->(c:Client)
+WITH a, COUNT(DISTINCT t) AS transaction_count,
+    SUM(toFloat(t.amount)) AS total_amount,
+    AVG(toFloat(t.amount)) AS avg_transaction_amount,
+    MAX(toFloat(t.amount)) AS max_transaction_amount
+WHERE transaction_count > 100
+RETURN a.account_id, transaction_count, total_amount, avg_transaction_amount, max_transaction_amount
+ORDER BY total_amount DESC
+LIMIT 100;
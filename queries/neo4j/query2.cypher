@@ -0,0 +1,14 @@
+MATCH (a:Account)-[:HAS_TRANSACTION]->(t:Transaction)
+WITH a, t, toFloat(t.amount) AS trans_amount
+WITH a, COLLECT(trans_amount) AS transactions
+WITH a, transactions,
+    REDUCE(sum = 0.0, amount IN transactions | sum + amount) AS total_amount,
+    REDUCE(count = 0, amount IN transactions | count + 1) AS total_transactions
+WITH a, total_amount / total_transactions AS avg_amount, transactions
+UNWIND transactions AS trans_amount
+WITH a, trans_amount, avg_amount
+WHERE trans_amount > 1.5 * avg_amount
+WITH a, COUNT(trans_amount) AS high_value_count, AVG(trans_amount) AS high_value_avg, MAX(trans_amount) AS max_moving_avg
+WHERE high_value_count >= 6
+RETURN a.account_id AS account_id, high_value_count, high_value_avg, max_moving_avg
+ORDER BY high_value_avg DESC
@@ -0,0 +1,8 @@
+MATCH (c:Client)-[:HAS_DISPOSITION]->(a:Account)-[:HAS_TRANSACTION]->(t:Transaction)
+WITH c.client_id AS client_id,
+    toInteger(date(t.date).year) AS year,
+    toInteger(date(t.date).week) AS week,
+    min(t.date) AS earliest_transaction_date,
+    sum(toInteger(t.amount)) AS total_amount
+RETURN client_id, year, week, earliest_transaction_date, total_amount
+ORDER BY year DESC, week DESC, earliest_transaction_date DESC;
@@ -0,0 +1,5 @@
+MATCH (a:Account {account_id: $account_id})-[:HAS_TRANSACTION]->(t:Transaction)
+WHERE t.date >= $start_date AND t.date <= $end_date
+RETURN t.trans_id AS trans_id, t.date AS date, t.type AS type, t.operation AS operation,
+    toFloat(t.amount) AS amount, toFloat(t.balance) AS balance
+ORDER BY date, trans_id
@@ -0,0 +1,6 @@
+MATCH (a:Account)-[:HAS_DISP]->(d:Disp)-[:BELONGS_TO]->(c:Client {client_id: $client_id})
+MATCH (c)-[:LIVES_IN]->(dist:District)
+OPTIONAL MATCH (a)-[:HAS_LOAN]->(l:Loan)
+RETURN c.client_id AS client_id, c.gender AS gender, c.birth_date AS birth_date,
+    d.type AS disposition_type, a.account_id AS account_id, a.frequency AS frequency,
+    dist.a2 AS district_name, COUNT(l) AS loan_count
@@ -0,0 +1,14 @@
+SELECT
+t.trans_id,
+t.date,
+t.type,
+t.operation,
+t.amount,
+t.balance
+FROM
+    trans t
+WHERE
+    t.account_id = %(account_id)s
+    AND t.date BETWEEN %(start_date)s AND %(end_date)s
+ORDER BY
+    t.date, t.trans_id;
@@ -0,0 +1,23 @@
+SELECT
+c.client_id,
+c.gender,
+c.birth_date,
+d.type AS disposition_type,
+a.account_id,
+a.frequency,
+dist.a2 AS district_name,
+COUNT(l.loan_id) AS loan_count
+FROM
+    client c
+JOIN
+    disp d ON c.client_id = d.client_id
+JOIN
+    account a ON d.account_id = a.account_id
+JOIN
+    district dist ON c.district_id = dist.district_id
+LEFT JOIN
+    loan l ON a.account_id = l.account_id
+WHERE
+    c.client_id = %(client_id)s
+GROUP BY
+    c.client_id, c.gender, c.birth_date, d.type, a.account_id, a.frequency, dist.a2;
@@ -0,0 +1,25 @@
+SELECT
+a.account_id,
+COUNT(DISTINCT t.trans_id) AS transaction_count,
+SUM(t.amount) AS total_amount,
+AVG(t.amount) AS avg_transaction_amount,
+(
+    SELECT MAX(t2.amount)
+    FROM trans t2
+    WHERE t2.account_id = a.account_id
+) AS max_transaction_amount
+FROM
+    account a
+LEFT JOIN
+    trans t ON a.account_id = t.account_id
+LEFT JOIN
+    disp d ON a.account_id = d.account_id
+LEFT JOIN
+    client c ON d.client_id = c.client_id
+GROUP BY
+    a.account_id
+HAVING
+    COUNT(DISTINCT t.trans_id) > 100
+ORDER BY
+    total_amount DESC
+LIMIT 100;
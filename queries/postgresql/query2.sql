@@ -0,0 +1,38 @@
+WITH ranked_transactions AS (
+SELECT
+t.account_id,
+t.trans_id AS transaction_id,
+t.amount,
+t.date AS transaction_date,
+ROW_NUMBER() OVER (PARTITION BY t.account_id ORDER BY t.amount DESC) AS amount_rank,
+AVG(t.amount) OVER (
+    PARTITION BY t.account_id
+    ORDER BY t.date ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+) AS moving_avg
+FROM
+    trans t
+JOIN
+    account a ON t.account_id = a.account_id
+JOIN
+    disp d ON a.account_id = d.account_id
+JOIN
+    client c ON d.client_id = c.client_id
+WHERE
+    d.type = 'OWNER'
+)
+SELECT
+    rt.account_id,
+    COUNT(*) AS high_value_transactions,
+    AVG(rt.amount) AS avg_high_value_amount,
+    MAX(rt.moving_avg) AS max_moving_avg
+FROM
+    ranked_transactions rt
+WHERE
+    rt.amount_rank <= 10
+    AND rt.amount > rt.moving_avg * 1.5
+GROUP BY
+    rt.account_id
+HAVING
+    COUNT(*) > 5
+ORDER BY
+    avg_high_value_amount DESC;
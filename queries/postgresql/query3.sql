@@ -0,0 +1,15 @@
+SELECT
+c.client_id,
+MIN(t.date) AS transaction_date,  -- Get the earliest transaction date for the week
+SUM(t.amount) AS total_amount,
+EXTRACT(week FROM t.date) AS week_of_year,
+EXTRACT(year FROM t.date) AS year
+FROM
+client c
+LEFT JOIN disp d ON c.client_id = d.client_id
+LEFT JOIN account a ON d.account_id = a.account_id
+LEFT JOIN trans t ON a.account_id = t.account_id
+GROUP BY
+c.client_id, EXTRACT(week FROM t.date), EXTRACT(year FROM t.date)
+ORDER BY
+year DESC, week_of_year DESC, transaction_date DESC;
@@ -0,0 +1,86 @@
+import json
+import math
+import os
+
+import pandas as pd
+
+from resultstore import write_atomically
+
+# Per-execution detail left out of result reports; the results store keeps every sample
+REPORT_EXCLUDED_KEYS = {'histogram', 'connect_histogram', 'phases', 'intervals', 'telemetry', 'plan'}
+
+REPORT_FORMATS = ('.json', '.parquet')
+
+
+def json_safe(value):
+    # Plain JSON types: NumPy values become Python ones, NaN and infinity null, anything else its text
+    if isinstance(value, dict):
+        return {str(key): json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if hasattr(value, 'tolist'):
+        return json_safe(value.tolist())
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def result_records(results):
+    """
+    Benchmark result dicts as JSON-ready records, one per query
+
+    Histograms, per-execution phases, telemetry samples and plan trees are
+    dropped; 'times' keeps the measured times and the plan is reduced to its
+    'plan_fingerprint'.
+    """
+    records = []
+    for result in results:
+        record = {key: value for key, value in result.items() if key not in REPORT_EXCLUDED_KEYS}
+        if result.get('plan'):
+            record['plan_fingerprint'] = result['plan']['fingerprint']
+        records.append(json_safe(record))
+    return records
+
+
+def load_records(summaries):
+    """
+    Load generation summaries (loadgen.run_load, asyncload.run_async_load) as JSON-ready records
+
+    One record per backend; 'queries' keeps each query's statistics without
+    its histogram.
+    """
+    records = []
+    for summary in summaries:
+        record = dict(summary)
+        record['queries'] = [{key: value for key, value in query.items() if key not in REPORT_EXCLUDED_KEYS}
+                             for query in summary['queries']]
+        records.append(json_safe(record))
+    return records
+
+
+def frame_records(frame):
+    """A DataFrame such as the ANOVA table as JSON-ready records"""
+    return json_safe(frame.to_dict('records'))
+
+
+def write_report(records, path):
+    """
+    Write records as a JSON array or a Parquet table, chosen by the file extension
+
+    Parquet flattens nested dicts into dotted columns, e.g. 'phase_means.fetch_time',
+    and keeps lists such as 'times' as list columns.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format '{extension}', expected one of: {', '.join(REPORT_FORMATS)}")
+    if extension == '.json':
+        def write_json(rows, temporary):
+            with open(temporary, 'w') as f:
+                json.dump(rows, f, indent=2)
+
+        write_atomically(records, path, write_json)
+    else:
+        write_atomically(pd.json_normalize(records), path, lambda f, p: f.to_parquet(p, index=False))
+    print(f"Report written to {path}")
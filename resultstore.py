@@ -0,0 +1,244 @@
+import datetime
+import glob
+import hashlib
+import json
+import os
+import platform
+import socket
+import uuid
+
+import pandas as pd
+
+import config
+from hardware import local_hardware
+
+# Columns of the original experiment CSV, in order
+EXPERIMENT_COLUMNS = ['Computer', 'Database', 'Query', 'Replication', 'Response_Time']
+
+# Extra experiment factors recorded with every sample
+FACTOR_COLUMNS = ['Variant', 'Cache_Mode', 'Fetch_Mode', 'Connection_Mode', 'Statement_Mode', 'Workload']
+
+RUN_COLUMNS = ['Run_Id', 'Host_Fingerprint', 'Timestamp', 'Plan_Fingerprint']
+
+# The machine the database server ran on (hardware.server_hardware)
+HARDWARE_COLUMNS = ['Hardware_Fingerprint', 'CPU_Model', 'CPU_Cores', 'RAM_GB', 'Disk_Type']
+
+# Captured query plans (plans.capture) go to their own files in this subdirectory, one row per query and run
+PLAN_DIRECTORY = 'plans'
+PLAN_COLUMNS = ['Computer', 'Database', 'Query', 'Variant', 'Statement_Mode', 'Run_Id', 'Timestamp', 'Fingerprint',
+                'Operators', 'Plan']
+
+# Per-execution telemetry (telemetry.attach) is stored as Telemetry_<metric> columns
+TELEMETRY_PREFIX = 'Telemetry_'
+
+
+def new_run_id():
+    return uuid.uuid4().hex
+
+
+def computer_name():
+    return config.COMPUTER_NAME or socket.gethostname()
+
+
+def total_memory_bytes():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def host_fingerprint():
+    """Short, stable hash of the machine the benchmark ran on"""
+    parts = [platform.node(), platform.system(), platform.machine(), platform.processor(),
+             str(os.cpu_count()), str(total_memory_bytes())]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:12]
+
+
+def results_to_frame(results, run_id, computer=None, timestamp=None, hardware=None):
+    """
+    One row per measured execution, keyed like the experiment CSV
+
+    Replication numbers the executions of each (Database, Query, Variant)
+    within the run, starting at 1. hardware describes the server's machine
+    and defaults to this one. Results with telemetry add one
+    Telemetry_<metric> column per sampled metric.
+    """
+    computer = computer or computer_name()
+    timestamp = timestamp or datetime.datetime.now(datetime.timezone.utc).isoformat()
+    fingerprint = host_fingerprint()
+    hardware = hardware or local_hardware()
+    rows = []
+    telemetry_columns = set()
+    for result in results:
+        telemetry = result.get('telemetry') or []
+        plan = result.get('plan')
+        for replication, response_time in enumerate(result['times'], start=1):
+            row = {
+                'Computer': computer,
+                'Database': result['database'],
+                'Query': result['name'],
+                'Replication': replication,
+                'Response_Time': response_time,
+                'Variant': result.get('variant', 'none'),
+                'Cache_Mode': result.get('cache_mode'),
+                'Fetch_Mode': result.get('fetch_mode'),
+                'Connection_Mode': result.get('connection_mode'),
+                'Statement_Mode': result.get('statement_mode'),
+                'Workload': result.get('workload', 'read-only'),
+                'Run_Id': run_id,
+                'Host_Fingerprint': fingerprint,
+                'Timestamp': timestamp,
+                'Plan_Fingerprint': plan['fingerprint'] if plan else None,
+                'Hardware_Fingerprint': hardware['fingerprint'],
+                'CPU_Model': hardware['cpu_model'],
+                'CPU_Cores': hardware['cpu_cores'],
+                'RAM_GB': hardware['ram_gb'],
+                'Disk_Type': hardware['disk_type'],
+            }
+            if replication <= len(telemetry):
+                for metric, value in telemetry[replication - 1].items():
+                    row[TELEMETRY_PREFIX + metric] = value
+                    telemetry_columns.add(TELEMETRY_PREFIX + metric)
+            rows.append(row)
+    return pd.DataFrame(rows, columns=EXPERIMENT_COLUMNS + FACTOR_COLUMNS + RUN_COLUMNS + HARDWARE_COLUMNS
+                        + sorted(telemetry_columns))
+
+
+def plans_to_frame(results, run_id, computer=None, timestamp=None):
+    """One row per result with a captured plan; operators and tree are stored as JSON text"""
+    computer = computer or computer_name()
+    timestamp = timestamp or datetime.datetime.now(datetime.timezone.utc).isoformat()
+    rows = []
+    for result in results:
+        plan = result.get('plan')
+        if not plan:
+            continue
+        rows.append({
+            'Computer': computer,
+            'Database': result['database'],
+            'Query': result['name'],
+            'Variant': result.get('variant', 'none'),
+            'Statement_Mode': result.get('statement_mode'),
+            'Run_Id': run_id,
+            'Timestamp': timestamp,
+            'Fingerprint': plan['fingerprint'],
+            'Operators': json.dumps(plan['operators']),
+            'Plan': json.dumps(plan['tree']),
+        })
+    return pd.DataFrame(rows, columns=PLAN_COLUMNS)
+
+
+def write_atomically(frame, path, writer):
+    # Write next to the target and rename, so readers never see a half-written file
+    directory, name = os.path.split(path)
+    temporary = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        writer(frame, temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def append_results(results, run_id=None, directory=None, computer=None, hardware=None):
+    """
+    Add a run's results to the append-only results store
+
+    Every call writes its own Parquet file, named by timestamp and run id, so
+    any number of processes or machines can write to a shared directory
+    without locking; read_results merges them. Captured plans are written
+    the same way under <directory>/plans.
+
+    Returns:
+    str: path of the written file, or None when there was nothing to record
+    """
+    directory = directory or config.RESULTS_DIRECTORY
+    run_id = run_id or new_run_id()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    frame = results_to_frame(results, run_id, computer, now.isoformat(), hardware)
+    if frame.empty:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    name = f"{now.strftime('%Y%m%dT%H%M%S')}_{run_id}_{uuid.uuid4().hex[:8]}.parquet"
+    path = os.path.join(directory, name)
+    write_atomically(frame, path, lambda f, p: f.to_parquet(p, index=False))
+
+    plans = plans_to_frame(results, run_id, computer, now.isoformat())
+    if not plans.empty:
+        os.makedirs(os.path.join(directory, PLAN_DIRECTORY), exist_ok=True)
+        write_atomically(plans, os.path.join(directory, PLAN_DIRECTORY, name),
+                         lambda f, p: f.to_parquet(p, index=False))
+    return path
+
+
+def read_results(directory=None):
+    """All recorded samples from every run and machine in one DataFrame"""
+    directory = directory or config.RESULTS_DIRECTORY
+    paths = sorted(glob.glob(os.path.join(directory, '*.parquet')))
+    if not paths:
+        return pd.DataFrame(columns=EXPERIMENT_COLUMNS + FACTOR_COLUMNS + RUN_COLUMNS + HARDWARE_COLUMNS)
+    return pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+
+
+def read_plans(directory=None):
+    """Every captured plan in the store, oldest first"""
+    directory = directory or config.RESULTS_DIRECTORY
+    paths = sorted(glob.glob(os.path.join(directory, PLAN_DIRECTORY, '*.parquet')))
+    if not paths:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+    frame = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    return frame.sort_values('Timestamp', kind='stable', ignore_index=True)
+
+
+def export_csv(path, directory=None, include_factors=False):
+    """
+    Write the store in the layout of 'DBMS Experiment Data.csv'
+
+    Replications are renumbered across runs per (Computer, Database, Query)
+    so merged runs don't collide. include_factors keeps the extra factor,
+    run and hardware columns and numbers replications per level of those
+    factors too. Without them, runs that differ in a factor would pool into
+    one cell and pass for replications, so that is refused.
+
+    Returns:
+    int: number of rows written
+    """
+    frame = read_results(directory)
+    cell = ['Computer', 'Database', 'Query']
+    if include_factors:
+        cell += [column for column in FACTOR_COLUMNS if column in frame]
+    else:
+        varying = [column for column in FACTOR_COLUMNS if column in frame and frame[column].nunique() > 1]
+        if varying:
+            raise ValueError(f"The results vary in {', '.join(varying)}; export with the factor columns "
+                             f"or from a store holding one level of each")
+    if not frame.empty:
+        frame = frame.sort_values(['Timestamp', 'Run_Id', 'Replication'], kind='stable')
+        frame['Replication'] = frame.groupby(cell, dropna=False).cumcount() + 1
+        frame = frame.sort_values(['Computer', 'Database', 'Query', 'Replication'], kind='stable')
+    columns = EXPERIMENT_COLUMNS + (FACTOR_COLUMNS + RUN_COLUMNS + HARDWARE_COLUMNS if include_factors else [])
+    write_atomically(frame.reindex(columns=columns), path, lambda f, p: f.to_csv(p, index=False))
+    return len(frame)
+
+
+def load_result_set(source, directory=None):
+    """
+    Samples from a results-store directory, a Parquet or CSV file, or a run id
+
+    A source that isn't an existing path is looked up as a Run_Id (or a
+    prefix of one) in the results store.
+
+    Returns:
+    DataFrame: the samples, at least in the experiment CSV columns
+    """
+    if os.path.isdir(source):
+        return read_results(source)
+    if os.path.isfile(source):
+        if source.endswith('.parquet'):
+            return pd.read_parquet(source)
+        return pd.read_csv(source)
+    frame = read_results(directory)
+    selected = frame[frame['Run_Id'].astype(str).str.startswith(source)]
+    if selected.empty:
+        raise ValueError(f"No results file, directory or run id matching '{source}'")
+    return selected
@@ -0,0 +1,99 @@
+import csv
+import os
+
+from backends import get_backend
+from benchmark import run_benchmark
+from datagen import generate_dataset, table_rows
+from loader import load_dataset
+
+
+def run_scaling_sweep(scales, backend_keys, out_dir, iterations=None, warmup=None, seed=None, capture_plans=None):
+    """
+    Generate, load and benchmark the dataset at every scale factor
+
+    Each scale factor gets its own data directory under out_dir; every backend
+    is reloaded from it (tables truncated, Neo4j emptied) before its queries run.
+    The timings are deliberately not appended to the results store: it has no
+    scale factor column, so runs at different scales would pool into the same
+    ANOVA cells. scaling.csv is the sweep's record.
+
+    Returns:
+    list: one row per (scale, backend, query) with the trans row count as data
+    size and, with capture_plans, the fingerprint of the plan the query ran with
+    """
+    rows = []
+    for scale in scales:
+        data_dir = os.path.join(out_dir, f"sf{scale:g}")
+        print(f"===== Scale factor {scale:g} =====")
+        generate_dataset(scale, data_dir, seed)
+        for backend_key in backend_keys:
+            load_dataset(backend_key, data_dir, truncate=True)
+            backend = get_backend(backend_key)
+            backend.connect()
+            try:
+                results = run_benchmark(backend, iterations=iterations, warmup=warmup, capture_plans=capture_plans)
+            finally:
+                backend.close()
+            for result in results:
+                rows.append({
+                    'scale': scale,
+                    'trans_rows': table_rows('trans', scale),
+                    'database': result['database'],
+                    'query': result['name'],
+                    'avg_time': result['avg_time'],
+                    'p50': result['p50'],
+                    'p99': result['p99'],
+                    'plan_fingerprint': result['plan']['fingerprint'] if result.get('plan') else '',
+                })
+    return rows
+
+
+def scaling_plan_changes(rows):
+    """(database, query, smaller scale, larger scale) wherever the plan changed between consecutive scales"""
+    changes = []
+    last = {}
+    for row in sorted(rows, key=lambda row: row['scale']):
+        key = (row['database'], row['query'])
+        if not row['plan_fingerprint']:
+            continue
+        if key in last and last[key]['plan_fingerprint'] != row['plan_fingerprint']:
+            changes.append((row['database'], row['query'], last[key]['scale'], row['scale']))
+        last[key] = row
+    return changes
+
+
+def save_scaling_rows(rows, path):
+    # Without rows there are no columns to write a header from
+    if not rows:
+        return False
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return True
+
+
+def plot_scaling(rows, path):
+    """Log-log latency against data size, one panel per query and one line per backend"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    queries = sorted({row['query'] for row in rows})
+    figure, axes = plt.subplots(1, len(queries), figsize=(5 * len(queries), 4), squeeze=False)
+    for axis, query in zip(axes[0], queries):
+        for database in sorted({row['database'] for row in rows}):
+            points = sorted((row['trans_rows'], row['p50']) for row in rows
+                            if row['query'] == query and row['database'] == database)
+            if points:
+                axis.plot(*zip(*points), marker='o', label=database)
+        # A straight line of slope 1 on log-log axes is linear scaling
+        axis.set_xscale('log')
+        axis.set_yscale('log')
+        axis.set_title(query)
+        axis.set_xlabel("Transactions")
+        axis.set_ylabel("Median latency (s)")
+        axis.legend()
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
@@ -0,0 +1,81 @@
+-- PKDD'99 financial dataset (8 tables), shared by PostgreSQL and TimescaleDB.
+-- Only primary keys are declared; secondary indexes are part of the experiment.
+
+CREATE TABLE IF NOT EXISTS district (
+    district_id INTEGER PRIMARY KEY,
+    a2 TEXT,
+    a3 TEXT,
+    a4 INTEGER,
+    a5 INTEGER,
+    a6 INTEGER,
+    a7 INTEGER,
+    a8 INTEGER,
+    a9 INTEGER,
+    a10 NUMERIC,
+    a11 INTEGER,
+    a12 NUMERIC,
+    a13 NUMERIC,
+    a14 INTEGER,
+    a15 INTEGER,
+    a16 INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS account (
+    account_id INTEGER PRIMARY KEY,
+    district_id INTEGER,
+    frequency TEXT,
+    date DATE
+);
+
+CREATE TABLE IF NOT EXISTS client (
+    client_id INTEGER PRIMARY KEY,
+    gender TEXT,
+    birth_date DATE,
+    district_id INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS disp (
+    disp_id INTEGER PRIMARY KEY,
+    client_id INTEGER,
+    account_id INTEGER,
+    type TEXT
+);
+
+CREATE TABLE IF NOT EXISTS card (
+    card_id INTEGER PRIMARY KEY,
+    disp_id INTEGER,
+    type TEXT,
+    issued DATE
+);
+
+CREATE TABLE IF NOT EXISTS loan (
+    loan_id INTEGER PRIMARY KEY,
+    account_id INTEGER,
+    date DATE,
+    amount NUMERIC,
+    duration INTEGER,
+    payments NUMERIC,
+    status TEXT
+);
+
+CREATE TABLE IF NOT EXISTS "order" (
+    order_id INTEGER PRIMARY KEY,
+    account_id INTEGER,
+    bank_to TEXT,
+    account_to TEXT,
+    amount NUMERIC,
+    k_symbol TEXT
+);
+
+CREATE TABLE IF NOT EXISTS trans (
+    trans_id INTEGER PRIMARY KEY,
+    account_id INTEGER,
+    date DATE,
+    type TEXT,
+    operation TEXT,
+    amount NUMERIC,
+    balance NUMERIC,
+    k_symbol TEXT,
+    bank TEXT,
+    account TEXT
+);
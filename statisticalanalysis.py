@@ -1,142 +1,293 @@
+import itertools
+import string
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
 import pandas as pd
 import numpy as np
 from scipy import stats
 
-def calculate_anova_table(df):
+DEFAULT_FACTORS = ['Database', 'Query', 'Computer']
+
+# Statistics compared between benchmark runs, as quantiles of the response times
+COMPARED_STATISTICS = {'median': 0.5, 'p99': 0.99}
+
+# Upper bound on resampled values held in memory at once per cell
+BOOTSTRAP_BLOCK_VALUES = 4_000_000
+
+# Upper bound on the ANOVA design matrix: one row per non-empty cell and, as
+# every interaction is modelled, one column per cell (8 bytes a value)
+ANOVA_MAX_DESIGN_VALUES = 50_000_000
+
+
+def effect_coding(n_levels):
+    """
+    Intercept plus sum-to-zero contrast columns for one factor
+
+    Returns:
+    ndarray: n_levels x n_levels matrix; column 0 is the intercept, the other
+    n_levels - 1 columns contrast each level against the last one
     """
-    Calculate complete ANOVA table for three-way design with replications
-    
+    contrasts = np.vstack([np.eye(n_levels - 1), -np.ones((1, n_levels - 1))])
+    return np.hstack([np.ones((n_levels, 1)), contrasts])
+
+
+def cell_statistics(df, factors, response):
+    """
+    Reduce the data to per-cell counts, sums and sums of squares in one pass
+
+    Cells are every combination of factor levels, laid out as a flattened
+    tensor in C order (the first factor varies slowest).
+
+    Returns:
+    tuple: (level counts per factor, cell counts, cell sums, cell sums of squares)
+    """
+    codes = []
+    shape = []
+    for factor in factors:
+        factor_codes, levels = pd.factorize(df[factor], sort=True)
+        codes.append(factor_codes)
+        shape.append(len(levels))
+    cell = np.ravel_multi_index(codes, shape)
+    y = df[response].to_numpy(dtype=float)
+    n_cells = int(np.prod(shape))
+    counts = np.bincount(cell, minlength=n_cells).astype(float)
+    sums = np.bincount(cell, weights=y, minlength=n_cells)
+    squares = np.bincount(cell, weights=y * y, minlength=n_cells)
+    return shape, counts, sums, squares
+
+
+def weighted_rss(X, y, columns):
+    # Residual sum of squares and rank of a least-squares fit on the chosen columns
+    if not columns.any():
+        return y @ y, 0
+    beta, _, rank, _ = np.linalg.lstsq(X[:, columns], y, rcond=None)
+    residual = y - X[:, columns] @ beta
+    return residual @ residual, rank
+
+
+def term_label(term, factors):
+    letters = [string.ascii_uppercase[i] for i in term]
+    if len(term) == 1:
+        return f"{factors[term[0]]} ({letters[0]})"
+    return ' × '.join(letters)
+
+
+def calculate_anova_table(df, factors=None, response='Response_Time', ss_type=3):
+    """
+    Calculate complete ANOVA table for an N-way factorial design with replications
+
+    Every main effect and interaction of the given factors is tested. Blank
+    responses are dropped, and unbalanced designs (unequal replications, empty
+    cells) are handled with Type II or Type III sums of squares from weighted
+    least squares on the cell means. The raw rows are only read once to build
+    per-cell statistics, so the cost grows with the number of cells rather
+    than the number of rows. For balanced data both types equal the classic
+    sums of squares.
+
     Parameters:
-    df: DataFrame with columns Database, Query, Computer, Response_Time, Replication
-    
+    df: DataFrame with the factor columns and the response column
+    factors: factor column names, defaults to Database, Query, Computer
+    response: response column name, defaults to Response_Time
+    ss_type: 2 or 3
+
     Returns:
-    DataFrame: ANOVA table with SS, df, MS, F-values, and p-values
+    DataFrame: ANOVA table with SS, df, MS, F-values, and p-values. Terms
+    of a factor with a single level have no degrees of freedom and are NaN.
+    Raises ValueError when no row has both a response and every factor, or
+    when the design has more cells than ANOVA_MAX_DESIGN_VALUES allows for.
     """
-    # Calculate Sum of Squares components
-    n_databases = len(df['Database'].unique())
-    n_queries = len(df['Query'].unique())
-    n_computers = len(df['Computer'].unique())
-    n_replications = len(df['Replication'].unique())
+    factors = list(factors or DEFAULT_FACTORS)
+    if ss_type not in (2, 3):
+        raise ValueError("ss_type must be 2 or 3")
+
+    df = df.assign(**{response: pd.to_numeric(df[response], errors='coerce')})
+    df = df.dropna(subset=factors + [response])
+    if df.empty:
+        raise ValueError(f"No rows with a {response} and every factor ({', '.join(factors)}) to analyze")
     n_total = len(df)
-    
-    # Overall Mean
-    overall_mean = df['Response_Time'].mean()
-    
-    # Total Sum of Squares
-    SS_Total = np.sum((df['Response_Time'] - overall_mean) ** 2)
-    
-    # Main Effects
-    db_means = df.groupby('Database')['Response_Time'].mean()
-    SS_A = n_queries * n_computers * n_replications * np.sum((db_means - overall_mean) ** 2)
-    
-    query_means = df.groupby('Query')['Response_Time'].mean()
-    SS_B = n_databases * n_computers * n_replications * np.sum((query_means - overall_mean) ** 2)
-    
-    computer_means = df.groupby('Computer')['Response_Time'].mean()
-    SS_C = n_databases * n_queries * n_replications * np.sum((computer_means - overall_mean) ** 2)
-    
-    # Interaction Effects
-    db_query_means = df.groupby(['Database', 'Query'])['Response_Time'].mean()
-    SS_AB = n_computers * n_replications * np.sum(
-        (db_query_means - 
-         db_query_means.index.get_level_values('Database').map(db_means) - 
-         db_query_means.index.get_level_values('Query').map(query_means) + 
-         overall_mean) ** 2
-    )
-    
-    db_comp_means = df.groupby(['Database', 'Computer'])['Response_Time'].mean()
-    SS_AC = n_queries * n_replications * np.sum(
-        (db_comp_means - 
-         db_comp_means.index.get_level_values('Database').map(db_means) - 
-         db_comp_means.index.get_level_values('Computer').map(computer_means) + 
-         overall_mean) ** 2
-    )
-    
-    query_comp_means = df.groupby(['Query', 'Computer'])['Response_Time'].mean()
-    SS_BC = n_databases * n_replications * np.sum(
-        (query_comp_means - 
-         query_comp_means.index.get_level_values('Query').map(query_means) - 
-         query_comp_means.index.get_level_values('Computer').map(computer_means) + 
-         overall_mean) ** 2
-    )
-    
-    # Three-way interaction
-    db_query_comp_means = df.groupby(['Database', 'Query', 'Computer'])['Response_Time'].mean()
-    SS_ABC = n_replications * np.sum(
-        (db_query_comp_means - 
-         db_query_comp_means.index.get_level_values('Database').map(db_means) -
-         db_query_comp_means.index.get_level_values('Query').map(query_means) -
-         db_query_comp_means.index.get_level_values('Computer').map(computer_means) +
-         2 * overall_mean) ** 2
-    )
-    
+
+    shape, counts, sums, squares = cell_statistics(df, factors, response)
+    filled = counts > 0
+    cell_means = sums[filled] / counts[filled]
+
+    # Total and within-cell (pure error) sums of squares
+    SS_Total = squares.sum() - sums.sum() ** 2 / n_total
+    SS_Within = squares.sum() - np.sum(sums[filled] ** 2 / counts[filled])
+
+    # Effect-coded design over the non-empty cells: each row is the Kronecker
+    # product of its levels' rows in the per-factor codings, one column per
+    # (term, contrast). Empty cells never get a row
+    n_cells = int(np.prod(shape))
+    if filled.sum() * n_cells > ANOVA_MAX_DESIGN_VALUES:
+        raise ValueError(f"The {' × '.join(map(str, shape))} design of {', '.join(factors)} has {n_cells} cells, "
+                         f"too many to model every interaction; analyze fewer factors or levels")
+    levels = np.unravel_index(np.flatnonzero(filled), shape)
+    X = np.ones((len(cell_means), 1))
+    for codes, n in zip(levels, shape):
+        X = (X[:, :, None] * effect_coding(n)[codes][:, None, :]).reshape(len(X), -1)
+    # Bit mask of the factors each column belongs to (0 is the intercept)
+    column_terms = reduce(lambda a, b: np.add.outer(a, b).ravel(),
+                          [np.array([0] + [1 << i] * (n - 1)) for i, n in enumerate(shape)])
+
+    # Weighting every cell by its count makes the cell-level fit equal the row-level one
+    weights = np.sqrt(counts[filled])
+    Xw = X * weights[:, None]
+    yw = cell_means * weights
+
+    all_columns = np.ones(len(column_terms), dtype=bool)
+    rss_full, rank_full = weighted_rss(Xw, yw, all_columns)
+
+    sources = []
+    for order in range(1, len(factors) + 1):
+        for term in itertools.combinations(range(len(factors)), order):
+            mask = sum(1 << i for i in term)
+            in_term = column_terms == mask
+            if ss_type == 3:
+                # Drop the term from the full model
+                rss_without, rank_without = weighted_rss(Xw, yw, ~in_term)
+                rss_with, rank_with = rss_full, rank_full
+            else:
+                # Add the term to everything that doesn't contain it
+                containing = (column_terms & mask) == mask
+                rss_without, rank_without = weighted_rss(Xw, yw, ~containing)
+                rss_with, rank_with = weighted_rss(Xw, yw, ~containing | in_term)
+            sources.append((term_label(term, factors), rss_without - rss_with, rank_with - rank_without))
+
     # Error
-    SS_E = SS_Total - (SS_A + SS_B + SS_C + SS_AB + SS_AC + SS_BC + SS_ABC)
-    
-    # Degrees of Freedom
-    df_A = n_databases - 1
-    df_B = n_queries - 1
-    df_C = n_computers - 1
-    df_AB = df_A * df_B
-    df_AC = df_A * df_C
-    df_BC = df_B * df_C
-    df_ABC = df_A * df_B * df_C
-    df_E = n_total - (n_databases * n_queries * n_computers)
-    df_Total = n_total - 1
-    
-    # Mean Squares
-    MS_A = SS_A / df_A
-    MS_B = SS_B / df_B
-    MS_C = SS_C / df_C
-    MS_AB = SS_AB / df_AB
-    MS_AC = SS_AC / df_AC
-    MS_BC = SS_BC / df_BC
-    MS_ABC = SS_ABC / df_ABC
-    MS_E = SS_E / df_E
-    
-    # F Values
-    F_A = MS_A / MS_E
-    F_B = MS_B / MS_E
-    F_C = MS_C / MS_E
-    F_AB = MS_AB / MS_E
-    F_AC = MS_AC / MS_E
-    F_BC = MS_BC / MS_E
-    F_ABC = MS_ABC / MS_E
-    
-    # P Values
-    p_A = 1 - stats.f.cdf(F_A, df_A, df_E)
-    p_B = 1 - stats.f.cdf(F_B, df_B, df_E)
-    p_C = 1 - stats.f.cdf(F_C, df_C, df_E)
-    p_AB = 1 - stats.f.cdf(F_AB, df_AB, df_E)
-    p_AC = 1 - stats.f.cdf(F_AC, df_AC, df_E)
-    p_BC = 1 - stats.f.cdf(F_BC, df_BC, df_E)
-    p_ABC = 1 - stats.f.cdf(F_ABC, df_ABC, df_E)
-    
+    SS_E = SS_Within + rss_full
+    df_E = n_total - rank_full
+    MS_E = SS_E / df_E if df_E > 0 else np.nan
+
+    names = [name for name, _, _ in sources]
+    SS = np.array([ss if d > 0 else np.nan for _, ss, d in sources], dtype=float)
+    dfs = np.array([d for _, _, d in sources], dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        MS = SS / dfs
+        F = MS / MS_E
+    p = stats.f.sf(F, dfs, df_E) if df_E > 0 else np.full(len(F), np.nan)
+
     # Create ANOVA table
     anova_table = pd.DataFrame({
-        'Source': ['Database (A)', 'Query (B)', 'Computer (C)', 
-                  'A × B', 'A × C', 'B × C', 'A × B × C', 
-                  'Error', 'Total'],
-        'SS': [SS_A, SS_B, SS_C, SS_AB, SS_AC, SS_BC, SS_ABC, 
-               SS_E, SS_Total],
-        'df': [df_A, df_B, df_C, df_AB, df_AC, df_BC, df_ABC, 
-               df_E, df_Total],
-        'MS': [MS_A, MS_B, MS_C, MS_AB, MS_AC, MS_BC, MS_ABC, 
-               MS_E, np.nan],
-        'F': [F_A, F_B, F_C, F_AB, F_AC, F_BC, F_ABC, 
-              np.nan, np.nan],
-        'p-value': [p_A, p_B, p_C, p_AB, p_AC, p_BC, p_ABC, 
-                    np.nan, np.nan]
+        'Source': names + ['Error', 'Total'],
+        'SS': list(SS) + [SS_E, SS_Total],
+        'df': [int(d) for d in dfs] + [int(df_E), n_total - 1],
+        'MS': list(MS) + [MS_E, np.nan],
+        'F': list(F) + [np.nan, np.nan],
+        'p-value': list(p) + [np.nan, np.nan]
     })
-    
+
     # Format the table
     anova_table['SS'] = anova_table['SS'].round(3)
     anova_table['MS'] = anova_table['MS'].round(3)
     anova_table['F'] = anova_table['F'].round(3)
     anova_table['p-value'] = anova_table['p-value'].round(4)
-    
+
     return anova_table
 
+
+def bootstrap_quantiles(samples, quantiles, n_resamples, rng):
+    """
+    Bootstrap distribution of several quantiles of one sample
+
+    All resamples are drawn as one index matrix and reduced with a single
+    np.quantile call per block, so no Python loop runs per resample.
+
+    Returns:
+    ndarray: n_resamples x len(quantiles) resampled quantiles
+    """
+    samples = np.asarray(samples, dtype=float)
+    n = len(samples)
+    block = max(1, BOOTSTRAP_BLOCK_VALUES // max(n, 1))
+    blocks = []
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        resampled = samples[rng.integers(0, n, (size, n))]
+        blocks.append(np.quantile(resampled, quantiles, axis=1).T)
+    return np.vstack(blocks)
+
+
+def compare_cell(baseline, candidate, n_resamples, confidence, threshold, seed):
+    """
+    Bootstrap confidence intervals for one (backend, query) cell
+
+    The candidate/baseline ratio of every statistic is bootstrapped from
+    independent resamples of both runs; a regression is flagged when the
+    whole interval of the ratio lies above 1 + threshold.
+
+    Returns:
+    dict: per statistic the point estimates, intervals, ratio and verdict
+    """
+    rng = np.random.default_rng(seed)
+    quantiles = list(COMPARED_STATISTICS.values())
+    base_boot = bootstrap_quantiles(baseline, quantiles, n_resamples, rng)
+    cand_boot = bootstrap_quantiles(candidate, quantiles, n_resamples, rng)
+    tail = (1 - confidence) / 2 * 100
+    bounds = [tail, 100 - tail]
+
+    row = {'baseline_samples': len(baseline), 'candidate_samples': len(candidate), 'regression': False}
+    for i, (statistic, q) in enumerate(COMPARED_STATISTICS.items()):
+        base_value = np.quantile(baseline, q)
+        cand_value = np.quantile(candidate, q)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = cand_boot[:, i] / base_boot[:, i]
+        ratio_low, ratio_high = np.percentile(ratios, bounds)
+        regression = bool(ratio_low > 1 + threshold)
+        row.update({
+            f'{statistic}_baseline': base_value,
+            f'{statistic}_baseline_ci': tuple(np.percentile(base_boot[:, i], bounds)),
+            f'{statistic}_candidate': cand_value,
+            f'{statistic}_candidate_ci': tuple(np.percentile(cand_boot[:, i], bounds)),
+            f'{statistic}_ratio': cand_value / base_value if base_value > 0 else np.nan,
+            f'{statistic}_ratio_ci': (ratio_low, ratio_high),
+            f'{statistic}_regression': regression,
+        })
+        row['regression'] |= regression
+    return row
+
+
+def compare_runs(baseline, candidate, by=None, response='Response_Time', threshold=0.05,
+                 confidence=0.95, n_resamples=2000, seed=0, workers=None):
+    """
+    Detect regressions between two result sets with the experiment CSV schema
+
+    Cells are the (Database, Query) pairs, plus any extra `by` columns,
+    present in both sets. Cells are bootstrapped in parallel; NumPy releases
+    the GIL while resampling, so threads are enough.
+
+    Parameters:
+    baseline: DataFrame of the reference run(s)
+    candidate: DataFrame of the run(s) under test
+    by: extra columns that define a cell, e.g. ['Variant']
+    threshold: relative slowdown that counts as a regression, e.g. 0.05 for 5%
+    confidence: confidence level of the intervals
+    n_resamples: bootstrap resamples per run and cell
+    seed: seed, so repeated comparisons give identical intervals
+
+    Returns:
+    list: one comparison dict per cell, sorted by cell
+    """
+    keys = ['Database', 'Query'] + list(by or [])
+    groups = []
+    for frame in (baseline, candidate):
+        frame = frame.assign(**{response: pd.to_numeric(frame[response], errors='coerce')})
+        frame = frame.dropna(subset=[response])
+        groups.append({cell if isinstance(cell, tuple) else (cell,): values[response].to_numpy()
+                       for cell, values in frame.groupby(keys)})
+    cells = sorted(set(groups[0]) & set(groups[1]))
+
+    def compare(index):
+        cell = cells[index]
+        row = dict(zip(keys, cell))
+        row.update(compare_cell(groups[0][cell], groups[1][cell], n_resamples, confidence, threshold,
+                                [seed, index]))
+        return row
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(compare, range(len(cells))))
+
 # Example usage:
 # anova_results = calculate_anova_table(df)
-# print(anova_results.to_string(index=False))
\ No newline at end of file
+# anova_results = calculate_anova_table(df, factors=['Database', 'Query', 'Computer', 'Variant'])
+# print(anova_results.to_string(index=False))
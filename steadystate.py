@@ -0,0 +1,63 @@
+import math
+import statistics
+
+# Scale factor turning a median absolute deviation into a standard deviation estimate
+MAD_SCALE = 1.4826
+
+
+def is_steady(times, window, tolerance):
+    """
+    Check whether the latest executions have stopped drifting
+
+    Compares the medians of the last two windows of `window` samples; the run is
+    steady once they differ by no more than `tolerance` (relative). Medians
+    keep a single slow execution from resetting the detection.
+    """
+    if len(times) < 2 * window:
+        return False
+    previous = statistics.median(times[-2 * window:-window])
+    latest = statistics.median(times[-window:])
+    if previous == 0:
+        return latest == 0
+    return abs(latest - previous) / previous <= tolerance
+
+
+def count_outliers(times, threshold=3.5):
+    """Number of samples more than `threshold` robust standard deviations from the median"""
+    if len(times) < 3:
+        return 0
+    center = statistics.median(times)
+    mad = statistics.median(abs(t - center) for t in times) * MAD_SCALE
+    if mad == 0:
+        return 0
+    return sum(1 for t in times if abs(t - center) / mad > threshold)
+
+
+def median_interval(times, confidence):
+    """
+    Distribution-free confidence interval for the median, from order statistics
+
+    The number of samples below the median is Binomial(n, 1/2), so the
+    samples at ranks n/2 -/+ z*sqrt(n)/2 bracket it with the given
+    confidence whatever the latency distribution looks like.
+
+    Returns:
+    tuple: (low, high), or None with too few samples for that confidence
+    """
+    n = len(times)
+    half_width = statistics.NormalDist().inv_cdf((1 + confidence) / 2) * math.sqrt(n) / 2
+    lower = math.floor(n / 2 - half_width)
+    upper = math.ceil(n / 2 + half_width)
+    if lower < 1 or upper > n:
+        return None
+    ordered = sorted(times)
+    return ordered[lower - 1], ordered[upper - 1]
+
+
+def relative_interval_width(times, confidence):
+    # Width of the median's interval relative to the median; infinite until there are enough samples
+    interval = median_interval(times, confidence)
+    median = statistics.median(times) if times else 0
+    if interval is None or median <= 0:
+        return math.inf
+    return (interval[1] - interval[0]) / median
@@ -0,0 +1,236 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from histogram import NANOSECONDS
+
+# Point-in-time readings; everything else sampled is a cumulative counter
+GAUGES = {'heap_used_mb', 'heap_committed_mb', 'client_rss_mb', 'lock_waiters', 'blocked_transactions'}
+
+POSTGRES_QUERIES = {
+    'pg_stat_database': (
+        "SELECT xact_commit, blks_read, blks_hit, tup_returned, tup_fetched, tup_inserted, temp_files, temp_bytes, "
+        "blk_read_time, blk_write_time, deadlocks FROM pg_stat_database WHERE datname = current_database()",
+        ['xact_commit', 'blks_read', 'blks_hit', 'tup_returned', 'tup_fetched', 'tup_inserted', 'temp_files',
+         'temp_bytes', 'blk_read_time_ms', 'blk_write_time_ms', 'deadlocks']),
+    # Sessions waiting for a lock right now, e.g. queries queued behind an insert batch or a refresh
+    'pg_locks': (
+        "SELECT count(*) FILTER (WHERE NOT granted) FROM pg_locks",
+        ['lock_waiters']),
+    'pg_statio': (
+        "SELECT sum(heap_blks_read), sum(heap_blks_hit), sum(idx_blks_read), sum(idx_blks_hit) "
+        "FROM pg_statio_user_tables",
+        ['heap_blks_read', 'heap_blks_hit', 'idx_blks_read', 'idx_blks_hit']),
+    # Needs the pg_stat_statements extension (shared_preload_libraries); skipped without it
+    'pg_stat_statements': (
+        "SELECT sum(calls), sum(total_plan_time), sum(total_exec_time), sum(shared_blks_hit), "
+        "sum(shared_blks_read), sum(temp_blks_written) FROM pg_stat_statements "
+        "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())",
+        ['statement_calls', 'statement_plan_time_ms', 'statement_exec_time_ms', 'statement_blks_hit',
+         'statement_blks_read', 'statement_temp_blks_written']),
+}
+
+
+def sample_postgres(backend, sources):
+    values = {}
+    for source in list(sources):
+        query, names = POSTGRES_QUERIES[source]
+        try:
+            row = backend.query_rows(query)[0]
+        except Exception as e:
+            print(f"Telemetry from {source} unavailable: {e}")
+            sources.remove(source)
+            backend.connection.rollback()
+            continue
+        values.update({name: float(value) for name, value in zip(names, row) if value is not None})
+    # Statistics views are snapshotted per transaction, so end it for the next sample to see fresh numbers
+    backend.connection.rollback()
+    return values
+
+
+def jmx_value(attributes, name):
+    attribute = attributes.get(name)
+    return attribute.get('value') if isinstance(attribute, dict) else None
+
+
+def sample_neo4j(backend, sources):
+    values = {}
+    rows = backend.query_rows("CALL dbms.queryJmx('java.lang:*') YIELD name, attributes RETURN name, attributes")
+    gc_count = gc_time = 0
+    for name, attributes in rows:
+        if name == 'java.lang:type=Memory':
+            heap = jmx_value(attributes, 'HeapMemoryUsage') or {}
+            values['heap_used_mb'] = heap.get('used', 0) / 2 ** 20
+            values['heap_committed_mb'] = heap.get('committed', 0) / 2 ** 20
+        elif name.startswith('java.lang:type=GarbageCollector'):
+            gc_count += jmx_value(attributes, 'CollectionCount') or 0
+            gc_time += jmx_value(attributes, 'CollectionTime') or 0
+    values['gc_collections'] = gc_count
+    values['gc_time_ms'] = gc_time
+
+    if 'transactions' in sources:
+        # SHOW TRANSACTIONS is Neo4j 5; a transaction waiting for a lock reports "Blocked by: ..."
+        try:
+            values['blocked_transactions'] = backend.query_rows(
+                "SHOW TRANSACTIONS YIELD status WHERE status STARTS WITH 'Blocked' RETURN count(*)")[0][0]
+        except Exception as e:
+            print(f"Neo4j transaction telemetry unavailable: {e}")
+            sources.remove('transactions')
+
+    if 'page_cache' in sources:
+        # Neo4j 4 has a "Page cache" kernel bean; 5 only exposes page cache
+        # counters as metrics beans when metrics.jmx.enabled is on
+        try:
+            beans = backend.query_rows("CALL dbms.queryJmx('*:*') YIELD name, attributes "
+                                       "WHERE name CONTAINS 'Page cache' OR name CONTAINS 'page_cache' "
+                                       "RETURN name, attributes")
+        except Exception as e:
+            print(f"Neo4j page cache telemetry unavailable: {e}")
+            sources.remove('page_cache')
+            beans = []
+        for name, attributes in beans:
+            if 'Page cache' in name:
+                values['page_cache_hits'] = jmx_value(attributes, 'Hits')
+                values['page_cache_faults'] = jmx_value(attributes, 'Faults')
+            for metric, key in (('page_cache.hits', 'page_cache_hits'), ('page_cache.page_faults', 'page_cache_faults')):
+                if name.endswith(metric):
+                    values[key] = jmx_value(attributes, 'Count')
+    return {key: float(value) for key, value in values.items() if value is not None}
+
+
+def sample_local():
+    """CPU, memory and I/O of this client process, plus host CPU, from /proc (Linux only)"""
+    values = {}
+    ticks = os.sysconf('SC_CLK_TCK')
+    with open('/proc/stat') as f:
+        cpu = [int(field) for field in f.readline().split()[1:]]
+    # user nice system idle iowait irq softirq steal
+    values['host_cpu_busy_s'] = (sum(cpu[:8]) - cpu[3] - cpu[4]) / ticks
+    values['host_cpu_idle_s'] = cpu[3] / ticks
+    values['host_cpu_iowait_s'] = cpu[4] / ticks
+    with open('/proc/self/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    values['client_cpu_s'] = (int(fields[11]) + int(fields[12])) / ticks
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                values['client_rss_mb'] = int(line.split()[1]) / 1024
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                key, value = line.split(':')
+                if key in ('read_bytes', 'write_bytes'):
+                    values[f'client_{key}'] = float(value)
+    except OSError:
+        pass  # Needs the same user, and is missing in some containers
+    return values
+
+
+class TelemetrySampler:
+    """
+    Background thread polling server and client state every `interval` seconds
+
+    It runs on its own connection, so sampling never waits for, or delays,
+    a benchmark query. Samples are stamped with time.perf_counter_ns, the
+    clock the engine times executions with, so attach() can line them up with
+    individual iterations.
+    """
+
+    def __init__(self, backend, interval):
+        self.backend = backend
+        self.interval = interval
+        self.samples = []
+        self.sample_ns = []
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='telemetry', daemon=True)
+        self.local = os.path.exists('/proc/self/stat')
+        if backend.dialect == 'postgresql':
+            self.sources = list(POSTGRES_QUERIES)
+        else:
+            self.sources = ['page_cache', 'transactions']
+
+    def sample(self):
+        start_ns = time.perf_counter_ns()
+        values = sample_local() if self.local else {}
+        if self.backend.dialect == 'postgresql':
+            values.update(sample_postgres(self.backend, self.sources))
+        else:
+            values.update(sample_neo4j(self.backend, self.sources))
+        end_ns = time.perf_counter_ns()
+        values['time_ns'] = (start_ns + end_ns) // 2
+        self.samples.append(values)
+        self.sample_ns.append(end_ns - start_ns)
+
+    def run(self):
+        try:
+            self.backend.connect()
+        except Exception as e:
+            print(f"Telemetry sampler could not connect, no telemetry recorded: {e}")
+            return
+        try:
+            while True:
+                self.sample()
+                if self.stopping.wait(self.interval):
+                    break
+            # One last sample so every iteration lies between two of them
+            self.sample()
+        except Exception as e:
+            print(f"Telemetry sampling stopped: {e}")
+        finally:
+            self.backend.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stopping.set()
+        self.thread.join()
+
+    def overhead_ms(self):
+        """Mean time one sample took"""
+        return sum(self.sample_ns) / len(self.sample_ns) / 1e6 if self.sample_ns else None
+
+
+def attach(results, samples):
+    """
+    Join telemetry to every measured iteration of every result
+
+    Counters are interpolated linearly between samples at the iteration's
+    start and end and the difference is attributed to the iteration; gauges
+    are read at its midpoint. Adds result['telemetry'], one dict per iteration.
+    """
+    if len(samples) < 2:
+        return
+    times = np.array([sample['time_ns'] for sample in samples], dtype=float)
+    metrics = sorted({key for sample in samples for key in sample} - {'time_ns'})
+    series = {}
+    for metric in metrics:
+        known = [(t, sample[metric]) for t, sample in zip(times, samples) if metric in sample]
+        if len(known) >= 2:
+            series[metric] = np.array(known).T
+
+    for result in results:
+        starts = np.array([start for start, _ in result['intervals']], dtype=float)
+        ends = np.array([end for _, end in result['intervals']], dtype=float)
+        columns = {}
+        for metric, (t, v) in series.items():
+            if metric in GAUGES:
+                columns[metric] = np.interp((starts + ends) / 2, t, v)
+            else:
+                columns[metric] = np.interp(ends, t, v) - np.interp(starts, t, v)
+        if 'blks_hit' in columns and 'blks_read' in columns:
+            blocks = columns['blks_hit'] + columns['blks_read']
+            columns['blks_hit_ratio'] = np.divide(columns['blks_hit'], blocks, out=np.full_like(blocks, np.nan),
+                                                  where=blocks > 0)
+        if 'host_cpu_busy_s' in columns:
+            total = columns['host_cpu_busy_s'] + columns['host_cpu_idle_s'] + columns['host_cpu_iowait_s']
+            columns['host_cpu_utilization'] = np.divide(columns['host_cpu_busy_s'], total,
+                                                        out=np.full_like(total, np.nan), where=total > 0)
+        if 'client_cpu_s' in columns:
+            columns['client_cpu_utilization'] = columns['client_cpu_s'] / np.maximum((ends - starts) / NANOSECONDS,
+                                                                                     1e-9)
+        result['telemetry'] = [{metric: float(values[i]) for metric, values in columns.items()}
+                               for i in range(len(starts))]
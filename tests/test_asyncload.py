@@ -0,0 +1,57 @@
+import asyncio
+import contextlib
+
+from asyncload import AsyncPostgresClient
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.in_transaction = False
+
+    async def fetch(self, text, *values):
+        self.calls.append(('fetch', text, values))
+        return self.rows
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        self.in_transaction = True
+        yield
+        self.in_transaction = False
+
+    async def cursor(self, text, *values, prefetch=None):
+        assert self.in_transaction
+        self.calls.append(('cursor', text, values, prefetch))
+        for row in self.rows:
+            yield row
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self.connection
+
+
+def execute(fetch_size):
+    connection = FakeConnection([(1,), (2,), (3,)])
+    client = AsyncPostgresClient({}, 1, 'simple', fetch_size)
+    client.pool = FakePool(connection)
+    rows, connect_ns = asyncio.run(client.execute("SELECT * FROM trans WHERE account_id = %(account_id)s",
+                                                  {'account_id': 7}))
+    return rows, connection.calls
+
+
+def test_results_are_fetched_whole_without_a_fetch_size():
+    rows, calls = execute(None)
+    assert rows == 3
+    assert calls == [('fetch', "SELECT * FROM trans WHERE account_id = $1", (7,))]
+
+
+def test_a_fetch_size_streams_through_a_cursor():
+    rows, calls = execute(2)
+    assert rows == 3
+    assert calls == [('cursor', "SELECT * FROM trans WHERE account_id = $1", (7,), 2)]
@@ -0,0 +1,64 @@
+import pytest
+
+from backends import Backend, count_rows, cypher_statement, get_backend, numbered_placeholders, query_parameters
+
+
+def test_get_backend():
+    backend = get_backend('PostgreSQL')
+    assert backend.name == 'PostgreSQL'
+    assert backend.dialect == 'postgresql'
+    assert get_backend('neo4j').dialect == 'neo4j'
+
+
+def test_get_backend_unknown_key():
+    with pytest.raises(ValueError, match="Unknown backend 'mysql'"):
+        get_backend('mysql')
+
+
+def test_count_rows_estimates_size_from_a_sample():
+    assert count_rows(iter([])) == (0, 0)
+    rows, size = count_rows((i, 'abcd') for i in range(1000, 2000))
+    assert rows == 1000
+    assert size == 8 * 1000
+
+
+@pytest.mark.parametrize('option', ['connection_mode', 'statement_mode', 'fetch_mode'])
+def test_unknown_modes_rejected(option):
+    with pytest.raises(ValueError, match='Unknown'):
+        Backend({}, **{option: 'sometimes'})
+
+
+def test_query_parameters_in_order_of_first_use():
+    query = "SELECT * FROM trans WHERE date >= %(start_date)s AND account_id = %(account_id)s " \
+            "AND date < %(end_date)s AND %(account_id)s > 0"
+    assert query_parameters('postgresql', query) == ['start_date', 'account_id', 'end_date']
+    assert query_parameters('neo4j', "MATCH (a:Account {account_id: $account_id}) RETURN a") == ['account_id']
+
+
+def test_numbered_placeholders():
+    text, names = numbered_placeholders(
+        'postgresql', "SELECT * FROM trans WHERE account_id = %(account_id)s "
+                      "AND date BETWEEN %(start_date)s AND %(end_date)s OR account_id = %(account_id)s;\n")
+    assert text == "SELECT * FROM trans WHERE account_id = $1 AND date BETWEEN $2 AND $3 OR account_id = $1"
+    assert names == ['account_id', 'start_date', 'end_date']
+
+
+def test_cypher_statement_prepared_keeps_parameters():
+    query = "MATCH (a:Account {account_id: $account_id}) RETURN a"
+    assert cypher_statement(query, {'account_id': 7}, 'prepared') == (query, {'account_id': 7})
+    assert cypher_statement(query, None, 'simple') == (query, None)
+
+
+def test_cypher_statement_simple_inlines_literals():
+    text, params = cypher_statement(
+        "MATCH (t:Transaction) WHERE t.account_id = $account_id AND t.date >= $start_date "
+        "AND t.k_symbol = $symbol AND t.bank = $bank RETURN t",
+        {'account_id': 7, 'start_date': '1995-01-01', 'symbol': 'say "hi"', 'bank': None}, 'simple')
+    assert params is None
+    assert text == ('MATCH (t:Transaction) WHERE t.account_id = 7 AND t.date >= "1995-01-01" '
+                    'AND t.k_symbol = "say \\"hi\\"" AND t.bank = null RETURN t')
+
+
+def test_cypher_statement_leaves_unknown_parameters():
+    text, _ = cypher_statement("RETURN $account_id, $other", {'account_id': True}, 'simple')
+    assert text == "RETURN true, $other"
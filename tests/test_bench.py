@@ -0,0 +1,48 @@
+import argparse
+
+import pandas as pd
+import pytest
+
+import bench
+import reports
+
+
+def test_report_formats_in_step():
+    assert bench.REPORT_FORMATS == reports.REPORT_FORMATS
+
+
+def test_report_path():
+    assert bench.report_path('out/report.JSON') == 'out/report.JSON'
+    assert bench.report_path('report.parquet') == 'report.parquet'
+    with pytest.raises(argparse.ArgumentTypeError):
+        bench.report_path('report.csv')
+
+
+def test_report_checked_while_parsing(capsys):
+    with pytest.raises(SystemExit):
+        bench.build_parser().parse_args(['run', '--report', 'report.txt'])
+    assert 'report must end in .json or .parquet' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('entry, message', [
+    ('Query 99=1', "Unknown query 'Query 99'"),
+    ('Query 1=often', "could not convert"),
+])
+def test_bad_mix_exits_with_the_reason(entry, message):
+    with pytest.raises(SystemExit, match=message):
+        bench.main(['run', '--backend', 'postgresql', '--concurrency', '2', '--requests', '4', '--mix', entry])
+
+
+def test_bad_mix_exits_with_the_reason_on_the_async_driver():
+    with pytest.raises(SystemExit, match="Unknown query 'Query 99'"):
+        bench.main(['run', '--backend', 'postgresql', '--driver', 'async', '--requests', '4',
+                    '--mix', 'Query 99=1'])
+
+
+def test_compare_names_a_missing_by_column(tmp_path):
+    rows = [{'Computer': 'host', 'Database': 'PostgreSQL', 'Query': 'Query 1', 'Replication': i,
+             'Response_Time': 0.1} for i in range(3)]
+    pd.DataFrame(rows).to_csv(tmp_path / 'baseline.csv', index=False)
+    pd.DataFrame(rows).assign(Variant='no index').to_csv(tmp_path / 'candidate.csv', index=False)
+    with pytest.raises(SystemExit, match="--by column 'Variant' is not in the baseline results"):
+        bench.main(['compare', str(tmp_path / 'baseline.csv'), str(tmp_path / 'candidate.csv'), '--by', 'Variant'])
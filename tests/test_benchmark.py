@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+import config
+from backends import Backend
+from benchmark import end_rss_window, load_queries, query_name, replicate_adaptively, start_rss_window, time_query
+
+
+def test_query_name():
+    assert query_name('query1') == 'Query 1'
+    assert query_name('Query12') == 'Query 12'
+    assert query_name('account_totals') == 'account_totals'
+
+
+def test_load_queries(tmp_path):
+    (tmp_path / 'postgresql').mkdir()
+    (tmp_path / 'postgresql' / 'query2.sql').write_text("SELECT 2")
+    (tmp_path / 'postgresql' / 'query1.sql').write_text("SELECT 1")
+    (tmp_path / 'postgresql' / '.hidden.sql').write_text("SELECT 0")
+    assert load_queries('postgresql', str(tmp_path)) == [('Query 1', "SELECT 1"), ('Query 2', "SELECT 2")]
+
+
+def test_parameterized_templates_are_opt_in(tmp_path):
+    for directory in (tmp_path / 'neo4j', tmp_path / 'parameterized' / 'neo4j'):
+        directory.mkdir(parents=True)
+    (tmp_path / 'neo4j' / 'query1.cypher').write_text("RETURN 1")
+    (tmp_path / 'parameterized' / 'neo4j' / 'query4.cypher').write_text("RETURN $account_id")
+    assert [name for name, _ in load_queries('neo4j', str(tmp_path))] == ['Query 1']
+    assert [name for name, _ in load_queries('neo4j', str(tmp_path), parameterized=True)] == ['Query 1', 'Query 4']
+
+
+def test_repository_queries_match_across_dialects():
+    postgres = [name for name, _ in load_queries('postgresql')]
+    assert postgres == [name for name, _ in load_queries('neo4j')]
+    assert postgres[:3] == ['Query 1', 'Query 2', 'Query 3']
+
+
+def test_rss_window_covers_only_what_ran_inside_it():
+    block = b'x' * (64 * 1024 * 1024)
+    del block
+    start_rss = start_rss_window()
+    if start_rss is None:
+        pytest.skip("the peak RSS can only be reset on Linux")
+    assert end_rss_window(start_rss)['rss_growth_mb'] < 32
+
+    start_rss = start_rss_window()
+    block = b'x' * (64 * 1024 * 1024)
+    memory = end_rss_window(start_rss)
+    del block
+    assert memory['rss_growth_mb'] >= 60
+    assert memory['peak_rss_mb'] >= start_rss + 60
+
+
+class ScriptedBackend(Backend):
+    # Every execution of a query takes the next of its scripted latencies, cycling
+    name = 'Scripted'
+    dialect = 'postgresql'
+
+    def __init__(self, latencies):
+        super().__init__({})
+        self.latencies = latencies
+        self.executions = {query: 0 for query in latencies}
+
+    def execute_phases(self, query, params=None):
+        script = self.latencies[query]
+        total_ns = script[self.executions[query] % len(script)]
+        self.executions[query] += 1
+        return {'rows': 1, 'bytes': 1, 'total_ns': total_ns, 'fetch_ns': 0, 'server': None}
+
+
+def adaptive_run(latencies, iterations, target_width, budget_s=60.0):
+    backend = ScriptedBackend(latencies)
+    queries = [(query, query) for query in latencies]
+    timings = {name: time_query(backend, query, iterations) for name, query in queries}
+    adaptive = {'target_width': target_width, 'deadline_ns': time.perf_counter_ns() + int(budget_s * 1e9)}
+    replicate_adaptively(backend, queries, timings, {name: None for name, _ in queries}, False, 0, adaptive,
+                         {name: {} for name, _ in queries})
+    return timings
+
+
+def test_adaptive_stops_once_the_target_width_is_reached():
+    timings = adaptive_run({'steady': [1_000_000]}, 20, target_width=0.05)
+    assert len(timings['steady']['times']) == 20
+
+
+def test_adaptive_spends_executions_on_the_noisy_query():
+    noisy = [1_000_000 + 150_000 * (i % 7) for i in range(7)]
+    timings = adaptive_run({'steady': [1_000_000], 'noisy': noisy}, 10, target_width=0.05)
+    assert len(timings['steady']['times']) == 10
+    assert len(timings['noisy']['times']) > 10
+
+
+def test_adaptive_respects_the_iteration_cap(monkeypatch):
+    monkeypatch.setattr(config, 'ADAPTIVE_MAX_ITERATIONS', 40)
+    noisy = [1_000_000 * (1 + i % 5) for i in range(5)]
+    timings = adaptive_run({'noisy': noisy}, 10, target_width=0.001)
+    assert len(timings['noisy']['times']) == 40
+
+
+def test_adaptive_stops_at_the_deadline():
+    noisy = [1_000_000 * (1 + i % 5) for i in range(5)]
+    timings = adaptive_run({'noisy': noisy}, 10, target_width=0.001, budget_s=0)
+    assert len(timings['noisy']['times']) == 10
+
+
+def test_adaptive_skips_queries_the_budget_cannot_afford():
+    # Scripted at 100 s an execution against a 1 s budget
+    slow = [100_000_000_000 * (1 + i % 5) for i in range(5)]
+    timings = adaptive_run({'slow': slow}, 10, target_width=0.001, budget_s=1)
+    assert len(timings['slow']['times']) == 10
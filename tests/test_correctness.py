@@ -0,0 +1,123 @@
+import datetime
+import decimal
+
+import pytest
+
+import correctness
+from backends import Backend
+from correctness import COLUMN_ORDER, bucket_rows, digest_rows, normalize_row, normalize_value, verify_queries
+
+
+@pytest.mark.parametrize('values', [
+    (42, 42.0, decimal.Decimal('42.000'), '42', ' 42 '),
+    (0.1 + 0.2, 0.3, decimal.Decimal('0.3'), '0.3'),
+    (1234.5, decimal.Decimal('1234.50'), '1.2345e3'),
+    (None, ''),
+])
+def test_numbers_from_every_driver_agree(values):
+    assert len({normalize_value(value) for value in values}) == 1
+
+
+def test_text_and_booleans():
+    assert normalize_value(' OWNER ') == 'OWNER'
+    assert normalize_value('1.2.3') == '1.2.3'
+    assert normalize_value(True) == 'true'
+    assert normalize_value(False) == 'false'
+
+
+class IsoDate:
+    # Shaped like neo4j.time.Date
+    def iso_format(self):
+        return '1995-03-24'
+
+
+def test_dates():
+    assert normalize_value(datetime.date(1995, 3, 24)) == normalize_value(IsoDate()) == '1995-03-24'
+    assert normalize_value('1995-03-24') == '1995-03-24'
+
+
+def test_columns_put_a_row_in_the_shared_order():
+    assert normalize_row((1, 'a', 2.5)) == normalize_row(('2.5', 'a', decimal.Decimal(1)), (2, 1, 0))
+
+
+def test_values_swapped_between_columns_differ():
+    assert normalize_row((1, 2)) != normalize_row((2, 1))
+    assert digest_rows([(1, 2)]).hexdigest() != digest_rows([(2, 1)]).hexdigest()
+
+
+def test_digest_ignores_row_order_and_driver_types():
+    sql_rows = [(1, decimal.Decimal('10.50'), datetime.date(1995, 3, 24)), (2, decimal.Decimal('3'), None)]
+    graph_rows = [('3', '2', ''), ('10.5', '1', '1995-03-24')]
+    assert digest_rows(sql_rows).hexdigest() == digest_rows(graph_rows, (1, 0, 2)).hexdigest()
+
+
+def test_column_orders_are_permutations():
+    for orders in COLUMN_ORDER.values():
+        for columns in orders.values():
+            assert sorted(columns) == list(range(len(columns)))
+
+
+def test_digest_counts_duplicates():
+    once = digest_rows([(1, 'a'), (2, 'b')])
+    twice = digest_rows([(1, 'a'), (1, 'a'), (2, 'b')])
+    assert once.hexdigest() != twice.hexdigest()
+    assert twice.rows == 3
+
+
+def test_differing_buckets_locate_the_mismatch():
+    reference = [(i, f'account {i}') for i in range(1000)]
+    other = reference[:500] + [(500, 'account 5000')] + reference[501:]
+    buckets = digest_rows(reference).differing_buckets(digest_rows(other))
+    assert 1 <= len(buckets) <= 2
+    assert bucket_rows(reference, buckets)[normalize_row((500, 'account 500'))] == 1
+    assert normalize_row((500, 'account 5000')) in bucket_rows(other, buckets)
+
+
+class RowsBackend(Backend):
+    dialect = 'postgresql'
+
+    def __init__(self, name, rows, fail_connect=False, fail_after=None):
+        super().__init__({})
+        self.name = name
+        self.rows = rows
+        self.fail_connect = fail_connect
+        self.fail_after = fail_after
+        self.streams = 0
+        self.closed = False
+
+    def connect(self):
+        if self.fail_connect:
+            raise ConnectionError("connection refused")
+
+    def close(self):
+        self.closed = True
+
+    def iter_rows(self, query, params=None):
+        self.streams += 1
+        if self.fail_after is not None and self.streams > self.fail_after:
+            raise RuntimeError("connection lost")
+        yield from self.rows
+
+
+def patch_backends(monkeypatch, *backends):
+    by_key = {backend.name: backend for backend in backends}
+    monkeypatch.setattr(correctness, 'get_backend', lambda key, **modes: by_key[key])
+
+
+def test_connected_backends_are_closed_when_a_later_one_fails(monkeypatch):
+    first, second = RowsBackend('first', []), RowsBackend('second', [], fail_connect=True)
+    patch_backends(monkeypatch, first, second)
+    with pytest.raises(ConnectionError):
+        verify_queries(['first', 'second'])
+    assert first.closed
+
+
+def test_a_failed_mismatch_sample_is_reported(monkeypatch):
+    reference = RowsBackend('reference', [(1, 'a')])
+    other = RowsBackend('other', [(2, 'b')], fail_after=1)
+    patch_backends(monkeypatch, reference, other)
+    reports = verify_queries(['reference', 'other'], ['Query 1', 'Query 2'])
+    assert [report['name'] for report in reports] == ['Query 1', 'Query 2']
+    assert not reports[0]['matches']
+    assert 'connection lost' in reports[0]['errors']['other']
+    assert reference.closed and other.closed
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from datagen import BASE_ROWS, generate_dataset, table_rows
+
+
+def read_tables(directory):
+    return {path.stem: path.read_bytes() for path in sorted(directory.glob('*.csv'))}
+
+
+def test_table_rows():
+    assert table_rows('district', 10) == BASE_ROWS['district']
+    assert table_rows('trans', 0.5) == BASE_ROWS['trans'] // 2
+    assert table_rows('card', 0.00001) == 1
+
+
+def test_same_seed_same_files_whatever_the_workers(tmp_path):
+    generate_dataset(0.002, str(tmp_path / 'one'), seed=7, chunk_rows=500, workers=1)
+    generate_dataset(0.002, str(tmp_path / 'two'), seed=7, chunk_rows=500, workers=2)
+    generate_dataset(0.002, str(tmp_path / 'other'), seed=8, chunk_rows=500, workers=1)
+
+    one = read_tables(tmp_path / 'one')
+    assert one == read_tables(tmp_path / 'two')
+    assert one['trans'] != read_tables(tmp_path / 'other')['trans']
+
+
+def test_keys_are_consistent(tmp_path):
+    report = generate_dataset(0.002, str(tmp_path), seed=1, chunk_rows=700, workers=1)
+    account = pd.read_csv(tmp_path / 'account.csv')
+    trans = pd.read_csv(tmp_path / 'trans.csv')
+    disp = pd.read_csv(tmp_path / 'disp.csv')
+
+    assert report['rows'] == sum(step['rows'] for step in report['steps'])
+    assert len(trans) == table_rows('trans', 0.002)
+    assert trans['trans_id'].is_unique
+    assert set(trans['account_id']) <= set(account['account_id'])
+    assert set(disp['account_id']) <= set(account['account_id'])
+    assert set(account['district_id']) <= set(range(1, BASE_ROWS['district'] + 1))
@@ -0,0 +1,59 @@
+import types
+
+from hardware import is_local, parse_hardware, with_fingerprint
+
+CPUINFO = """processor\t: 0
+model name\t: AMD EPYC 7763 64-Core Processor
+processor\t: 1
+model name\t: AMD EPYC 7763 64-Core Processor
+"""
+
+MEMINFO = "MemTotal:       16303208 kB\nMemFree:         1000000 kB\n"
+
+
+def machine(files, directories):
+    def read(path):
+        return files[path]
+
+    def listdir(path):
+        return directories[path]
+
+    return read, listdir
+
+
+def test_parse_hardware():
+    read, listdir = machine({'/proc/cpuinfo': CPUINFO, '/proc/meminfo': MEMINFO,
+                             '/sys/block/sda/queue/rotational': '0\n'},
+                            {'/sys/block': ['loop0', 'sda', 'dm-0', 'nvme0n1']})
+    assert parse_hardware(read, listdir) == {'cpu_model': 'AMD EPYC 7763 64-Core Processor', 'cpu_cores': 2,
+                                             'ram_gb': 15.5, 'disk_type': 'mixed'}
+
+
+def test_single_disk_type():
+    read, listdir = machine({'/proc/cpuinfo': CPUINFO, '/proc/meminfo': MEMINFO,
+                             '/sys/block/sda/queue/rotational': '1\n', '/sys/block/sdb/queue/rotational': '1\n'},
+                            {'/sys/block': ['sda', 'sdb', 'ram0']})
+    assert parse_hardware(read, listdir)['disk_type'] == 'hdd'
+
+
+def test_unreadable_files_leave_none():
+    def read(path):
+        raise PermissionError(path)
+
+    hardware = parse_hardware(read, lambda path: [])
+    assert hardware == {'cpu_model': None, 'cpu_cores': None, 'ram_gb': None, 'disk_type': None}
+
+
+def test_fingerprint_follows_the_hardware():
+    first = with_fingerprint({'cpu_model': 'x', 'cpu_cores': 4, 'ram_gb': 16.0, 'disk_type': 'ssd'})
+    same = with_fingerprint({'cpu_model': 'x', 'cpu_cores': 4, 'ram_gb': 16.0, 'disk_type': 'ssd'})
+    bigger = with_fingerprint({'cpu_model': 'x', 'cpu_cores': 8, 'ram_gb': 16.0, 'disk_type': 'ssd'})
+    assert first['fingerprint'] == same['fingerprint'] != bigger['fingerprint']
+
+
+def test_is_local():
+    assert is_local(types.SimpleNamespace(dialect='postgresql', settings={'host': 'localhost'}))
+    assert is_local(types.SimpleNamespace(dialect='postgresql', settings={'host': '/var/run/postgresql'}))
+    assert not is_local(types.SimpleNamespace(dialect='postgresql', settings={'host': '10.0.0.12'}))
+    assert is_local(types.SimpleNamespace(dialect='neo4j', settings={'uri': 'bolt://127.0.0.1:7687'}))
+    assert not is_local(types.SimpleNamespace(dialect='neo4j', settings={'uri': 'neo4j://db.example:7687'}))
@@ -0,0 +1,104 @@
+import math
+import random
+
+import pytest
+
+from histogram import LatencyHistogram, NANOSECONDS
+
+
+def nearest_rank(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+@pytest.mark.parametrize('significant_digits', [2, 3, 4])
+def test_percentiles_within_relative_precision(significant_digits):
+    rng = random.Random(1)
+    # Latencies from microseconds to seconds, so every bucket range is exercised
+    values = [int(rng.lognormvariate(15, 2)) for _ in range(20_000)]
+    histogram = LatencyHistogram(significant_digits)
+    for value in values:
+        histogram.record(value)
+
+    for pct in (1, 25, 50, 90, 99, 99.9, 100):
+        expected = nearest_rank(values, pct)
+        assert histogram.percentile(pct) == pytest.approx(expected, rel=10 ** -significant_digits)
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(1000):
+        histogram.record(value)
+    assert histogram.percentile(50) == 499
+    assert histogram.min == 0
+    assert histogram.max == 999
+
+
+def test_exact_mean_min_max_and_stdev():
+    values = [1_000, 2_000, 3_000, 4_000, 1_000_000]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    assert histogram.count == len(values)
+    assert histogram.mean() == sum(values) / len(values)
+    mean = sum(values) / len(values)
+    assert histogram.stdev() == pytest.approx(math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1)))
+    assert histogram.min == 1_000
+    assert histogram.max == 1_000_000
+
+
+def test_percentile_stays_within_recorded_range():
+    histogram = LatencyHistogram(1)
+    histogram.record(123_456_789)
+    assert histogram.percentile(0) == histogram.percentile(100) == 123_456_789
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert math.isnan(histogram.percentile(50))
+    assert math.isnan(histogram.mean())
+    assert histogram.summary()['samples'] == 0
+
+
+def test_negative_latency_rejected():
+    with pytest.raises(ValueError):
+        LatencyHistogram().record(-1)
+
+
+def test_merge_equals_recording_everything_in_one():
+    rng = random.Random(2)
+    values = [rng.randrange(1, 10 * NANOSECONDS) for _ in range(5_000)]
+    combined = LatencyHistogram()
+    parts = [LatencyHistogram() for _ in range(3)]
+    for i, value in enumerate(values):
+        combined.record(value)
+        parts[i % 3].record(value)
+
+    merged = LatencyHistogram()
+    for part in parts:
+        merged.merge(part)
+    assert merged.counts == combined.counts
+    assert merged.summary() == combined.summary()
+
+
+def test_merge_with_empty_histogram_keeps_min_and_max():
+    histogram = LatencyHistogram()
+    histogram.record(5_000)
+    histogram.merge(LatencyHistogram())
+    assert (histogram.count, histogram.min, histogram.max) == (1, 5_000, 5_000)
+    empty = LatencyHistogram().merge(histogram)
+    assert (empty.count, empty.min, empty.max) == (1, 5_000, 5_000)
+
+
+def test_merge_rejects_different_precision():
+    with pytest.raises(ValueError):
+        LatencyHistogram(2).merge(LatencyHistogram(3))
+
+
+def test_dict_round_trip():
+    histogram = LatencyHistogram()
+    for value in (10, 20_000, 3_000_000_000):
+        histogram.record(value)
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.counts == histogram.counts
+    assert restored.summary() == histogram.summary()
@@ -0,0 +1,35 @@
+import types
+
+import numpy as np
+import pytest
+
+from ingest import TRANSACTION_COLUMNS, IngestStream
+
+
+def stream(batch_size=50, seed=3):
+    return IngestStream(types.SimpleNamespace(dialect='postgresql'), rate=100, batch_size=batch_size, method='copy',
+                        seed=seed)
+
+
+def test_batch_continues_the_table():
+    accounts = np.array([11, 22, 33])
+    frame = stream().batch(1001, np.datetime64('1999-01-01', 'D'), accounts)
+
+    assert list(frame.columns) == TRANSACTION_COLUMNS
+    assert len(frame) == 50
+    assert list(frame['trans_id']) == list(range(1001, 1051))
+    assert set(frame['account_id']) <= {11, 22, 33}
+    assert set(frame['date']) == {'1999-01-01'}
+
+
+def test_batches_are_reproducible():
+    accounts = np.array([1, 2, 3, 4])
+    day = np.datetime64('1999-01-01', 'D')
+    first = stream(seed=5).batch(1, day, accounts)
+    assert first.equals(stream(seed=5).batch(1, day, accounts))
+    assert not first.equals(stream(seed=6).batch(1, day, accounts))
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="Unknown ingest method"):
+        IngestStream(types.SimpleNamespace(dialect='postgresql'), rate=100, method='merge')
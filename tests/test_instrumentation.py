@@ -0,0 +1,64 @@
+import pytest
+
+from histogram import NANOSECONDS
+from instrumentation import split_phases, summarize_phases, summarize_throughput
+
+
+def measurement(total_s, fetch_s, rows=10, connect_s=None):
+    return {'total_ns': int(total_s * NANOSECONDS), 'rows': rows, 'bytes': 100 * rows,
+            'fetch_ns': None if fetch_s is None else int(fetch_s * NANOSECONDS),
+            'connect_ns': None if connect_s is None else int(connect_s * NANOSECONDS)}
+
+
+def test_transfer_is_what_the_server_and_fetch_leave():
+    phases = split_phases(measurement(0.010, 0.002), {'planning_ms': 1.0, 'execution_ms': 5.0})
+    assert phases['total_time'] == pytest.approx(0.010)
+    assert phases['planning_time'] == pytest.approx(0.001)
+    assert phases['execution_time'] == pytest.approx(0.005)
+    assert phases['fetch_time'] == pytest.approx(0.002)
+    assert phases['transfer_time'] == pytest.approx(0.002)
+    assert phases['rows'] == 10
+
+
+def test_transfer_never_negative():
+    # A sampled EXPLAIN can report more server time than a later execution took
+    phases = split_phases(measurement(0.004, 0.001), {'planning_ms': 1.0, 'execution_ms': 5.0})
+    assert phases['transfer_time'] == 0.0
+
+
+def test_without_server_timings():
+    phases = split_phases(measurement(0.010, 0.002), None)
+    assert phases['planning_time'] is phases['execution_time'] is phases['transfer_time'] is None
+    assert phases['fetch_time'] == pytest.approx(0.002)
+
+
+def test_execution_without_planning():
+    # Neo4j reports when the result was available, not planning on its own
+    phases = split_phases(measurement(0.010, 0.002), {'execution_ms': 6.0})
+    assert phases['planning_time'] is None
+    assert phases['transfer_time'] == pytest.approx(0.002)
+
+
+def test_connect_time_is_not_part_of_the_total():
+    phases = split_phases(measurement(0.010, 0.002, connect_s=0.001), {'planning_ms': 1.0, 'execution_ms': 5.0})
+    assert phases['connect_time'] == pytest.approx(0.001)
+    assert phases['transfer_time'] == pytest.approx(0.002)
+    assert split_phases(measurement(0.010, 0.002), None)['connect_time'] is None
+
+
+def test_summarize_phases_skips_unmeasured():
+    phases = [split_phases(measurement(0.010, 0.002), {'execution_ms': 6.0}),
+              split_phases(measurement(0.020, 0.004), None)]
+    summary = summarize_phases(phases)
+    assert summary['fetch_time'] == pytest.approx(0.003)
+    assert summary['execution_time'] == pytest.approx(0.006)
+    assert summary['planning_time'] is None
+
+
+def test_summarize_throughput():
+    phases = [split_phases(measurement(0.5, 0.1, rows=100), None), split_phases(measurement(1.5, 0.1, rows=300), None)]
+    throughput = summarize_throughput(phases)
+    assert throughput['rows'] == 300
+    assert throughput['rows_per_s'] == pytest.approx(200)
+    assert throughput['mb_per_s'] == pytest.approx(40_000 / 1_000_000 / 2)
+    assert summarize_throughput([])['rows_per_s'] is None
@@ -0,0 +1,22 @@
+from loader import read_batches, table_path
+
+
+def test_read_batches(tmp_path):
+    path = tmp_path / 'disp.csv'
+    path.write_text("DISP_ID, Client_Id,account_id,type\n1,1,1,OWNER\n2,2,2,OWNER\n3,3,2,DISPONENT\n4,,3,OWNER\n")
+    batches = list(read_batches(str(path), 3, ['disp_id', 'client_id', 'account_id']))
+
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert batches[0][2] == {'disp_id': 3, 'client_id': 3, 'account_id': 2, 'type': 'DISPONENT'}
+    # A missing key stays empty rather than failing the conversion
+    assert batches[1][0]['client_id'] == ''
+
+
+def test_read_batches_of_an_empty_table(tmp_path):
+    path = tmp_path / 'card.csv'
+    path.write_text("card_id,disp_id\n")
+    assert list(read_batches(str(path), 10, ['card_id'])) == []
+
+
+def test_table_path():
+    assert table_path('data', 'order').endswith('order.csv')
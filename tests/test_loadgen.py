@@ -0,0 +1,100 @@
+import pytest
+
+import loadgen
+from backends import Backend
+from histogram import LatencyHistogram
+from loadgen import load_worker, parse_mix, summarize_load
+
+QUERY_NAMES = ['Query 1', 'Query 2', 'Query 3']
+
+
+def test_no_mix_weights_every_query_equally():
+    assert parse_mix(None, QUERY_NAMES) == {'Query 1': 1.0, 'Query 2': 1.0, 'Query 3': 1.0}
+    assert parse_mix([], QUERY_NAMES) == {'Query 1': 1.0, 'Query 2': 1.0, 'Query 3': 1.0}
+
+
+def test_weights_and_defaults():
+    assert parse_mix(['Query 1=3', 'Query 3=0.5', 'Query 2'], QUERY_NAMES) == {
+        'Query 1': 3.0, 'Query 3': 0.5, 'Query 2': 1.0}
+
+
+def test_only_the_last_equals_sign_separates_the_weight():
+    assert parse_mix(['a=b=2'], ['a=b']) == {'a=b': 2.0}
+
+
+def test_unknown_query():
+    with pytest.raises(ValueError, match="Unknown query 'Query 9'"):
+        parse_mix(['Query 9=1'], QUERY_NAMES)
+
+
+def test_invalid_weight():
+    with pytest.raises(ValueError):
+        parse_mix(['Query 1=often'], QUERY_NAMES)
+
+
+def outcome(start, end, latencies, errors=0):
+    histograms = {}
+    for name, values in latencies.items():
+        histograms[name] = LatencyHistogram()
+        for value in values:
+            histograms[name].record(value)
+    return {'start': start, 'end': end, 'histograms': histograms, 'connect_histogram': LatencyHistogram(),
+            'errors': errors}
+
+
+def test_summary_merges_workers():
+    summary = summarize_load('PostgreSQL', 2, 'thread', [
+        outcome(0.0, 2.0, {'Query 1': [1_000_000] * 3}, errors=1),
+        outcome(0.5, 2.5, {'Query 1': [2_000_000], 'Query 2': [5_000_000] * 2}),
+    ])
+    assert summary['elapsed'] == 2.5
+    assert summary['requests'] == 6
+    assert summary['errors'] == 1
+    assert summary['qps'] == 6 / 2.5
+    queries = {query['name']: query for query in summary['queries']}
+    assert queries['Query 1']['requests'] == 4
+    assert queries['Query 1']['max_time'] == 0.002
+    assert queries['Query 2']['p50'] == pytest.approx(0.005, rel=1e-3)
+
+
+class AbortingBackend(Backend):
+    # Fails 'bad' queries and, like PostgreSQL, every statement after a failure until reset
+    name = 'Aborting'
+    dialect = 'postgresql'
+
+    def __init__(self, connection_mode=None, statement_mode=None):
+        super().__init__({}, connection_mode=connection_mode, statement_mode=statement_mode)
+        self.aborted = False
+        self.resets = 0
+
+    def connect(self):
+        pass
+
+    def close(self):
+        pass
+
+    def reset(self):
+        self.aborted = False
+        self.resets += 1
+
+    def execute_phases(self, query, params=None):
+        if self.aborted or query == 'bad':
+            self.aborted = True
+            raise RuntimeError("current transaction is aborted")
+        return {'rows': 1, 'bytes': 1, 'total_ns': 1000, 'fetch_ns': 0, 'server': None}
+
+
+def test_a_failed_query_does_not_fail_the_requests_after_it(monkeypatch):
+    backends = []
+
+    def get_backend(key, connection_mode=None, statement_mode=None):
+        backends.append(AbortingBackend(connection_mode, statement_mode))
+        return backends[-1]
+
+    monkeypatch.setattr(loadgen, 'get_backend', get_backend)
+    outcome = load_worker(0, 'postgresql', [('Query 1', 'good'), ('Query 2', 'bad')], {'Query 1': 9, 'Query 2': 1},
+                          None, 200, seed=1, connection_mode='persistent')
+
+    assert 0 < outcome['errors'] < 50
+    assert outcome['histograms']['Query 1'].count == 200 - outcome['errors']
+    assert backends[0].resets == outcome['errors']
@@ -0,0 +1,20 @@
+import json
+
+import pytest
+
+from orchestrate import load_targets
+
+
+def test_load_targets(tmp_path):
+    path = tmp_path / 'targets.json'
+    targets = {'Peter': {'postgresql': {'host': '10.0.0.12'}, 'neo4j': {'uri': 'bolt://10.0.0.12:7687'}},
+               'Anna': {'timescale': {}}}
+    path.write_text(json.dumps(targets))
+    assert load_targets(str(path)) == targets
+
+
+def test_load_targets_rejects_unknown_backends(tmp_path):
+    path = tmp_path / 'targets.json'
+    path.write_text(json.dumps({'Peter': {'postgresql': {}, 'mysql': {}}}))
+    with pytest.raises(ValueError, match='mysql'):
+        load_targets(str(path))
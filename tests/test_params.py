@@ -0,0 +1,65 @@
+import collections
+import datetime
+
+import numpy as np
+import pytest
+
+import config
+from params import ParameterGenerator
+
+
+def generator(dates_as_text=False, seed=1):
+    return ParameterGenerator([10, 20, 30], [1, 1, 8], [100, 200], np.datetime64('1993-01-01', 'D'),
+                              np.datetime64('1998-12-31', 'D'), dates_as_text, seed)
+
+
+def test_accounts_follow_transaction_share():
+    sampled = generator()
+    draws = collections.Counter(sampled.draw(['account_id'])['account_id'] for _ in range(5000))
+    assert set(draws) == {10, 20, 30}
+    assert draws[30] / 5000 == pytest.approx(0.8, abs=0.03)
+    assert draws[10] / 5000 == pytest.approx(0.1, abs=0.03)
+
+
+def test_clients_are_uniform():
+    sampled = generator()
+    draws = collections.Counter(sampled.draw(['client_id'])['client_id'] for _ in range(2000))
+    assert set(draws) == {100, 200}
+    assert draws[100] / 2000 == pytest.approx(0.5, abs=0.05)
+
+
+def test_date_window_inside_the_data():
+    window = datetime.timedelta(days=config.PARAMETER_DATE_WINDOW_DAYS)
+    sampled = generator()
+    for _ in range(500):
+        params = sampled.draw(['start_date', 'end_date'])
+        assert datetime.date(1993, 1, 1) <= params['start_date']
+        assert params['end_date'] <= datetime.date(1998, 12, 31)
+        assert params['end_date'] - params['start_date'] == window
+
+
+def test_dates_as_text():
+    params = generator(dates_as_text=True).draw(['start_date'])
+    assert isinstance(params['start_date'], str)
+    datetime.date.fromisoformat(params['end_date'])
+
+
+def test_same_seed_same_parameters():
+    first, second = generator(seed=5), generator(seed=5)
+    names = ['account_id', 'client_id', 'start_date']
+    assert [first.draw(names) for _ in range(20)] == [second.draw(names) for _ in range(20)]
+
+
+def test_unknown_parameter():
+    with pytest.raises(ValueError):
+        generator().draw(['district_id'])
+
+
+def test_sampler_reads_the_template_placeholders():
+    sampled = generator()
+    assert sampled.sampler('postgresql', "SELECT * FROM trans") is None
+    params = sampled.sampler('postgresql', "SELECT * FROM trans WHERE account_id = %(account_id)s")()
+    assert set(params) == {'account_id'}
+    params = sampled.sampler('neo4j', "MATCH (t:Transaction) WHERE t.date >= $start_date AND t.date < $end_date "
+                                      "RETURN t")()
+    assert set(params) == {'start_date', 'end_date'}
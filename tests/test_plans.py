@@ -0,0 +1,66 @@
+import json
+
+import pandas as pd
+
+from plans import fingerprint, normalize_plan, operators, plan_changes
+
+
+def postgres_plan(relation, rows, cost, index=None):
+    scan = {'Node Type': 'Index Scan' if index else 'Seq Scan', 'Relation Name': relation, 'Plan Rows': rows,
+            'Actual Rows': rows * 3, 'Actual Loops': 1, 'Total Cost': cost, 'Parent Relationship': 'Outer'}
+    if index:
+        scan['Index Name'] = index
+    return {'Plan': {'Node Type': 'Aggregate', 'Strategy': 'Hashed', 'Plan Rows': 10, 'Actual Rows': 10,
+                     'Total Cost': cost * 2, 'Plans': [scan]}}
+
+
+def test_fingerprint_ignores_costs_and_row_counts():
+    first = normalize_plan('postgresql', postgres_plan('trans', 1000, 50.0))
+    second = normalize_plan('postgresql', postgres_plan('trans', 9000, 420.5))
+    assert fingerprint(first) == fingerprint(second)
+
+
+def test_fingerprint_sees_a_different_access_path():
+    seq = normalize_plan('postgresql', postgres_plan('trans', 1000, 50.0))
+    index = normalize_plan('postgresql', postgres_plan('trans', 1000, 50.0, index='bench_trans_account'))
+    assert fingerprint(seq) != fingerprint(index)
+
+
+def test_neo4j_details_without_literals():
+    def plan(value, anon):
+        return {'operatorType': 'ProduceResults@neo4j', 'args': {'Details': 'a', 'EstimatedRows': 3.0}, 'rows': 3,
+                'children': [{'operatorType': 'NodeIndexSeek@neo4j', 'rows': 3,
+                              'args': {'Details': f"RANGE INDEX t:Transaction(date) WHERE date >= '{value}' "
+                                                  f"AND {anon}.x = 42"}}]}
+
+    first = normalize_plan('neo4j', plan('1995-01-01', 'anon_12'))
+    second = normalize_plan('neo4j', plan('1997-06-30', 'anon_7'))
+    assert first['operator'] == 'ProduceResults'
+    assert fingerprint(first) == fingerprint(second)
+
+
+def test_operators_flag_misestimates():
+    flat = operators(normalize_plan('postgresql', postgres_plan('trans', 1000, 50.0)))
+    assert [(op['depth'], op['operator'], op['detail']) for op in flat] == [
+        (0, 'Aggregate Hashed', ''), (1, 'Seq Scan', 'trans')]
+    assert flat[0]['misestimate'] == 1
+    assert flat[1]['misestimate'] == 3
+
+
+def plan_row(timestamp, query, fingerprint, database='PostgreSQL'):
+    return {'Computer': 'bench-1', 'Database': database, 'Query': query, 'Variant': 'none',
+            'Statement_Mode': 'simple', 'Run_Id': timestamp, 'Timestamp': timestamp, 'Fingerprint': fingerprint,
+            'Operators': json.dumps([])}
+
+
+def test_plan_changes_between_consecutive_runs():
+    plans = pd.DataFrame([plan_row('3', 'Query 1', 'b'), plan_row('1', 'Query 1', 'a'), plan_row('2', 'Query 1', 'a'),
+                          plan_row('1', 'Query 2', 'c'), plan_row('2', 'Query 2', 'c'),
+                          plan_row('1', 'Query 1', 'a', database='Neo4j'), plan_row('4', 'Query 1', 'a')])
+    changes = plan_changes(plans)
+    assert [(change['Database'], change['Query'], change['before']['Timestamp'], change['after']['Timestamp'])
+            for change in changes] == [('PostgreSQL', 'Query 1', '2', '3'), ('PostgreSQL', 'Query 1', '3', '4')]
+
+
+def test_plan_changes_of_no_plans():
+    assert plan_changes(pd.DataFrame(columns=['Database', 'Query', 'Timestamp', 'Fingerprint'])) == []
@@ -0,0 +1,56 @@
+import collections
+import cProfile
+import pstats
+import threading
+import time
+
+from profiling import StackSampler, cprofile_hotspots, measure, sampled_hotspots, write_collapsed
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_measure_splits_wall_and_cpu_time():
+    wall_ns, cpu_ns, value = measure(lambda: time.sleep(0.05) or 'done')
+    assert value == 'done'
+    assert wall_ns >= 50_000_000
+    assert cpu_ns < wall_ns / 2
+
+    wall_ns, cpu_ns, _ = measure(lambda: busy(0.05))
+    assert cpu_ns > wall_ns / 2
+
+
+def test_sampled_hotspots_are_leaf_shares():
+    stacks = collections.Counter({'main;run;execute': 6, 'main;run;fetchall': 3, 'main;fetchall': 1})
+    assert sampled_hotspots(stacks, top=2) == [('execute', 0.6), ('fetchall', 0.4)]
+
+
+def test_write_collapsed(tmp_path):
+    path = tmp_path / 'stacks.folded'
+    write_collapsed(collections.Counter({'a;b': 2, 'a;c': 5}), str(path))
+    assert path.read_text() == "a;c 5\na;b 2\n"
+
+
+def test_stack_sampler_only_samples_while_active():
+    with StackSampler(interval=0.001, thread_id=threading.get_ident()) as sampler:
+        busy(0.05)
+        assert not sampler.stacks
+        sampler.active.set()
+        busy(0.1)
+        sampler.active.clear()
+    assert sum(sampler.stacks.values()) > 0
+    assert any('busy (test_profiling.py:' in stack for stack in sampler.stacks)
+
+
+def test_cprofile_hotspots():
+    profile = cProfile.Profile()
+    profile.enable()
+    busy(0.05)
+    profile.disable()
+    hotspots = cprofile_hotspots(pstats.Stats(profile), top=3)
+    assert len(hotspots) <= 3
+    assert any(name.startswith('busy (test_profiling.py') for name, _ in hotspots)
+    assert all(0 <= share <= 1 for _, share in hotspots)
@@ -0,0 +1,61 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from histogram import LatencyHistogram
+from reports import frame_records, json_safe, load_records, result_records, write_report
+
+
+def test_json_safe():
+    value = {1: np.float64(0.5), 'n': np.int64(3), 'nan': float('nan'), 'inf': math.inf, 'array': np.array([1, 2]),
+             'tuple': (1, 'a'), 'none': None, 'flag': np.bool_(True), 'other': pd.Timestamp('2024-01-01')}
+    assert json_safe(value) == {'1': 0.5, 'n': 3, 'nan': None, 'inf': None, 'array': [1, 2], 'tuple': [1, 'a'],
+                                'none': None, 'flag': True, 'other': '2024-01-01 00:00:00'}
+    json.dumps(json_safe(value), allow_nan=False)
+
+
+def test_result_records_drop_per_execution_detail():
+    results = [{'database': 'PostgreSQL', 'name': 'Query 1', 'times': [0.1, 0.2], 'histogram': object(),
+                'phases': [{}], 'p50': np.float64(0.15), 'plan': {'fingerprint': 'abc', 'tree': {}}},
+               {'database': 'Neo4j', 'name': 'Query 1', 'times': [0.3], 'plan': None}]
+    records = result_records(results)
+    assert records[0] == {'database': 'PostgreSQL', 'name': 'Query 1', 'times': [0.1, 0.2], 'p50': 0.15,
+                          'plan_fingerprint': 'abc'}
+    assert 'plan_fingerprint' not in records[1]
+
+
+def test_write_json(tmp_path):
+    path = tmp_path / 'report.json'
+    write_report([{'name': 'Query 1', 'p50': 0.1}], str(path))
+    assert json.loads(path.read_text()) == [{'name': 'Query 1', 'p50': 0.1}]
+
+
+def test_write_parquet_flattens_nested_values(tmp_path):
+    path = tmp_path / 'report.parquet'
+    write_report([{'name': 'Query 1', 'times': [0.1, 0.2], 'phase_means': {'fetch_time': 0.01}}], str(path))
+    frame = pd.read_parquet(path)
+    assert list(frame.columns) == ['name', 'times', 'phase_means.fetch_time']
+    assert list(frame.loc[0, 'times']) == [0.1, 0.2]
+
+
+def test_frame_records():
+    frame = pd.DataFrame({'Source': ['A', 'Total'], 'F': [2.5, np.nan]})
+    assert frame_records(frame) == [{'Source': 'A', 'F': 2.5}, {'Source': 'Total', 'F': None}]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match='Unknown report format'):
+        write_report([], str(tmp_path / 'report.csv'))
+
+
+def test_load_records_drop_histograms():
+    histogram = LatencyHistogram()
+    histogram.record(1_000_000)
+    summary = {'database': 'PostgreSQL', 'workers': 4, 'qps': np.float64(120.0), 'connect': {'p50': float('nan')},
+               'queries': [{'name': 'Query 1', 'requests': 1, 'p50': 0.001, 'histogram': histogram}]}
+    assert load_records([summary]) == [{'database': 'PostgreSQL', 'workers': 4, 'qps': 120.0, 'connect': {'p50': None},
+                                        'queries': [{'name': 'Query 1', 'requests': 1, 'p50': 0.001}]}]
+    assert 'histogram' in summary['queries'][0]
@@ -0,0 +1,93 @@
+import resultcache
+from resultcache import ResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class VersionedBackend:
+    # Answers the data-version query with whatever `version` is set to
+    dialect = 'postgresql'
+
+    def __init__(self):
+        self.version = 1
+        self.queries = 0
+
+    def query_rows(self, query, params=None):
+        if query == resultcache.DATA_VERSION_QUERIES['postgresql']:
+            return [(self.version,)]
+        self.queries += 1
+        return [(self.queries, 'row')]
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resultcache.time, 'monotonic', clock)
+    cache = ResultCache(ttl=10, version_interval=-1)
+    cache.put("SELECT 1", {'a': 1}, [(1,)])
+
+    clock.now += 9.9
+    assert cache.get("SELECT 1", {'a': 1}) == [(1,)]
+    clock.now += 0.1
+    assert cache.get("SELECT 1", {'a': 1}) is None
+    assert not cache.entries
+
+
+def test_parameters_are_part_of_the_key():
+    cache = ResultCache(version_interval=-1)
+    cache.put("SELECT %(a)s, %(b)s", {'a': 1, 'b': 2}, [(1, 2)])
+    assert cache.get("SELECT %(a)s, %(b)s", {'b': 2, 'a': 1}) == [(1, 2)]
+    assert cache.get("SELECT %(a)s, %(b)s", {'a': 2, 'b': 2}) is None
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(max_entries=2, version_interval=-1)
+    cache.put("a", None, [1])
+    cache.put("b", None, [2])
+    assert cache.get("a") == [1]
+    cache.put("c", None, [3])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1]
+    assert cache.get("c") == [3]
+
+
+def test_new_data_version_invalidates(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resultcache.time, 'monotonic', clock)
+    backend = VersionedBackend()
+    cache = ResultCache(version_interval=1.0)
+
+    assert not cache.execute_phases(backend, "q")['cache_hit']
+    assert cache.execute_phases(backend, "q")['cache_hit']
+    backend.version = 2
+    # Within the polling interval the cache doesn't look
+    assert cache.execute_phases(backend, "q")['cache_hit']
+    clock.now += 1.0
+    assert not cache.execute_phases(backend, "q")['cache_hit']
+    assert cache.take_counters() == {'hits': 2, 'misses': 2, 'invalidations': 1, 'entries': 1}
+    assert cache.take_counters() == {'hits': 0, 'misses': 0, 'invalidations': 0, 'entries': 1}
+
+
+def test_invalidate():
+    cache = ResultCache(version_interval=-1)
+    cache.invalidate()
+    assert cache.invalidations == 0
+    cache.put("a", None, [1])
+    cache.invalidate()
+    assert cache.get("a") is None
+    assert cache.invalidations == 1
+
+
+def test_hit_counts_the_cached_rows():
+    backend = VersionedBackend()
+    cache = ResultCache(version_interval=-1)
+    miss = cache.execute_phases(backend, "q")
+    hit = cache.execute_phases(backend, "q")
+    assert miss['rows'] == hit['rows'] == 1
+    assert hit['server'] is None
+    assert backend.queries == 1
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from resultstore import EXPERIMENT_COLUMNS, FACTOR_COLUMNS, append_results, export_csv, read_results
+
+
+def result(query, times, database='PostgreSQL', **factors):
+    return {'database': database, 'name': query, 'times': times, **factors}
+
+
+def record(directory, *results):
+    append_results(list(results), directory=str(directory), computer='bench-1')
+
+
+def test_export_renumbers_replications_across_runs(tmp_path):
+    record(tmp_path, result('Query 1', [0.1, 0.2]), result('Query 2', [0.5]))
+    record(tmp_path, result('Query 1', [0.3]))
+    out = tmp_path / 'experiment.csv'
+
+    assert export_csv(str(out), str(tmp_path)) == 4
+    frame = pd.read_csv(out)
+    assert list(frame.columns) == EXPERIMENT_COLUMNS
+    query1 = frame[frame['Query'] == 'Query 1']
+    assert list(query1['Replication']) == [1, 2, 3]
+    assert list(query1['Response_Time']) == [0.1, 0.2, 0.3]
+    assert list(frame.loc[frame['Query'] == 'Query 2', 'Replication']) == [1]
+
+
+def test_export_refuses_to_pool_factor_levels(tmp_path):
+    record(tmp_path, result('Query 1', [0.1], variant='none'))
+    record(tmp_path, result('Query 1', [0.2], variant='indexes'))
+    with pytest.raises(ValueError, match='Variant'):
+        export_csv(str(tmp_path / 'experiment.csv'), str(tmp_path))
+
+
+def test_export_with_factors_numbers_each_level(tmp_path):
+    record(tmp_path, result('Query 1', [0.1, 0.2], variant='none'))
+    record(tmp_path, result('Query 1', [0.3], variant='indexes'))
+    out = tmp_path / 'experiment.csv'
+
+    assert export_csv(str(out), str(tmp_path), include_factors=True) == 3
+    frame = pd.read_csv(out)
+    assert set(FACTOR_COLUMNS) <= set(frame.columns)
+    replications = frame.groupby('Variant')['Replication'].apply(list).to_dict()
+    assert replications == {'indexes': [1], 'none': [1, 2]}
+
+
+def test_export_empty_store(tmp_path):
+    out = tmp_path / 'experiment.csv'
+    assert export_csv(str(out), str(tmp_path / 'missing')) == 0
+    assert list(pd.read_csv(out).columns) == EXPERIMENT_COLUMNS
+
+
+def test_read_results_merges_runs(tmp_path):
+    record(tmp_path, result('Query 1', [0.1]))
+    record(tmp_path, result('Query 1', [0.2], database='Neo4j'))
+    frame = read_results(str(tmp_path))
+    assert sorted(frame['Database']) == ['Neo4j', 'PostgreSQL']
+    assert frame['Run_Id'].nunique() == 2
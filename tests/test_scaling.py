@@ -0,0 +1,32 @@
+import csv
+
+from scaling import save_scaling_rows, scaling_plan_changes
+
+
+def row(scale, query, fingerprint='', database='PostgreSQL'):
+    return {'scale': scale, 'trans_rows': int(1_056_320 * scale), 'database': database, 'query': query,
+            'avg_time': 0.01 * scale, 'p50': 0.01 * scale, 'p99': 0.02 * scale, 'plan_fingerprint': fingerprint}
+
+
+def test_save_scaling_rows(tmp_path):
+    rows = [row(0.1, 'Query 1'), row(1, 'Query 1')]
+    path = tmp_path / 'scaling.csv'
+    save_scaling_rows(rows, str(path))
+    with open(path, newline='') as f:
+        saved = list(csv.DictReader(f))
+    assert [line['scale'] for line in saved] == ['0.1', '1']
+    assert list(saved[0]) == list(rows[0])
+
+
+def test_empty_sweep_writes_nothing(tmp_path):
+    path = tmp_path / 'scaling.csv'
+    assert not save_scaling_rows([], str(path))
+    assert not path.exists()
+
+
+def test_scaling_plan_changes():
+    rows = [row(10, 'Query 1', 'hash'), row(0.1, 'Query 1', 'seq'), row(1, 'Query 1', 'seq'),
+            row(0.1, 'Query 2', 'seq'), row(10, 'Query 2', 'seq'),
+            row(0.1, 'Query 1', 'seq', database='Neo4j'), row(1, 'Query 1', '', database='Neo4j'),
+            row(10, 'Query 1', 'expand', database='Neo4j')]
+    assert scaling_plan_changes(rows) == [('PostgreSQL', 'Query 1', 1, 10), ('Neo4j', 'Query 1', 0.1, 10)]
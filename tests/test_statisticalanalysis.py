@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import statisticalanalysis
+from statisticalanalysis import calculate_anova_table, compare_runs
+
+# Unbalanced 2 x 3 design: unequal replications per cell
+UNBALANCED = {
+    ('PostgreSQL', 'Query 1'): [1.0, 1.2, 1.1],
+    ('PostgreSQL', 'Query 2'): [2.0, 2.3],
+    ('PostgreSQL', 'Query 3'): [3.1],
+    ('Neo4j', 'Query 1'): [1.5, 1.4],
+    ('Neo4j', 'Query 2'): [2.9, 3.2, 3.0, 3.1],
+    ('Neo4j', 'Query 3'): [4.0, 4.4],
+}
+
+
+def experiment_frame(cells):
+    return pd.DataFrame([{'Database': database, 'Query': query, 'Response_Time': time}
+                         for (database, query), times in cells.items() for time in times])
+
+
+def sources(table):
+    return table.set_index('Source')
+
+
+# Reference sums of squares from an OLS fit with sum-to-zero contrasts (statsmodels anova_lm)
+@pytest.mark.parametrize('ss_type, database_ss, query_ss', [
+    (2, 1.730681, 10.764097),
+    (3, 1.791081, 10.376875),
+])
+def test_unbalanced_sums_of_squares(ss_type, database_ss, query_ss):
+    table = sources(calculate_anova_table(experiment_frame(UNBALANCED), ['Database', 'Query'], ss_type=ss_type))
+
+    assert table.loc['Database (A)', 'SS'] == pytest.approx(database_ss, abs=1e-3)
+    assert table.loc['Query (B)', 'SS'] == pytest.approx(query_ss, abs=1e-3)
+    assert table.loc['A × B', 'SS'] == pytest.approx(0.302986, abs=1e-3)
+    assert table.loc['Error', 'SS'] == pytest.approx(0.2, abs=1e-3)
+    assert table.loc['Total', 'SS'] == pytest.approx(15.834, abs=1e-3)
+    assert list(table['df']) == [1, 2, 2, 8, 13]
+    assert table.loc['A × B', 'F'] == pytest.approx(6.0597, abs=1e-3)
+    assert table.loc['A × B', 'p-value'] == pytest.approx(0.025, abs=1e-4)
+
+
+def test_balanced_types_agree():
+    rng = np.random.default_rng(0)
+    cells = {key: list(rng.normal(len(key[1]), 0.1, 3)) for key in UNBALANCED}
+    frame = experiment_frame(cells)
+    type2 = calculate_anova_table(frame, ['Database', 'Query'], ss_type=2)
+    type3 = calculate_anova_table(frame, ['Database', 'Query'], ss_type=3)
+    pd.testing.assert_frame_equal(type2, type3)
+
+
+def test_blank_responses_are_dropped():
+    frame = experiment_frame(UNBALANCED)
+    padded = pd.concat([frame, pd.DataFrame({'Database': ['Neo4j'], 'Query': ['Query 1'], 'Response_Time': ['']})])
+    pd.testing.assert_frame_equal(calculate_anova_table(padded, ['Database', 'Query']),
+                                  calculate_anova_table(frame, ['Database', 'Query']))
+
+
+def test_single_level_factor_has_no_effect():
+    frame = experiment_frame(UNBALANCED).assign(Computer='bench-1')
+    table = sources(calculate_anova_table(frame))
+    assert table.loc['Computer (C)', 'df'] == 0
+    assert np.isnan(table.loc['Computer (C)', 'SS'])
+    assert np.isnan(table.loc['Computer (C)', 'F'])
+
+
+def test_no_responses_raises():
+    frame = experiment_frame(UNBALANCED).assign(Response_Time='')
+    with pytest.raises(ValueError, match='No rows'):
+        calculate_anova_table(frame, ['Database', 'Query'])
+
+
+def test_empty_cells_are_left_out_of_the_design():
+    # Only 6 of the 2 x 3 x 6 cells hold data, one Computer per (Database, Query)
+    frame = experiment_frame(UNBALANCED)
+    frame['Computer'] = frame['Query'].map({'Query 1': 'a', 'Query 2': 'b', 'Query 3': 'c'})
+    frame.loc[frame['Database'] == 'Neo4j', 'Computer'] = frame['Computer'] + '2'
+    table = sources(calculate_anova_table(frame))
+    assert table.loc['Error', 'df'] == len(frame) - 6
+
+
+def test_too_many_cells_raises(monkeypatch):
+    monkeypatch.setattr(statisticalanalysis, 'ANOVA_MAX_DESIGN_VALUES', 30)
+    with pytest.raises(ValueError, match='2 × 3 design of Database, Query has 6 cells'):
+        calculate_anova_table(experiment_frame(UNBALANCED), ['Database', 'Query'])
+
+
+def test_rejects_unknown_ss_type():
+    with pytest.raises(ValueError):
+        calculate_anova_table(experiment_frame(UNBALANCED), ['Database', 'Query'], ss_type=1)
+
+
+def run_frame(cells, n=200, seed=0):
+    # cells: {(database, query): median latency}, lognormal around it
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame([{'Database': database, 'Query': query, 'Response_Time': median * rng.lognormal(0, 0.1)}
+                         for (database, query), median in cells.items() for _ in range(n)])
+
+
+def test_compare_runs_flags_only_the_slower_cell():
+    baseline = run_frame({('PostgreSQL', 'Query 1'): 1.0, ('PostgreSQL', 'Query 2'): 2.0}, seed=1)
+    candidate = run_frame({('PostgreSQL', 'Query 1'): 1.3, ('PostgreSQL', 'Query 2'): 2.0}, seed=2)
+    rows = {row['Query']: row for row in compare_runs(baseline, candidate, n_resamples=500)}
+
+    assert rows['Query 1']['regression']
+    assert rows['Query 1']['median_ratio'] == pytest.approx(1.3, rel=0.05)
+    low, high = rows['Query 1']['median_ratio_ci']
+    assert 1.05 < low <= high
+    assert not rows['Query 2']['regression']
+    assert rows['Query 2']['median_ratio_ci'][0] < 1 < rows['Query 2']['median_ratio_ci'][1]
+
+
+def test_compare_runs_is_reproducible():
+    baseline = run_frame({('Neo4j', 'Query 1'): 1.0}, seed=3)
+    candidate = run_frame({('Neo4j', 'Query 1'): 1.02}, seed=4)
+    first = compare_runs(baseline, candidate, n_resamples=300, seed=7)
+    second = compare_runs(baseline, candidate, n_resamples=300, seed=7, workers=1)
+    assert first == second
+
+
+def test_compare_runs_only_compares_shared_cells():
+    baseline = run_frame({('PostgreSQL', 'Query 1'): 1.0, ('Neo4j', 'Query 1'): 1.0})
+    candidate = run_frame({('PostgreSQL', 'Query 1'): 1.0, ('PostgreSQL', 'Query 2'): 1.0})
+    rows = compare_runs(baseline, candidate, n_resamples=100)
+    assert [(row['Database'], row['Query']) for row in rows] == [('PostgreSQL', 'Query 1')]
+
+
+def test_compare_runs_splits_cells_by_extra_columns():
+    baseline = pd.concat([run_frame({('PostgreSQL', 'Query 1'): 1.0}).assign(Variant=variant)
+                          for variant in ('none', 'indexes')])
+    candidate = pd.concat([run_frame({('PostgreSQL', 'Query 1'): 1.0}).assign(Variant='none'),
+                           run_frame({('PostgreSQL', 'Query 1'): 2.0}).assign(Variant='indexes')])
+    rows = {row['Variant']: row for row in compare_runs(baseline, candidate, by=['Variant'], n_resamples=300)}
+    assert rows['indexes']['regression']
+    assert not rows['none']['regression']
@@ -0,0 +1,61 @@
+import math
+import random
+
+from steadystate import count_outliers, is_steady, median_interval, relative_interval_width
+
+
+def test_not_steady_before_two_windows():
+    assert not is_steady([1.0] * 9, window=5, tolerance=0.05)
+    assert is_steady([1.0] * 10, window=5, tolerance=0.05)
+
+
+def test_warming_run_converges():
+    # Latency falls off like a cache warming up, then levels out
+    times = [1.0 + 10 * 0.5 ** i for i in range(40)]
+    first_steady = next(n for n in range(1, len(times) + 1) if is_steady(times[:n], window=5, tolerance=0.02))
+    assert 10 < first_steady < 30
+    assert not is_steady(times[:10], window=5, tolerance=0.02)
+
+
+def test_single_slow_execution_does_not_reset_detection():
+    times = [1.0] * 9 + [50.0]
+    assert is_steady(times, window=5, tolerance=0.05)
+
+
+def test_zero_latencies():
+    assert is_steady([0.0] * 10, window=5, tolerance=0.05)
+    assert not is_steady([0.0] * 5 + [1.0] * 5, window=5, tolerance=0.05)
+
+
+def test_count_outliers():
+    assert count_outliers([1.0, 1.1, 0.9, 1.0, 1.05, 20.0]) == 1
+    assert count_outliers([1.0] * 10) == 0
+    assert count_outliers([1.0, 100.0]) == 0
+
+
+def test_median_interval_order_statistics():
+    # n = 100 at 95%: ranks 50 -/+ 1.96 * 10 / 2, rounded outwards
+    assert median_interval(list(range(1, 101)), 0.95) == (40, 60)
+    assert median_interval(list(reversed(range(1, 101))), 0.95) == (40, 60)
+
+
+def test_median_interval_needs_enough_samples():
+    assert median_interval([1.0, 2.0, 3.0, 4.0, 5.0], 0.95) is None
+    assert median_interval([float(i) for i in range(1, 10)], 0.95) is not None
+
+
+def test_median_interval_coverage():
+    rng = random.Random(3)
+    # The true median of an exponential distribution with rate 1 is ln 2
+    covered = 0
+    trials = 400
+    for _ in range(trials):
+        interval = median_interval([rng.expovariate(1.0) for _ in range(50)], 0.95)
+        covered += interval[0] <= math.log(2) <= interval[1]
+    assert covered / trials >= 0.92
+
+
+def test_relative_interval_width():
+    assert relative_interval_width(list(range(1, 101)), 0.95) == (60 - 40) / 50.5
+    assert relative_interval_width([1.0, 2.0], 0.95) == math.inf
+    assert relative_interval_width([], 0.95) == math.inf
@@ -0,0 +1,49 @@
+import math
+
+import pytest
+
+from histogram import NANOSECONDS
+from telemetry import attach
+
+
+def test_counters_are_interpolated_over_each_iteration():
+    samples = [{'time_ns': 0, 'blks_hit': 0, 'blks_read': 0, 'heap_used_mb': 100},
+               {'time_ns': 10, 'blks_hit': 100, 'blks_read': 100, 'heap_used_mb': 200}]
+    result = {'intervals': [(0, 5), (5, 10), (2, 4)]}
+    attach([result], samples)
+
+    first, second, third = result['telemetry']
+    assert first['blks_hit'] == pytest.approx(50)
+    assert second['blks_hit'] == pytest.approx(50)
+    assert third['blks_read'] == pytest.approx(20)
+    assert first['blks_hit_ratio'] == pytest.approx(0.5)
+    # Gauges are read at the midpoint
+    assert first['heap_used_mb'] == pytest.approx(125)
+    assert third['heap_used_mb'] == pytest.approx(130)
+
+
+def test_metrics_sampled_less_than_twice_are_left_out():
+    samples = [{'time_ns': 0, 'xact_commit': 0}, {'time_ns': 10, 'xact_commit': 10, 'deadlocks': 1}]
+    result = {'intervals': [(0, 10)]}
+    attach([result], samples)
+    assert result['telemetry'] == [{'xact_commit': pytest.approx(10)}]
+
+
+def test_ratios_without_activity_are_nan():
+    samples = [{'time_ns': 0, 'blks_hit': 5, 'blks_read': 5}, {'time_ns': 10, 'blks_hit': 5, 'blks_read': 5}]
+    result = {'intervals': [(0, 10)]}
+    attach([result], samples)
+    assert math.isnan(result['telemetry'][0]['blks_hit_ratio'])
+
+
+def test_client_cpu_utilization():
+    samples = [{'time_ns': 0, 'client_cpu_s': 0.0}, {'time_ns': 2 * NANOSECONDS, 'client_cpu_s': 1.0}]
+    result = {'intervals': [(0, NANOSECONDS)]}
+    attach([result], samples)
+    assert result['telemetry'][0]['client_cpu_utilization'] == pytest.approx(0.5)
+
+
+def test_too_few_samples_attach_nothing():
+    result = {'intervals': [(0, 10)]}
+    attach([result], [{'time_ns': 0, 'blks_hit': 1}])
+    assert 'telemetry' not in result
@@ -0,0 +1,112 @@
+import pytest
+
+import variants
+from backends import Backend
+from variants import NEO4J_SUMMARY_SETUP, VARIANTS, run_variant_matrix, variants_for
+
+
+def names(variants):
+    return [variant['name'] for variant in variants]
+
+
+def test_variants_for_a_backend():
+    assert names(variants_for('neo4j')) == names(variant for variant in VARIANTS if 'neo4j' in variant['backends'])
+    assert 'btree account_id' not in names(variants_for('neo4j'))
+    assert 'btree account_id' in names(variants_for('postgresql'))
+
+
+def test_variants_by_name():
+    wanted = ['btree account_id', 'range index date, account_id']
+    assert names(variants_for('postgresql', wanted)) == ['btree account_id']
+
+
+def test_every_setup_has_a_teardown():
+    for variant in VARIANTS:
+        if variant['setup']:
+            assert variant['teardown'], variant['name']
+
+
+def test_summary_setup_can_rerun_over_leftovers():
+    # Setup must cope with the BenchWeek nodes of a run killed before its teardown
+    for statement in NEO4J_SUMMARY_SETUP:
+        assert 'CREATE' not in statement
+
+
+class StatementBackend(Backend):
+    name = 'Statements'
+    dialect = 'postgresql'
+
+    def __init__(self):
+        super().__init__({})
+        self.statements = []
+        self.closed = False
+
+    def connect(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def run_statement(self, statement):
+        if statement == 'broken':
+            raise RuntimeError("syntax error at or near 'broken'")
+        self.statements.append(statement)
+
+
+def test_a_failing_variant_is_torn_down_and_skipped(monkeypatch, capsys):
+    backend = StatementBackend()
+    recorded = []
+    monkeypatch.setattr(variants, 'get_backend', lambda key, **modes: backend)
+    monkeypatch.setattr(variants, 'VARIANTS', [
+        {'name': 'first', 'backends': ['postgresql'], 'setup': ['broken'], 'teardown': ['undo first']},
+        {'name': 'second', 'backends': ['postgresql'], 'setup': ['do second'], 'teardown': ['undo second']},
+    ])
+    monkeypatch.setattr(variants, 'run_benchmark', lambda backend, queries, **options: [{'query': 'Query 1'}])
+    monkeypatch.setattr(variants, 'record_results', lambda results, record: recorded.append(list(results)))
+
+    results = run_variant_matrix('postgresql', record=True)
+
+    assert [result['variant'] for result in results] == ['second']
+    assert backend.statements == ['undo first', 'do second', 'undo second']
+    assert "Variant 'first' failed: syntax error" in capsys.readouterr().out
+    assert recorded == [results]
+    assert backend.closed
+
+
+def test_results_so_far_are_recorded_when_the_run_is_interrupted(monkeypatch):
+    backend = StatementBackend()
+    recorded = []
+    runs = iter([[{'query': 'Query 1'}], KeyboardInterrupt])
+
+    def run_benchmark(backend, queries, **options):
+        run = next(runs)
+        if run is KeyboardInterrupt:
+            raise run
+        return run
+
+    monkeypatch.setattr(variants, 'get_backend', lambda key, **modes: backend)
+    monkeypatch.setattr(variants, 'VARIANTS', [
+        {'name': 'first', 'backends': ['postgresql'], 'setup': [], 'teardown': []},
+        {'name': 'second', 'backends': ['postgresql'], 'setup': [], 'teardown': []},
+    ])
+    monkeypatch.setattr(variants, 'run_benchmark', run_benchmark)
+    monkeypatch.setattr(variants, 'record_results', lambda results, record: recorded.append(list(results)))
+
+    with pytest.raises(KeyboardInterrupt):
+        run_variant_matrix('postgresql', record=True)
+    assert [[result['variant'] for result in results] for results in recorded] == [['first']]
+
+
+def test_backend_modes_reach_the_backend(monkeypatch):
+    requested = {}
+
+    def get_backend(key, **modes):
+        requested.update(modes)
+        return StatementBackend()
+
+    monkeypatch.setattr(variants, 'get_backend', get_backend)
+    monkeypatch.setattr(variants, 'VARIANTS', [])
+    run_variant_matrix('postgresql', record=False, fetch_mode='stream', fetch_size=500,
+                       connection_mode='connect', statement_mode='prepared')
+    assert requested == {'fetch_mode': 'stream', 'fetch_size': 500, 'connection_mode': 'connect',
+                         'statement_mode': 'prepared'}
@@ -1,18 +1,340 @@
+import json
+import statistics
+
 from prettytable import PrettyTable
 
+from histogram import REPORTED_PERCENTILES, percentile_key
+from instrumentation import PHASES
+
+PERCENTILE_COLUMNS = [f"{percentile_key(pct)} (s)" for pct in REPORTED_PERCENTILES]
+
+
+def percentile_cells(result):
+    return [f"{result[percentile_key(pct)]:.6f}" for pct in REPORTED_PERCENTILES]
+
+
+def format_optional(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
 def display_results(results):
     # Create and configure a table
     table = PrettyTable()
-    # table.field_names = ["Query", "Average Time (s)", "Standard Deviation (s)", "Maximum Time (s)", "Times"]
-    table.field_names = ["Query", "Time 1", "Time 2", "Time 3", "Time 4", "Time 5"]
+    table.field_names = (["Query", "Mode", "Samples", "Mean (s)", "Std Dev (s)"] + PERCENTILE_COLUMNS
+                         + ["Max (s)", "Outliers", "Warmup Runs", "Cold Mean (s)"])
     table.align["Query"] = "l"
 
-    for query, avg_time, std_dev, max_time, times in results:
+    for result in results:
+        query = result['name']
         if len(query) > 50:
             query = query[:50] + "..."
-        times = [f"{time:.2f}" for time in times]
-        # table.add_row([query, f"{avg_time:.6f}", f"{std_dev:.6f}", f"{max_time:.6f}"])
-        table.add_row([query, times[0], times[1], times[2], times[3], times[4],] )
+        cold_mean = f"{result['cold']['avg_time']:.6f}" if result.get('cold') else "-"
+        mode = result['cache_mode'] + (f", {result['workload']}" if result.get('workload') else "")
+        table.add_row([query, mode, result['samples'], f"{result['avg_time']:.6f}",
+                       f"{result['std_dev']:.6f}"] + percentile_cells(result)
+                      + [f"{result['max_time']:.6f}", result['outliers'], len(result['warmup_times']), cold_mean])
     
     print("\nQuery Performance Metrics:")
-    print(table)
\ No newline at end of file
+    print(table)
+
+
+def display_phases(results):
+    # Where the time went, averaged over the measured iterations, and what moving the result cost
+    table = PrettyTable()
+    table.field_names = ["Query", "Fetch Mode", "Statements", "Rows", "Connect (s)", "Planning (s)", "Execution (s)",
+                         "Transfer (s)", "Fetch (s)", "Rows/s", "MB/s", "Peak RSS (MB)",
+                         "RSS Growth (MB)"]
+    table.align["Query"] = "l"
+
+    for result in results:
+        means = result['phase_means']
+        table.add_row([result['name'], result['fetch_mode'], result['statement_mode'],
+                       result['rows'] if result['rows'] is not None else "-"]
+                      + [f"{means[phase]:.6f}" if means[phase] is not None else "-" for phase in PHASES]
+                      + [format_optional(result['rows_per_s'], ".0f"), format_optional(result['mb_per_s'], ".2f"),
+                         f"{result['peak_rss_mb']:.1f}", format_optional(result['rss_growth_mb'], ".1f")])
+
+    print("\nServer/Client Time Split and Throughput:")
+    print(table)
+
+
+# Telemetry shown per query: (metric, column heading, format)
+TELEMETRY_COLUMNS = [
+    ('blks_hit_ratio', "Buffer Hit Ratio", ".3f"),
+    ('blks_read', "Blocks Read", ".1f"),
+    ('temp_bytes', "Temp Bytes", ".0f"),
+    ('page_cache_faults', "Page Faults", ".1f"),
+    ('gc_time_ms', "GC (ms)", ".1f"),
+    ('heap_used_mb', "Heap (MB)", ".0f"),
+    ('lock_waiters', "Lock Waiters", ".1f"),
+    ('blocked_transactions', "Blocked Tx", ".1f"),
+    ('host_cpu_utilization', "Host CPU", ".2f"),
+    ('client_cpu_utilization', "Client CPU", ".2f"),
+]
+
+
+def display_telemetry(results):
+    # Per-iteration telemetry averaged per query; only metrics the backend reported
+    results = [result for result in results if result.get('telemetry')]
+    if not results:
+        return
+    columns = [column for column in TELEMETRY_COLUMNS
+               if any(column[0] in sample for result in results for sample in result['telemetry'])]
+    table = PrettyTable()
+    table.field_names = ["Query"] + [heading for _, heading, _ in columns]
+    table.align["Query"] = "l"
+    for result in results:
+        cells = []
+        for metric, _, spec in columns:
+            values = [sample[metric] for sample in result['telemetry']
+                      if metric in sample and sample[metric] == sample[metric]]
+            cells.append(format(sum(values) / len(values), spec) if values else "-")
+        table.add_row([result['name']] + cells)
+
+    print(f"\nServer/Client Telemetry per Execution (sampling took {results[0]['telemetry_overhead_ms']:.1f} ms "
+          f"every {results[0]['telemetry_interval']:g}s):")
+    print(table)
+
+
+def display_adaptive(results):
+    # How far adaptive replication got with every query's median
+    results = [result for result in results if result.get('adaptive')]
+    if not results:
+        return
+    table = PrettyTable()
+    table.field_names = ["Query", "Samples", "Median (s)", "CI Low (s)", "CI High (s)", "Rel. Width", "Converged"]
+    table.align["Query"] = "l"
+    for result in results:
+        adaptive = result['adaptive']
+        low, high = adaptive['interval'] or (None, None)
+        table.add_row([result['name'], len(result['times']), f"{result['p50']:.6f}",
+                       f"{low:.6f}" if low is not None else "-", f"{high:.6f}" if high is not None else "-",
+                       f"{adaptive['relative_width']:.3f}", "yes" if adaptive['converged'] else "no"])
+
+    print(f"\nAdaptive Replication (target relative width {results[0]['adaptive']['target_width']:g}, "
+          f"{results[0]['adaptive']['confidence']:.0%} interval on the median):")
+    print(table)
+
+
+def display_profile(profiles):
+    # Latency next to the share of it the client spent on its own CPU, then each query's hottest functions
+    table = PrettyTable()
+    table.field_names = ["Query", "Rows", "Median (s)", "Client CPU (s)", "Client CPU %", "Profiled Median (s)",
+                         "Output"]
+    table.align["Query"] = "l"
+    table.align["Output"] = "l"
+    for profile in profiles:
+        fraction = profile['client_cpu_fraction']
+        table.add_row([profile['name'], profile['rows'], f"{statistics.median(profile['times']):.6f}",
+                       f"{statistics.median(profile['cpu_times']):.6f}",
+                       f"{fraction:.1%}" if fraction is not None else "-",
+                       f"{statistics.median(profile['profiled_times']):.6f}", profile['path']])
+    print("\nClient-Side Profile (CPU % is client CPU time over wall-clock time, without the profiler):")
+    print(table)
+
+    hotspots = PrettyTable()
+    hotspots.field_names = ["Query", "Function", "Share"]
+    hotspots.align["Query"] = "l"
+    hotspots.align["Function"] = "l"
+    for profile in profiles:
+        for function, share in profile['hotspots']:
+            hotspots.add_row([profile['name'], function, f"{share:.1%}"])
+    print(f"\nHottest Functions ({profiles[0]['profiler'] if profiles else ''}, share of own time):")
+    print(hotspots)
+
+
+def display_decoding(comparisons):
+    if not comparisons:
+        return
+    table = PrettyTable()
+    table.field_names = ["Query", "Strategy", "Rows", "Median (s)", "Client CPU %", "vs. First"]
+    table.align["Query"] = "l"
+    table.align["Strategy"] = "l"
+    for entry in comparisons:
+        fraction = entry['client_cpu_fraction']
+        table.add_row([entry['name'], entry['strategy'], entry['rows'], f"{entry['median']:.6f}",
+                       f"{fraction:.1%}" if fraction is not None else "-",
+                       f"{entry['relative']:.2f}x" if entry['relative'] is not None else "-"])
+    print("\nResult Decoding Strategies:")
+    print(table)
+
+
+def display_load_results(summary):
+    # Aggregate throughput first, then latency percentiles per query
+    print(f"\n{summary['database']}: {summary['workers']} {summary['mode']} workers, "
+          f"{summary['requests']} requests in {summary['elapsed']:.2f}s "
+          f"({summary['qps']:.2f} queries/s, {summary['errors']} errors)")
+    if summary.get('rate'):
+        print(f"Offered {summary['offered_qps']:.2f} of {summary['rate']:g} queries/s scheduled, "
+              f"peak {summary['peak_in_flight']} in flight; latency counts from each request's scheduled start")
+    connect = summary['connect']
+    if connect['samples']:
+        print(f"Connection mode {summary['connection_mode']}: connect p50 {connect['p50']:.6f}s, "
+              f"p99 {connect['p99']:.6f}s")
+
+    # Async runs also report service time, which leaves out queueing for a connection
+    with_service = any('service' in query for query in summary['queries'])
+    table = PrettyTable()
+    table.field_names = (["Query", "Requests", "QPS"] + PERCENTILE_COLUMNS + ["Max (s)"]
+                         + (["Service p50 (s)", "Service p99 (s)"] if with_service else []))
+    table.align["Query"] = "l"
+    for query in summary['queries']:
+        service = query.get('service')
+        table.add_row([query['name'], query['requests'], f"{query['qps']:.2f}"]
+                      + percentile_cells(query) + [f"{query['max_time']:.6f}"]
+                      + ([f"{service['p50']:.6f}", f"{service['p99']:.6f}"] if with_service else []))
+    print(table)
+
+
+def display_mixed_workload(results):
+    # Each query under ingestion against its read-only baseline, then what the insert stream achieved
+    baseline = {result['name']: result for result in results if not result.get('workload')}
+    mixed = [result for result in results if result.get('workload') and result['name'] in baseline]
+    if not mixed:
+        return
+    table = PrettyTable()
+    table.field_names = ["Query", "Read-only p50 (s)", "Mixed p50 (s)", "p50 Ratio", "Read-only p99 (s)",
+                         "Mixed p99 (s)", "p99 Ratio"]
+    table.align["Query"] = "l"
+    for result in mixed:
+        reference = baseline[result['name']]
+        cells = []
+        for key in ('p50', 'p99'):
+            ratio = result[key] / reference[key] if reference[key] else None
+            cells += [f"{reference[key]:.6f}", f"{result[key]:.6f}", format_optional(ratio, ".2f")]
+        table.add_row([result['name']] + cells)
+
+    ingest = mixed[0]['ingest']
+    print(f"\nLatency Degradation under {mixed[0]['workload']}:")
+    print(table)
+    print(f"Ingested {ingest['rows']:,} rows in {ingest['batches']} {ingest['method']} batches: "
+          f"{ingest['rows_per_s']:,.0f} of {ingest['target_rows_per_s']:,.0f} rows/s, batch p50 "
+          f"{ingest['batch_p50']:.4f}s p99 {ingest['batch_p99']:.4f}s, worst lag {ingest['max_lag_s']:.2f}s, "
+          f"{ingest['errors']} errors, {ingest['retries']} retries")
+
+
+def display_dataset_load(report):
+    # Load time is a benchmark in its own right, so report it like one
+    table = PrettyTable()
+    table.field_names = ["Step", "Rows", "Seconds", "Rows/s"]
+    table.align["Step"] = "l"
+    for step in report['steps']:
+        table.add_row([step['step'], f"{step['rows']:,}", f"{step['seconds']:.2f}", f"{step['rows_per_s']:,.0f}"])
+    table.add_row(["Total", f"{report['rows']:,}", f"{report['seconds']:.2f}", f"{report['rows_per_s']:,.0f}"])
+
+    print(f"\n{report['database']} Dataset Load:")
+    print(table)
+
+
+def display_experiment(outcomes):
+    # One row per (computer, backend) with the hardware its server ran on
+    table = PrettyTable()
+    table.field_names = ["Computer", "Backend", "Samples", "CPU", "Cores", "RAM (GB)", "Disk", "Hardware", "Result"]
+    table.align["Computer"] = "l"
+    table.align["CPU"] = "l"
+    for outcome in outcomes:
+        hardware = outcome['hardware'] or {}
+        table.add_row([outcome['computer'], outcome['backend'], outcome['samples'],
+                       hardware.get('cpu_model') or "-", hardware.get('cpu_cores') or "-",
+                       hardware.get('ram_gb') or "-", hardware.get('disk_type') or "-",
+                       hardware.get('fingerprint') or "-", f"failed: {outcome['error'].splitlines()[0]}" if outcome['error'] else "ok"])
+
+    print("\nExperiment Runs:")
+    print(table)
+
+
+def display_variant_matrix(results):
+    # One row per (variant, query) so physical designs can be compared side by side
+    # Precomputed aggregates also show what a refresh costs, cached runs their hit ratio
+    table = PrettyTable()
+    table.field_names = (["Database", "Variant", "Query", "Setup (s)", "Refresh (s)", "Mean (s)"]
+                         + PERCENTILE_COLUMNS + ["Cache Hits"])
+    table.align["Variant"] = "l"
+    for result in results:
+        counters = result.get('result_cache')
+        lookups = counters['hits'] + counters['misses'] if counters else 0
+        table.add_row([result['database'], result['variant'], result['name'], f"{result['setup_time']:.2f}",
+                       format_optional(result.get('refresh_time'), ".2f"), f"{result['avg_time']:.6f}"]
+                      + percentile_cells(result)
+                      + [f"{counters['hits'] / lookups:.1%}" if lookups else "-"])
+
+    print("\nSchema Variant Matrix:")
+    print(table)
+
+
+def format_interval(interval, spec=".6f"):
+    return f"[{interval[0]:{spec}}, {interval[1]:{spec}}]"
+
+
+def display_comparison(rows, threshold, confidence):
+    # Candidate against baseline per cell, with bootstrap intervals and the verdict
+    table = PrettyTable()
+    cell_columns = [key for key in rows[0] if key[0].isupper()] if rows else ["Database", "Query"]
+    table.field_names = cell_columns + ["Samples", "Median (s)", "Median Ratio", "p99 (s)", "p99 Ratio", "Verdict"]
+    table.align["Query"] = "l"
+
+    for row in rows:
+        cells = []
+        for statistic in ('median', 'p99'):
+            cells += [f"{row[f'{statistic}_baseline']:.6f} -> {row[f'{statistic}_candidate']:.6f}",
+                      f"{row[f'{statistic}_ratio']:.3f} {format_interval(row[f'{statistic}_ratio_ci'], '.3f')}"]
+        verdict = "REGRESSION" if row['regression'] else "ok"
+        table.add_row([row[column] for column in cell_columns]
+                      + [f"{row['baseline_samples']}/{row['candidate_samples']}"] + cells + [verdict])
+
+    print(f"\nCandidate vs Baseline ({confidence:.0%} bootstrap intervals of the ratio, "
+          f"regression when above {1 + threshold:.2f}):")
+    print(table)
+
+
+def display_verification(reports):
+    # One line per query, then the sampled rows behind every mismatch
+    databases = list(dict.fromkeys(db for report in reports for db in list(report['rows']) + list(report['errors'])))
+    table = PrettyTable()
+    table.field_names = ["Query"] + [f"{db} Rows" for db in databases] + ["Digest", "Result"]
+    table.align["Query"] = "l"
+    for report in reports:
+        digests = set(report['digests'].values())
+        table.add_row([report['name']] + [report['rows'].get(db, "error") for db in databases]
+                      + [next(iter(digests))[:12] if len(digests) == 1 else "differs",
+                         "match" if report['matches'] else "MISMATCH"])
+
+    print("\nCross-Backend Result Verification:")
+    print(table)
+    for report in reports:
+        if report['matches']:
+            continue
+        print(f"\n{report['name']}" + (f" with {report['params']}" if report['params'] else "") + ":")
+        for database, error in report['errors'].items():
+            print(f"  {database} failed: {error}")
+        for mismatch in report['mismatches']:
+            print(f"  only in {mismatch['only_in']}: {mismatch['row']}")
+
+
+def plan_table(operators, misestimate_factor):
+    table = PrettyTable()
+    table.field_names = ["Operator", "Estimated Rows", "Actual Rows", "Misestimate"]
+    table.align["Operator"] = "l"
+    for node in operators:
+        label = "  " * node['depth'] + node['operator'] + (f" on {node['detail']}" if node['detail'] else "")
+        misestimate = node['misestimate']
+        flag = " !" if misestimate is not None and misestimate >= misestimate_factor else ""
+        table.add_row([label, format_optional(node['estimated_rows'], ".0f"),
+                       format_optional(node['actual_rows'], ".0f"),
+                       format_optional(misestimate, ".1f") + flag])
+    return table
+
+
+def display_plan_changes(changes, misestimate_factor):
+    # Old and new operator trees of every changed plan; '!' marks row estimates off by misestimate_factor or more
+    if not changes:
+        print("\nNo plan changes.")
+        return
+    print(f"\n{len(changes)} Plan Change(s):")
+    for change in changes:
+        before, after = change['before'], change['after']
+        print(f"\n{change['Query']} on {change['Database']} ({change.get('Variant', 'none')}, "
+              f"{change.get('Statement_Mode') or 'simple'}): {before['Fingerprint']} -> {after['Fingerprint']}")
+        for side, row in (("Before", before), ("After", after)):
+            print(f"{side}, run {str(row['Run_Id'])[:8]} at {row['Timestamp']}:")
+            print(plan_table(json.loads(row['Operators']), misestimate_factor))
@@ -0,0 +1,356 @@
+import os
+import time
+
+import config
+from backends import get_backend
+from benchmark import load_queries, record_results, run_benchmark
+
+# Unique indexes on a hypertable must include the time column, so the
+# trans_id primary key goes while trans is partitioned
+HYPERTABLE_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS timescaledb",
+    "ALTER TABLE trans DROP CONSTRAINT IF EXISTS trans_pkey",
+    f"SELECT create_hypertable('trans', 'date', "
+    f"chunk_time_interval => INTERVAL '{config.TIMESCALE_CHUNK_INTERVAL}', migrate_data => true, "
+    f"if_not_exists => true)",
+    "ANALYZE trans",
+]
+
+# A hypertable cannot be turned back into a plain table, so rebuild one. Every
+# step checks the current state first, so this also repairs a setup that
+# failed partway: create_hypertable made date NOT NULL, which the schema's
+# trans.date is not, and the primary key may already be gone
+HYPERTABLE_TEARDOWN = [
+    "DROP TABLE IF EXISTS trans_plain",
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('timescaledb_information.hypertables') IS NOT NULL THEN
+            IF EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = 'trans') THEN
+                CREATE TABLE trans_plain (LIKE trans INCLUDING DEFAULTS);
+                INSERT INTO trans_plain SELECT * FROM trans;
+                DROP TABLE trans;
+                ALTER TABLE trans_plain RENAME TO trans;
+            END IF;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE trans ALTER COLUMN date DROP NOT NULL",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = 'trans'::regclass AND contype = 'p') THEN
+            ALTER TABLE trans ADD PRIMARY KEY (trans_id);
+        END IF;
+    END $$
+    """,
+    "ANALYZE trans",
+]
+
+# Pre-aggregated variants answer Query 1 and Query 3 from these relations and
+# properties instead of the trans table; their rewritten queries live here
+AGGREGATE_QUERY_DIRECTORY = os.path.join(config.QUERY_DIRECTORY, 'aggregates')
+
+# Query 1 and Query 3 without their final filter and ordering, kept as materialized views
+ACCOUNT_TOTALS_SQL = """
+    SELECT a.account_id,
+        COUNT(DISTINCT t.trans_id) AS transaction_count,
+        SUM(t.amount) AS total_amount,
+        AVG(t.amount) AS avg_transaction_amount,
+        (SELECT MAX(t2.amount) FROM trans t2 WHERE t2.account_id = a.account_id) AS max_transaction_amount
+    FROM account a
+    LEFT JOIN trans t ON a.account_id = t.account_id
+    LEFT JOIN disp d ON a.account_id = d.account_id
+    LEFT JOIN client c ON d.client_id = c.client_id
+    GROUP BY a.account_id
+"""
+CLIENT_WEEKS_SQL = """
+    SELECT c.client_id,
+        MIN(t.date) AS transaction_date,
+        SUM(t.amount) AS total_amount,
+        EXTRACT(week FROM t.date) AS week_of_year,
+        EXTRACT(year FROM t.date) AS year
+    FROM client c
+    LEFT JOIN disp d ON c.client_id = d.client_id
+    LEFT JOIN account a ON d.account_id = a.account_id
+    LEFT JOIN trans t ON a.account_id = t.account_id
+    GROUP BY c.client_id, EXTRACT(week FROM t.date), EXTRACT(year FROM t.date)
+"""
+
+# The same two relations as plain views over a per-account daily continuous
+# aggregate. Query 1 sums every transaction once per disposition of its
+# account, hence the multiplication; Query 3's weeks are unions of whole days.
+ACCOUNT_TOTALS_FROM_DAILY_SQL = """
+    SELECT a.account_id,
+        s.transaction_count,
+        s.total_amount * COALESCE(d.disps, 1) AS total_amount,
+        s.total_amount / s.transaction_count AS avg_transaction_amount,
+        s.max_transaction_amount
+    FROM account a
+    JOIN (SELECT account_id, SUM(transactions) AS transaction_count, SUM(total_amount) AS total_amount,
+                 MAX(max_amount) AS max_transaction_amount
+          FROM bench_trans_daily GROUP BY account_id) s ON s.account_id = a.account_id
+    LEFT JOIN (SELECT account_id, COUNT(*) AS disps FROM disp GROUP BY account_id) d ON d.account_id = a.account_id
+"""
+CLIENT_WEEKS_FROM_DAILY_SQL = """
+    SELECT c.client_id,
+        MIN(s.day) AS transaction_date,
+        SUM(s.total_amount) AS total_amount,
+        EXTRACT(week FROM s.day) AS week_of_year,
+        EXTRACT(year FROM s.day) AS year
+    FROM client c
+    LEFT JOIN disp d ON c.client_id = d.client_id
+    LEFT JOIN account a ON d.account_id = a.account_id
+    LEFT JOIN bench_trans_daily s ON a.account_id = s.account_id
+    GROUP BY c.client_id, EXTRACT(week FROM s.day), EXTRACT(year FROM s.day)
+"""
+
+NEO4J_SUMMARY_SETUP = [
+    """
+    MATCH (a:Account)
+    CALL {
+        WITH a
+        OPTIONAL MATCH (a)-[:HAS_TRANSACTION]->(t:Transaction)
+        WITH a, count(t) AS transactions, sum(toFloat(t.amount)) AS total, max(toFloat(t.amount)) AS largest
+        SET a.bench_transaction_count = transactions, a.bench_total_amount = total, a.bench_max_amount = largest
+    } IN TRANSACTIONS OF 1000 ROWS
+    """,
+    """
+    MATCH (a:Account)
+    CALL {
+        WITH a
+        MATCH (a)-[:HAS_TRANSACTION]->(t:Transaction)
+        WITH a, toInteger(date(t.date).year) AS year, toInteger(date(t.date).week) AS week,
+            min(t.date) AS earliest, sum(toInteger(t.amount)) AS total
+        MERGE (a)-[:HAS_BENCH_WEEK]->(w:BenchWeek {year: year, week: week})
+        SET w.earliest_transaction_date = earliest, w.total_amount = total
+    } IN TRANSACTIONS OF 1000 ROWS
+    """,
+]
+NEO4J_SUMMARY_TEARDOWN = [
+    "MATCH (w:BenchWeek) CALL { WITH w DETACH DELETE w } IN TRANSACTIONS OF 10000 ROWS",
+    "MATCH (a:Account) REMOVE a.bench_transaction_count, a.bench_total_amount, a.bench_max_amount",
+]
+
+# Physical-design variants of the experiment matrix. Each applies to the listed
+# backends: `setup` runs before the query set, `teardown` afterwards so the next
+# variant starts from the loaded baseline (primary keys and, on Neo4j, the
+# loader's key constraints). Teardown also runs after a failed setup, so it
+# must cope with any part of the setup missing, and setup with leftovers of a
+# run that was killed before its teardown. Optional keys:
+# - 'queries': directory whose query files replace the same-named default ones
+# - 'refresh': statements bringing precomputed data up to date after new
+#   transactions, timed once after the query set
+# - 'client_cache': answer repeated queries from a resultcache.ResultCache
+VARIANTS = [
+    {
+        'name': 'no index',
+        'backends': ['postgresql', 'timescale', 'neo4j'],
+        'setup': [],
+        'teardown': [],
+    },
+    {
+        'name': 'btree account_id',
+        'backends': ['postgresql', 'timescale'],
+        'setup': [
+            "CREATE INDEX IF NOT EXISTS bench_trans_account ON trans (account_id)",
+            "ANALYZE trans",
+        ],
+        'teardown': ["DROP INDEX IF EXISTS bench_trans_account"],
+    },
+    {
+        'name': 'covering account_id, date',
+        'backends': ['postgresql', 'timescale'],
+        'setup': [
+            "CREATE INDEX IF NOT EXISTS bench_trans_account_date ON trans (account_id, date) INCLUDE (amount)",
+            "VACUUM ANALYZE trans",  # Sets the visibility map so index-only scans are possible
+        ],
+        'teardown': ["DROP INDEX IF EXISTS bench_trans_account_date"],
+    },
+    {
+        'name': 'brin date',
+        'backends': ['postgresql', 'timescale'],
+        'setup': [
+            "CREATE INDEX IF NOT EXISTS bench_trans_date_brin ON trans USING brin (date)",
+            "ANALYZE trans",
+        ],
+        'teardown': ["DROP INDEX IF EXISTS bench_trans_date_brin"],
+    },
+    {
+        'name': f"hypertable {config.TIMESCALE_CHUNK_INTERVAL}",
+        'backends': ['timescale'],
+        'setup': HYPERTABLE_SETUP,
+        'teardown': HYPERTABLE_TEARDOWN,
+    },
+    {
+        'name': 'range index date, account_id',
+        'backends': ['neo4j'],
+        'setup': [
+            "CREATE RANGE INDEX bench_transaction_date IF NOT EXISTS FOR (t:Transaction) ON (t.date)",
+            "CREATE RANGE INDEX bench_account_account_id IF NOT EXISTS FOR (a:Account) ON (a.account_id)",
+            "CALL db.awaitIndexes(600)",
+        ],
+        'teardown': [
+            "DROP INDEX bench_transaction_date IF EXISTS",
+            "DROP INDEX bench_account_account_id IF EXISTS",
+        ],
+    },
+    {
+        # PostgreSQL has no incremental view maintenance: a refresh recomputes
+        # the views, CONCURRENTLY so readers are never blocked
+        'name': 'materialized views',
+        'backends': ['postgresql', 'timescale'],
+        'setup': [
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS bench_account_totals AS {ACCOUNT_TOTALS_SQL}",
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS bench_client_weeks AS {CLIENT_WEEKS_SQL}",
+            # Unique indexes let REFRESH ... CONCURRENTLY diff the old and new contents
+            "CREATE UNIQUE INDEX IF NOT EXISTS bench_account_totals_key ON bench_account_totals (account_id)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS bench_client_weeks_key ON bench_client_weeks (client_id, year, week_of_year)",
+            "ANALYZE bench_account_totals",
+            "ANALYZE bench_client_weeks",
+        ],
+        'refresh': [
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY bench_account_totals",
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY bench_client_weeks",
+        ],
+        'teardown': [
+            "DROP MATERIALIZED VIEW IF EXISTS bench_account_totals",
+            "DROP MATERIALIZED VIEW IF EXISTS bench_client_weeks",
+        ],
+        'queries': AGGREGATE_QUERY_DIRECTORY,
+    },
+    {
+        # Refreshing a continuous aggregate only recomputes the days that
+        # changed, and real-time aggregation adds rows past the last refresh
+        # at query time
+        'name': 'continuous aggregate',
+        'backends': ['timescale'],
+        'setup': HYPERTABLE_SETUP + [
+            "CREATE MATERIALIZED VIEW IF NOT EXISTS bench_trans_daily "
+            "WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS "
+            "SELECT account_id, time_bucket(INTERVAL '1 day', date) AS day, COUNT(*) AS transactions, "
+            "SUM(amount) AS total_amount, MAX(amount) AS max_amount "
+            "FROM trans GROUP BY account_id, time_bucket(INTERVAL '1 day', date) WITH NO DATA",
+            "CALL refresh_continuous_aggregate('bench_trans_daily', NULL, NULL)",
+            f"CREATE OR REPLACE VIEW bench_account_totals AS {ACCOUNT_TOTALS_FROM_DAILY_SQL}",
+            f"CREATE OR REPLACE VIEW bench_client_weeks AS {CLIENT_WEEKS_FROM_DAILY_SQL}",
+        ],
+        'refresh': ["CALL refresh_continuous_aggregate('bench_trans_daily', NULL, NULL)"],
+        'teardown': [
+            "DROP VIEW IF EXISTS bench_account_totals",
+            "DROP VIEW IF EXISTS bench_client_weeks",
+            "DROP MATERIALIZED VIEW IF EXISTS bench_trans_daily",
+        ] + HYPERTABLE_TEARDOWN,
+        'queries': AGGREGATE_QUERY_DIRECTORY,
+    },
+    {
+        # Per-account totals as Account properties and one BenchWeek node per
+        # account and week; a refresh recomputes them
+        'name': 'summary properties',
+        'backends': ['neo4j'],
+        'setup': NEO4J_SUMMARY_SETUP,
+        'refresh': NEO4J_SUMMARY_TEARDOWN + NEO4J_SUMMARY_SETUP,
+        'teardown': NEO4J_SUMMARY_TEARDOWN,
+        'queries': AGGREGATE_QUERY_DIRECTORY,
+    },
+    {
+        'name': 'client result cache',
+        'backends': ['postgresql', 'timescale', 'neo4j'],
+        'setup': [],
+        'teardown': [],
+        'client_cache': True,
+    },
+]
+
+
+def variants_for(backend_key, names=None):
+    """Variants applying to a backend, optionally only the named ones"""
+    return [variant for variant in VARIANTS
+            if backend_key in variant['backends'] and (not names or variant['name'] in names)]
+
+
+def run_statements(backend, statements):
+    start = time.perf_counter()
+    for statement in statements:
+        backend.run_statement(statement)
+    return time.perf_counter() - start
+
+
+def run_variant(backend, variant, queries, benchmark_options):
+    """Set up, benchmark and tear down one variant on a connected backend"""
+    if variant.get('queries'):
+        replacements = dict(load_queries(backend.dialect, variant['queries']))
+        queries = [(name, replacements.get(name, query)) for name, query in queries]
+    refresh_time = None
+    try:
+        backend.acquire()
+        try:
+            setup_time = run_statements(backend, variant['setup'])
+        finally:
+            backend.release()
+        if variant.get('client_cache'):
+            from resultcache import ResultCache
+
+            backend.result_cache = ResultCache()
+        variant_results = run_benchmark(backend, queries, **benchmark_options)
+        if variant.get('refresh'):
+            backend.acquire()
+            try:
+                refresh_time = run_statements(backend, variant['refresh'])
+            finally:
+                backend.release()
+    finally:
+        backend.result_cache = None
+        backend.acquire()
+        try:
+            run_statements(backend, variant['teardown'])
+        finally:
+            backend.release()
+    for result in variant_results:
+        result['variant'] = variant['name']
+        result['setup_time'] = setup_time
+        result['refresh_time'] = refresh_time
+    return variant_results
+
+
+def run_variant_matrix(backend_key, variant_names=None, query_names=None, record=None, parameterized=False,
+                       fetch_mode=None, fetch_size=None, connection_mode=None, statement_mode=None,
+                       **benchmark_options):
+    """
+    Run the query set once per physical-design variant
+
+    Every variant is set up, benchmarked with run_benchmark(**benchmark_options)
+    and torn down again, even when the setup or the benchmark fails. A failing
+    variant is reported and skipped. Result dicts gain a 'variant' factor, the
+    variant's setup time and, for precomputed aggregates, 'refresh_time', and
+    the ones collected are appended to the results store unless record is
+    False, even when the run is cut short. fetch_mode, fetch_size,
+    connection_mode and statement_mode configure the backend as in
+    backends.get_backend.
+
+    Returns:
+    list: result dicts from every variant
+    """
+    backend = get_backend(backend_key, fetch_mode=fetch_mode, fetch_size=fetch_size,
+                          connection_mode=connection_mode, statement_mode=statement_mode)
+    queries = load_queries(backend.dialect, parameterized=parameterized)
+    if query_names:
+        queries = [(name, query) for name, query in queries if name in query_names]
+
+    results = []
+    try:
+        backend.connect()
+        for variant in variants_for(backend_key, variant_names):
+            print(f"===== {backend.name}: {variant['name']} =====")
+            try:
+                variant_results = run_variant(backend, variant, queries, benchmark_options)
+            except Exception as e:
+                # One broken variant shouldn't cost the others their results
+                print(f"Variant '{variant['name']}' failed: {e}")
+                backend.reset()
+                continue
+            results.extend(variant_results)
+    finally:
+        backend.close()
+        record_results(results, record)
+    return results